@@ -7,6 +7,14 @@ LOGO_SIZE_ICON = 120
 LOGO_SIZE_AUTH = 250
 LOGO_SIZE_SIDEBAR = 180
 
+# Correlation Analytics
+CORRELATION_REVENUE_COLUMNS = ["id", "created_at", "amount_net", "platform"]
+REVENUE_BUCKET_LABELS = {"h": "Hourly", "D": "Daily", "W": "Weekly", "MS": "Monthly"}
+ADULT_PLATFORMS = ["onlyfans", "fansly"]
+
+# Admin-Accounts (Terminal-Zugang & Debug-Panel)
+ADMIN_EMAILS = ["janick@icanhasbucket.de"]
+
 # --- 1. BOOT VERIFICATION (FAIL-SAFE) ---
 # Critical: DB & Auth
 critical_secrets = ["SUPABASE_URL", "SUPABASE_KEY", "BREVO_API_KEY"]
@@ -33,7 +41,7 @@ try:
     # Brevo wird via requests in alerts.py verwendet
     
     # Module importieren
-    from modules import crm, finance, planner, factory, gallery, channels, deals, demo, revenue_vault, onlyfans_analytics, api_connections, youtube_analytics, alerts
+    from modules import crm, finance, planner, factory, gallery, channels, deals, demo, revenue_vault, onlyfans_analytics, api_connections, youtube_analytics, alerts, data_loader, downsample, correlation, rollups, tracing, profiling, metrics, sync_log
     
     # Global Clients
     supabase = create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
@@ -43,10 +51,35 @@ except Exception as e:
 
 # --- 3. HELPER FUNCTIONS ---
 @st.cache_resource
-def init_supabase():
+def get_supabase_client():
     """Initialisierte Supabase-Instanz zurückgeben (gecacht für Performance)"""
     return supabase
 
+def init_supabase():
+    """Supabase-Client der aktuellen Session (Query-Tracing nur für Admins, die das Debug-Panel sehen)."""
+    if not is_admin():
+        return get_supabase_client()
+    return tracing.traced_client(get_supabase_client())
+
+@st.cache_resource
+def start_metrics_server():
+    """/metrics-Endpunkt einmal pro Prozess starten (nur wenn METRICS_PORT in Secrets/Env gesetzt ist)."""
+    try:
+        return metrics.start_http_server(st.secrets.get("METRICS_PORT"))
+    except OSError as e:
+        # Port belegt (z.B. zweiter Streamlit-Prozess) -> App läuft ohne Endpunkt weiter
+        print(f"Metrics Server Error: {e}")
+        return None
+
+@st.cache_resource
+def start_sync_log():
+    """Writer für sync_runs einmal pro Prozess starten (schreibt gebündelt im Hintergrund)."""
+    return sync_log.configure(get_supabase_client())
+
+def is_admin():
+    """Prüft, ob der eingeloggte User ein Admin-Account ist."""
+    return st.session_state.get("user_email") in ADMIN_EMAILS
+
 def send_system_mail(recipient, subject, body, email_type="system"):
     """
     Generische System-Email-Funktion mit Logging.
@@ -68,6 +101,7 @@ def send_system_mail(recipient, subject, body, email_type="system"):
             "subject": subject,
             "html": body
         })
+        metrics.EMAILS.inc(type=email_type, status="success")
         
         # Erfolgreicher Versand -> Log in Supabase
         try:
@@ -86,6 +120,7 @@ def send_system_mail(recipient, subject, body, email_type="system"):
     except Exception as e:
         # Fehler beim Versand -> Log in Supabase
         error_msg = str(e)
+        metrics.EMAILS.inc(type=email_type, status="failed")
         try:
             supabase = init_supabase()
             supabase.table("email_logs").insert({
@@ -121,6 +156,7 @@ def send_verification_email(email):
         }
         
         result = resend.Emails.send(params)
+        metrics.EMAILS.inc(type="verification", status="success")
         
         # Erfolgreicher Versand -> Log in Supabase
         try:
@@ -140,6 +176,7 @@ def send_verification_email(email):
     except Exception as e:
         # Fehler beim Versand -> Log in Supabase
         error_msg = str(e)
+        metrics.EMAILS.inc(type="verification", status="failed")
         try:
             supabase = init_supabase()
             supabase.table("email_logs").insert({
@@ -212,6 +249,7 @@ def get_daily_stats():
         
     except Exception as e:
         print(f"Daily Stats Error: {e}")
+        metrics.PIPELINE_ERRORS.inc(pipeline="daily_stats")
         return {"sync_count": 0, "error": str(e)}
 
 def calculate_growth(current_followers, platform, handle):
@@ -247,8 +285,11 @@ def calculate_growth(current_followers, platform, handle):
         
     except Exception as e:
         print(f"Growth Calculation Error: {e}")
+        metrics.PIPELINE_ERRORS.inc(pipeline="growth")
         return 0
 
+@metrics.track_sync("instagram")
+@sync_log.logged_sync("instagram", handle_arg=0)
 def run_instagram_sync(profile_url, supabase):
     """Refined Instagram sync using the Statistics API with URL input"""
     api_url = "https://instagram-statistics-api.p.rapidapi.com/community"
@@ -263,6 +304,8 @@ def run_instagram_sync(profile_url, supabase):
     try:
         with st.spinner("PENETRATING INSTAGRAM API..."):
             response = requests.get(api_url, headers=headers, params=params, timeout=15)
+            metrics.record_upstream("rapidapi_instagram", response)
+            sync_log.record_response(response)
             if response.status_code == 200:
                 data = response.json().get("data", {})
                 
@@ -283,6 +326,8 @@ def run_instagram_sync(profile_url, supabase):
                 
                 # Speichern in die Tabelle stats_history
                 supabase.table("stats_history").insert(stats_payload).execute()
+                sync_log.annotate(handle=handle)
+                sync_log.record_rows(1)
                 
                 st.success("SYNC SUCCESSFUL")
                 
@@ -329,13 +374,19 @@ def run_instagram_sync(profile_url, supabase):
                 # Mail senden (silent, kein Error wenn fehlschlägt)
                 send_system_mail(user_email, subject, body, email_type="sync_notification")
                 
+                # Alert-Regeln direkt gegen die neuen Daten prüfen
+                alerts.check_alerts_after_sync(supabase, user_email)
+                
                 return True
             else:
                 st.error(f"API REJECTED: {response.status_code}")
     except Exception as e:
+        sync_log.record_error(e)
         st.error(f"CORE CONNECTION LOST: {e}")
     return False
 
+@metrics.track_sync()
+@sync_log.logged_sync(handle_arg=1)
 def execute_multi_sync(platform, identifier):
     """
     Generische Multi-Platform-Sync-Funktion für TikTok, OnlyFans, etc.
@@ -372,6 +423,8 @@ def execute_multi_sync(platform, identifier):
     try:
         with st.spinner(f"PENETRATING {platform.upper()} CORE..."):
             res = requests.get(config["url"], headers=headers, params={"username": identifier}, timeout=15)
+            metrics.record_upstream(f"rapidapi_{platform}", res)
+            sync_log.record_response(res)
             
             if res.status_code == 200:
                 raw = res.json().get("data", {})
@@ -395,6 +448,7 @@ def execute_multi_sync(platform, identifier):
                 # In Supabase speichern
                 supabase = init_supabase()
                 supabase.table("stats_history").insert(payload).execute()
+                sync_log.record_rows(1)
                 
                 st.success(f"{platform.upper()} SYNC SUCCESSFUL")
                 
@@ -434,15 +488,21 @@ def execute_multi_sync(platform, identifier):
                 """
                 send_system_mail(user_email, subject, body, email_type="sync_notification")
                 
+                # Alert-Regeln direkt gegen die neuen Daten prüfen
+                alerts.check_alerts_after_sync(supabase, user_email)
+                
                 return True
             else:
                 st.error(f"{platform.upper()} API REJECTED: {res.status_code}")
                 return False
                 
     except Exception as e:
+        sync_log.record_error(e)
         st.error(f"{platform.upper()} ENGINE ERROR: {e}")
         return False
 
+@metrics.track_sync("fansly")
+@sync_log.logged_sync("fansly")
 def sync_fansly_api(user_email):
     """
     Synchronisiert Fansly-Account via API-Token.
@@ -484,6 +544,8 @@ def sync_fansly_api(user_email):
                 headers=headers,
                 timeout=10
             )
+            metrics.record_upstream("fansly", res)
+            sync_log.record_response(res)
             
             if res.status_code == 200:
                 data = res.json().get('response', {})
@@ -502,6 +564,8 @@ def sync_fansly_api(user_email):
                 }
                 
                 supabase.table("stats_history").insert(stats_payload).execute()
+                sync_log.annotate(handle=username)
+                sync_log.record_rows(1)
                 
                 # Last Used aktualisieren
                 supabase.table("api_connections")\
@@ -511,12 +575,16 @@ def sync_fansly_api(user_email):
                     .execute()
                 
                 st.success("FANSLY SYNC SUCCESSFUL")
+                
+                # Alert-Regeln direkt gegen die neuen Daten prüfen
+                alerts.check_alerts_after_sync(supabase, user_email)
                 return True
             else:
                 st.error(f"Fansly API Error: {res.status_code} - {res.text}")
                 return False
                 
     except Exception as e:
+        sync_log.record_error(e)
         st.error(f"Fansly API Error: {e}")
         return False
 
@@ -534,7 +602,7 @@ def render_instagram_sync(supabase, context="default"):
 
     if st.button("INITIALIZE SYNC", key=button_key):
         if user_url:
-            if run_instagram_sync(user_url, supabase):
+            if run_instagram_sync(user_url, supabase, trigger=context):
                 st.rerun()
         else:
             st.warning("URL erforderlich.")
@@ -838,7 +906,7 @@ def render_landing_page():
 def check_access(email):
     """Prüft Zugriff - Hardcoded Admin + Datenbank-Prüfung"""
     # Hardcode für Initialzugriff während Setup
-    if email == "janick@icanhasbucket.de":
+    if email in ADMIN_EMAILS:
         st.session_state.access_granted = True
         st.session_state.user_email = email
         return True
@@ -929,6 +997,64 @@ def render_viral_share():
     if st.button("SKIP & ACTIVATE", key="skip_share"):
         st.session_state.full_access = True
         st.rerun()
+@st.fragment
+def render_sync_controls(supabase):
+    """
+    Sidebar Sync-Control als Fragment.
+    
+    Plattform-Auswahl und Handle-Eingabe rerunnen nur dieses Fragment; erst ein
+    erfolgreicher Sync lädt die ganze Seite mit den neuen Daten neu.
+    """
+    st.markdown("### SYSTEM CONTROL")
+    
+    # Meldung des letzten Syncs (überlebt den App-Rerun)
+    notice = st.session_state.pop("sync_notice", None)
+    if notice:
+        st.success(notice)
+    
+    # Dynamische Platform-Liste basierend auf Settings
+    available_platforms = ["instagram", "tiktok"]
+    if st.session_state.adult_content_enabled:
+        available_platforms.append("onlyfans")
+    
+    platform = st.selectbox("PLATFORM", available_platforms, key="platform_select")
+    target = st.text_input("TARGET HANDLE / URL", placeholder="username or URL", key="multi_sync_input")
+    
+    if st.button("INITIALIZE SYNC", key="multi_sync_btn", use_container_width=True):
+        if target:
+            if platform == "instagram":
+                synced = run_instagram_sync(target, supabase, trigger="sidebar")
+            else:
+                synced = execute_multi_sync(platform, target, trigger="sidebar")
+            
+            if synced:
+                st.session_state.sync_notice = f"{platform.upper()} SYNC SUCCESSFUL"
+                st.rerun(scope="app")
+        else:
+            st.warning("Bitte Handle/URL eingeben.")
+
+@st.fragment
+def render_system_settings():
+    """
+    System Settings als Fragment.
+    
+    Nur eine tatsächliche Änderung des Adult-Content-Schalters lädt die ganze
+    Seite neu (Navigation & Plattform-Filter hängen davon ab).
+    """
+    st.markdown("### ⚙️ SYSTEM SETTINGS")
+    
+    # Adult Content Toggle
+    enable_adult = st.toggle(
+        "ADULT CONTENT ENGINE", 
+        value=st.session_state.adult_content_enabled,
+        help="Aktiviert OnlyFans, Fansly und andere Adult-Plattformen.",
+        key="adult_content_toggle"
+    )
+    
+    if enable_adult != st.session_state.adult_content_enabled:
+        st.session_state.adult_content_enabled = enable_adult
+        st.rerun(scope="app")
+
 def render_dashboard_layout():
     """Rendert Haupt-Dashboard mit Sidebar-Navigation und Modul-Routing."""
     supabase = init_supabase()
@@ -947,46 +1073,18 @@ def render_dashboard_layout():
         st.info("ALPHA ACCESS: FREE FOREVER")
         
         # Navigation
-        page = st.radio("NAVIGATION", ["DASHBOARD", "CHANNELS", "FACTORY", "GALLERY", "CRM", "DEALS", "FINANCE", "PLANNER", "REVENUE", "ONLYFANS", "YOUTUBE", "API", "ALERTS", "DEMO"])
+        page = st.radio("NAVIGATION", ["DASHBOARD", "CHANNELS", "FACTORY", "GALLERY", "CRM", "DEALS", "FINANCE", "PLANNER", "REVENUE", "ONLYFANS", "YOUTUBE", "API", "ALERTS", "DEMO"], key="nav_page")
+        tracing.label_run(page)
         
         st.markdown("---")
         
-        # Multi-Platform Sync Control
-        st.markdown("### SYSTEM CONTROL")
-        
-        # Dynamische Platform-Liste basierend auf Settings
-        available_platforms = ["instagram", "tiktok"]
-        if st.session_state.adult_content_enabled:
-            available_platforms.append("onlyfans")
-        
-        platform = st.selectbox("PLATFORM", available_platforms, key="platform_select")
-        target = st.text_input("TARGET HANDLE / URL", placeholder="username or URL", key="multi_sync_input")
-        
-        if st.button("INITIALIZE SYNC", key="multi_sync_btn", use_container_width=True):
-            if target:
-                if platform == "instagram":
-                    run_instagram_sync(target, supabase)
-                else:
-                    execute_multi_sync(platform, target)
-            else:
-                st.warning("Bitte Handle/URL eingeben.")
+        # Multi-Platform Sync Control (Fragment: Eingaben laden die Seite nicht neu)
+        render_sync_controls(supabase)
         
         st.markdown("---")
         
         # System Settings
-        st.markdown("### ⚙️ SYSTEM SETTINGS")
-        
-        # Adult Content Toggle
-        enable_adult = st.toggle(
-            "ADULT CONTENT ENGINE", 
-            value=st.session_state.adult_content_enabled,
-            help="Aktiviert OnlyFans, Fansly und andere Adult-Plattformen.",
-            key="adult_content_toggle"
-        )
-        
-        if enable_adult != st.session_state.adult_content_enabled:
-            st.session_state.adult_content_enabled = enable_adult
-            st.rerun()
+        render_system_settings()
         
         st.markdown("---")
         if st.button("LOGOUT"):
@@ -1000,7 +1098,7 @@ def render_dashboard_layout():
     elif page == "CHANNELS":
         channels.render_channels()
     elif page == "DEALS":
-        deals.render_deals()
+        deals.render_deals(supabase)
     elif page == "CRM":
         crm.render_crm(supabase)
     elif page == "FINANCE":
@@ -1022,104 +1120,145 @@ def render_dashboard_layout():
     elif page == "ALERTS":
         alerts.display_alert_dashboard(supabase)
 
+    # Debug-Panel erst nach dem Rendern (Trace des Runs ist dann vollständig)
+    if is_admin():
+        with st.sidebar:
+            tracing.render_trace_panel()
+
 def render_dashboard(supabase):
-    """Rendert Dashboard mit KPIs, Growth Chart und Instagram Sync."""
+    """
+    Rendert Dashboard mit KPIs, Growth Chart und Instagram Sync.
+    
+    Jeder Bereich ist ein eigenes Fragment mit eigenen Queries, damit Interaktionen
+    (z.B. in der Sidebar) nicht alle Dashboard-Daten neu laden.
+    """
     st.title("CONTENT CORE / ENGINE")
     user_id = st.session_state.get('user_email', 'unknown')
 
     try:
-        stats = supabase.table("stats_history").select("*").eq("user_id", user_id).execute()
+        # Günstiger Existenz-Check statt Laden der kompletten Historie
+        has_stats = supabase.table("stats_history")\
+            .select("id")\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        
+        if not has_stats.data:
+            render_onboarding(supabase, user_id)
+            return
+    except Exception as e:
+        st.error(f"ENGINE CRITICAL ERROR: {e}")
+        return
+    
+    # KPI GRID
+    display_dashboard_kpis(supabase, user_id)
+
+    # Global Reach Metrics
+    display_global_metrics()
+
+    # Cross-Platform Correlation Analytics
+    display_analytics_correlation(supabase)
+
+    # ANALYTICS GRAPH
+    display_growth_trajectory(supabase, user_id)
+    
+    st.markdown("---")
+    st.markdown(f"**LOGGED AS:** {user_id} | **STATUS:** CORE ACTIVE")
+
+@st.fragment
+def render_onboarding(supabase, user_id):
+    """Erster Daten-Import (Instagram Sync oder manuelle Eckdaten)."""
+    st.markdown("### System Initialization")
+    st.info("Willkommen im Terminal. Lade deine ersten Daten.")
+    col1, col2 = st.columns(2)
+    with col1:
+        render_instagram_sync(supabase, context="onboarding")
+    with col2:
+        st.markdown("#### Option B: Manual Data Entry")
+        with st.expander("Eckdaten eingeben"):
+            followers = st.number_input("Follower", value=1000)
+            engagement = st.number_input("Engagement Rate (%)", value=3.5, step=0.1)
+            quality = st.number_input("Quality Score", value=7.0, step=0.1)
+            if st.button("Initialize"):
+                supabase.table("stats_history").insert({
+                    "user_id": user_id,
+                    "platform": "instagram",
+                    "handle": "manual_entry",
+                    "followers": int(followers),
+                    "engagement_rate": engagement / 100,
+                    "avg_likes": int(followers * engagement / 100),
+                    "quality_score": quality
+                }).execute()
+                st.rerun(scope="app")
+
+@st.fragment
+def display_dashboard_kpis(supabase, user_id):
+    """KPI Grid aus dem neuesten stats_history-Eintrag."""
+    try:
+        # Holen der neuesten Daten
+        latest_stats = supabase.table("stats_history")\
+            .select("followers, engagement_rate, quality_score")\
+            .eq("user_id", user_id)\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+
+        if latest_stats.data:
+            latest = latest_stats.data[0]
+            
+            # KPI GRID (4 Spalten) - mit None-Checks
+            col1, col2, col3, col4 = st.columns(4)
+            
+            # Sichere Werte mit Fallbacks - Explizite None-Checks
+            followers_raw = latest.get('followers')
+            followers = int(followers_raw) if followers_raw is not None else 0
+            
+            engagement_raw = latest.get('engagement_rate')
+            engagement = float(engagement_raw) if engagement_raw is not None else 0.0
+            
+            quality_raw = latest.get('quality_score')
+            quality = float(quality_raw) if quality_raw is not None else 0.0
+            
+            # Ensure all values are properly formatted as strings for st.metric()
+            col1.metric("FOLLOWERS", f"{followers:,}")
+            col2.metric("ENGAGEMENT", f"{engagement:.2%}")
+            col3.metric("CORE SCORE", f"{quality:.1f}")
+            
+            # Calculate reach index safely
+            reach_index = int(followers * 0.12) if isinstance(followers, (int, float)) else 0
+            col4.metric("REACH INDEX", f"{reach_index:,}")
+    except Exception as e:
+        st.error(f"ENGINE CRITICAL ERROR: {e}")
+
+@st.fragment
+def display_growth_trajectory(supabase, user_id):
+    """Follower-Verlauf der letzten 10 Einträge inkl. Rohdaten."""
+    st.markdown("### GROWTH TRAJECTORY")
+    
+    try:
+        # Verlauf aus den letzten 10 Einträgen
+        history_query = supabase.table("stats_history")\
+            .select("created_at, handle, followers, quality_score")\
+            .eq("user_id", user_id)\
+            .order("created_at", desc=True)\
+            .limit(10)\
+            .execute()
         
-        if not stats.data:
-            st.markdown("### System Initialization")
-            st.info("Willkommen im Terminal. Lade deine ersten Daten.")
-            col1, col2 = st.columns(2)
-            with col1:
-                render_instagram_sync(supabase, context="onboarding")
-            with col2:
-                st.markdown("#### Option B: Manual Data Entry")
-                with st.expander("Eckdaten eingeben"):
-                    followers = st.number_input("Follower", value=1000)
-                    engagement = st.number_input("Engagement Rate (%)", value=3.5, step=0.1)
-                    quality = st.number_input("Quality Score", value=7.0, step=0.1)
-                    if st.button("Initialize"):
-                        supabase.table("stats_history").insert({
-                            "user_id": user_id,
-                            "platform": "instagram",
-                            "handle": "manual_entry",
-                            "followers": int(followers),
-                            "engagement_rate": engagement / 100,
-                            "avg_likes": int(followers * engagement / 100),
-                            "quality_score": quality
-                        }).execute()
-                        st.rerun()
+        if history_query.data:
+            df = pd.DataFrame(history_query.data)
+            df['created_at'] = pd.to_datetime(df['created_at'])
+            # Wir drehen das DF um, damit der Trend von alt nach neu geht
+            st.line_chart(df.sort_values("created_at").set_index("created_at")["followers"])
+            
+            # RAW DATA TABELLE
+            with st.expander("VIEW RAW SYSTEM DATA"):
+                st.table(df[["created_at", "handle", "followers", "quality_score"]])
         else:
-            # Holen der neuesten Daten
-            latest_stats = supabase.table("stats_history")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .order("created_at", desc=True)\
-                .limit(1)\
-                .execute()
-
-            if latest_stats.data:
-                latest = latest_stats.data[0]
-                
-                # KPI GRID (4 Spalten) - mit None-Checks
-                col1, col2, col3, col4 = st.columns(4)
-                
-                # Sichere Werte mit Fallbacks - Explizite None-Checks
-                followers_raw = latest.get('followers')
-                followers = int(followers_raw) if followers_raw is not None else 0
-                
-                engagement_raw = latest.get('engagement_rate')
-                engagement = float(engagement_raw) if engagement_raw is not None else 0.0
-                
-                quality_raw = latest.get('quality_score')
-                quality = float(quality_raw) if quality_raw is not None else 0.0
-                
-                # Ensure all values are properly formatted as strings for st.metric()
-                col1.metric("FOLLOWERS", f"{followers:,}")
-                col2.metric("ENGAGEMENT", f"{engagement:.2%}")
-                col3.metric("CORE SCORE", f"{quality:.1f}")
-                
-                # Calculate reach index safely
-                reach_index = int(followers * 0.12) if isinstance(followers, (int, float)) else 0
-                col4.metric("REACH INDEX", f"{reach_index:,}")
-
-                # Global Reach Metrics
-                display_global_metrics()
-
-                # Cross-Platform Correlation Analytics
-                display_analytics_correlation(supabase)
-
-                # ANALYTICS GRAPH
-                st.markdown("### GROWTH TRAJECTORY")
-                # Verlauf aus den letzten 10 Einträgen
-                history_query = supabase.table("stats_history")\
-                    .select("*")\
-                    .eq("user_id", user_id)\
-                    .order("created_at", desc=True)\
-                    .limit(10)\
-                    .execute()
-                
-                if history_query.data:
-                    df = pd.DataFrame(history_query.data)
-                    df['created_at'] = pd.to_datetime(df['created_at'])
-                    # Wir drehen das DF um, damit der Trend von alt nach neu geht
-                    st.line_chart(df.sort_values("created_at").set_index("created_at")["followers"])
-                    
-                    # RAW DATA TABELLE
-                    with st.expander("VIEW RAW SYSTEM DATA"):
-                        st.table(df[["created_at", "handle", "followers", "quality_score"]])
-                else:
-                    st.info("KEINE DATEN IM CORE. NUTZE DIE SIDEBAR FÜR DEN ERSTEN SYNC.")
-                
-                st.markdown("---")
-                st.markdown(f"**LOGGED AS:** {user_id} | **STATUS:** CORE ACTIVE")
+            st.info("KEINE DATEN IM CORE. NUTZE DIE SIDEBAR FÜR DEN ERSTEN SYNC.")
     except Exception as e:
         st.error(f"ENGINE CRITICAL ERROR: {e}")
 
+@st.fragment
 def display_global_metrics():
     """
     Zeigt plattformübergreifende Reichweiten-Metriken an.
@@ -1214,12 +1353,114 @@ def display_global_metrics():
         # Fallback: Zeige freundliche Nachricht statt Fehler
         st.info("💡 Globale Reichweiten-Metriken werden berechnet. Bitte synchronisiere mehr Daten.")
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_correlation_data(_supabase, user_email, stats_version, revenue_version):
+    """
+    Tägliche Reichweite (stats_rollups) und Umsatz-Historie des Users plus Revenue-Vor-Aggregate.
+    
+    Gecacht pro Daten-Version; die Vor-Aggregate (stündlich bis monatlich) werden
+    einmal berechnet und je nach sichtbarem Zeitraum ausgewählt.
+    
+    Returns:
+        tuple: (df_reach, df_rev, Revenue-Pyramide aus downsample.build_pyramid())
+    """
+    data = data_loader.fetch_concurrently({
+        "reach": lambda: rollups.fetch_rollups(_supabase, user_email, "day"),
+        "revenue": lambda: data_loader.fetch_all_rows(_supabase, "revenue_history", ", ".join(CORRELATION_REVENUE_COLUMNS),
+                                                      user_email)
+    })
+    
+    # Letzter Follower-Stand pro Tag & Handle
+    df_reach = data["reach"].rename(columns={"last_at": "created_at", "followers_last": "followers"})\
+        [["created_at", "followers", "platform", "handle"]]
+    
+    df_rev = pd.DataFrame(data["revenue"], columns=CORRELATION_REVENUE_COLUMNS)
+    df_rev['created_at'] = pd.to_datetime(df_rev['created_at'], utc=True)
+    df_rev['amount_net'] = pd.to_numeric(df_rev['amount_net'], errors="coerce").fillna(0.0)
+    df_rev['platform'] = df_rev['platform'].fillna("unknown")
+    
+    pyramid = downsample.build_pyramid(df_rev, "created_at", "amount_net", by=["platform"])
+    return df_reach, df_rev, pyramid
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_reach_revenue_correlation(_supabase, user_email, stats_version, revenue_version):
+    """
+    Lagged Cross-Correlation & Rolling-Korrelation zwischen Follower-Wachstum und Umsatz.
+    
+    Gecacht pro Daten-Version, damit die Analyse bei jedem Dashboard-Load günstig bleibt.
+    
+    Returns:
+        dict: Ergebnis von correlation.reach_revenue_correlation()
+    """
+    df_reach, df_rev, _ = load_correlation_data(_supabase, user_email, stats_version, revenue_version)
+    return correlation.reach_revenue_correlation(df_reach, df_rev)
+
+def display_reach_revenue_lag(result):
+    """Zeigt, ob und mit wie vielen Tagen Vorlauf Reichweiten-Wachstum den Umsatz anführt."""
+    import plotly.express as px
+    
+    st.markdown("### 🔗 REACH → REVENUE LAG")
+    
+    pairs = result["pairs"]
+    if not st.session_state.get('adult_content_enabled', False):
+        adult = pairs['reach_platform'].isin(ADULT_PLATFORMS) | pairs['revenue_platform'].isin(ADULT_PLATFORMS)
+        pairs = pairs[~adult]
+    
+    if pairs.empty:
+        st.info(f"💡 Für die Lag-Analyse werden mindestens {correlation.MIN_OVERLAP_DAYS} Tage mit Reichweiten- "
+                "und Umsatzdaten benötigt.")
+        return
+    
+    top = pairs.iloc[0]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("STÄRKSTES PAAR", f"{top['reach_platform'].upper()} → {top['revenue_platform'].upper()}")
+    col2.metric("VORLAUF", f"{int(top['best_lag'])} Tage")
+    col3.metric("KORRELATION", f"{top['correlation']:.2f}", f"{top['correlation'] - top['lag0_correlation']:+.2f} vs. Lag 0")
+    
+    st.dataframe(
+        pairs,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "reach_platform": st.column_config.TextColumn("Reichweite"),
+            "revenue_platform": st.column_config.TextColumn("Umsatz"),
+            "best_lag": st.column_config.NumberColumn("Bester Lag (Tage)"),
+            "correlation": st.column_config.NumberColumn("r (bester Lag)", format="%.2f"),
+            "lag0_correlation": st.column_config.NumberColumn("r (Lag 0)", format="%.2f"),
+            "days": st.column_config.NumberColumn("Tage")
+        }
+    )
+    
+    # Rolling-Korrelation des stärksten Paars beim besten Lag
+    rolling = result["rolling"]
+    rolling = rolling[(rolling['reach_platform'] == top['reach_platform']) &
+                      (rolling['revenue_platform'] == top['revenue_platform'])]
+    if not rolling.empty:
+        fig_rolling = px.line(
+            rolling,
+            x="date",
+            y="correlation",
+            title=f"🔁 {correlation.ROLLING_WINDOW_DAYS}-Tage Rolling-Korrelation (Lag {int(top['best_lag'])} Tage)",
+            labels={"date": "Datum", "correlation": "r"}
+        )
+        fig_rolling.update_layout(height=300, yaxis_range=[-1, 1])
+        st.plotly_chart(fig_rolling, use_container_width=True)
+    
+    st.caption("Follower-Deltas und Netto-Umsatz auf Tagesbasis; positiver Lag = Reichweite läuft dem Umsatz voraus.")
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_reach_rollups(_supabase, user_email, granularity, since, stats_version):
+    """Follower-Buckets einer Granularität für den sichtbaren Zeitraum (gecacht pro Daten-Version)."""
+    return rollups.fetch_rollups(_supabase, user_email, granularity, since=since)
+
+@st.fragment
 def display_analytics_correlation(supabase):
     """
     Zeigt Cross-Platform Korrelations-Analytics.
     
     Visualisiert Reichweiten-Wachstum und Revenue-Entwicklung
-    über alle Plattformen hinweg mit Plotly Charts.
+    über alle Plattformen hinweg mit Plotly Charts. Linien werden per LTTB,
+    Balken per Zeit-Buckets auf eine feste Punktzahl reduziert.
     """
     import plotly.express as px
     
@@ -1229,29 +1470,47 @@ def display_analytics_correlation(supabase):
     user_email = st.session_state.get('user_email', 'unknown')
     
     try:
-        # Daten abrufen
-        reach = supabase.table("stats_history")\
-            .select("created_at, followers, platform, handle")\
-            .eq("user_id", user_email)\
-            .order("created_at")\
-            .execute()
+        # Daten abrufen (Versions-Checks parallel, Daten gecacht)
+        versions = data_loader.fetch_concurrently({
+            "stats": lambda: data_loader.table_version(supabase, "stats_history", user_email),
+            "revenue": lambda: data_loader.table_version(supabase, "revenue_history", user_email)
+        })
+        df_reach, df_rev, pyramid = load_correlation_data(supabase, user_email, versions["stats"], versions["revenue"])
         
-        rev = supabase.table("revenue_history")\
-            .select("created_at, amount_net, platform")\
-            .eq("user_id", user_email)\
-            .order("created_at")\
-            .execute()
+        if df_reach.empty and df_rev.empty:
+            st.info("💡 Sammle mehr Datenpunkte für die Korrelations-Analyse.")
+            st.markdown("""
+            **Tipp:** Synchronisiere Daten von verschiedenen Plattformen:
+            - Instagram, TikTok, YouTube (Reichweite)
+            - OnlyFans, Fansly (Revenue)
+            """)
+            return
         
-        if reach.data and len(reach.data) > 0:
-            df_reach = pd.DataFrame(reach.data)
-            df_reach['created_at'] = pd.to_datetime(df_reach['created_at'])
+        visible_range = st.radio(
+            "Zeitraum",
+            list(downsample.VISIBLE_RANGES.keys()),
+            index=1,
+            horizontal=True,
+            key="correlation_range"
+        )
+        days = downsample.VISIBLE_RANGES[visible_range]
+        now = pd.Timestamp.now(tz="UTC")
+        
+        if not df_reach.empty:
+            # Buckets aus stats_rollups statt Roh-Snapshots (wenige hundert Zeilen pro Serie)
+            granularity = rollups.choose_granularity(days)
+            since = None if days is None else (now - pd.Timedelta(days=days)).floor("D").isoformat()
+            reach_window = load_reach_rollups(supabase, user_email, granularity, since, versions["stats"])\
+                .rename(columns={"bucket": "created_at", "followers_last": "followers"})
+            reach_points = downsample.downsample_lines(reach_window, "created_at", "followers", by=["platform", "handle"])
             
             # Reichweiten-Wachstum Chart
             fig_reach = px.line(
-                df_reach,
+                reach_points,
                 x="created_at",
                 y="followers",
                 color="platform",
+                line_group="handle",
                 title="📈 Reichweiten-Wachstum über alle Plattformen",
                 labels={"created_at": "Datum", "followers": "Follower", "platform": "Plattform"}
             )
@@ -1261,18 +1520,19 @@ def display_analytics_correlation(supabase):
                 height=400
             )
             st.plotly_chart(fig_reach, use_container_width=True)
+            st.caption(f"{len(reach_points):,} von {len(reach_window):,} Buckets ({granularity}) dargestellt (LTTB)")
         
-        if rev.data and len(rev.data) > 0:
-            df_rev = pd.DataFrame(rev.data)
-            df_rev['created_at'] = pd.to_datetime(df_rev['created_at'])
+        if not df_rev.empty:
+            _, start, end = downsample.visible_window(df_rev, "created_at", days, now=now)
+            bars, freq = downsample.select_bars(pyramid, "created_at", start, end)
             
             # Revenue Chart
             fig_rev = px.bar(
-                df_rev,
+                bars,
                 x="created_at",
                 y="amount_net",
                 color="platform",
-                title="💰 Daily Net Revenue ($)",
+                title=f"💰 {REVENUE_BUCKET_LABELS[freq]} Net Revenue ($)",
                 labels={"created_at": "Datum", "amount_net": "Net Revenue ($)", "platform": "Plattform"}
             )
             fig_rev.update_layout(
@@ -1282,19 +1542,19 @@ def display_analytics_correlation(supabase):
             )
             st.plotly_chart(fig_rev, use_container_width=True)
         
-        if (not reach.data or len(reach.data) == 0) and (not rev.data or len(rev.data) == 0):
-            st.info("💡 Sammle mehr Datenpunkte für die Korrelations-Analyse.")
-            st.markdown("""
-            **Tipp:** Synchronisiere Daten von verschiedenen Plattformen:
-            - Instagram, TikTok, YouTube (Reichweite)
-            - OnlyFans, Fansly (Revenue)
-            """)
+        # Lagged Cross-Correlation (führt Reichweite den Umsatz an?)
+        display_reach_revenue_lag(
+            load_reach_revenue_correlation(supabase, user_email, versions["stats"], versions["revenue"])
+        )
             
     except Exception as e:
         st.error(f"Correlation Analytics Error: {e}")
 
 # --- MAIN ORCHESTRATION ---
 def main():
+    tracing.begin_run()
+    start_metrics_server()
+    start_sync_log()
     render_head()
     render_styles()
     
@@ -1322,17 +1582,25 @@ def main():
                 st.success(f"Email {email} confirmed! Login now.")
             except Exception as e: st.error(f"Error: {e}")
 
+    # CPU-Profiling des kompletten Runs (Admin: ?profile=cprofile|pyinstrument, ?profile=off)
+    profile_mode = profiling.update_mode(is_admin())
+
     # Routing
-    if not st.session_state.access_granted:
-        if st.session_state.view == "landing":
-            render_landing_page()
-        else:
-            render_auth_interface()
-    else:
-        if not st.session_state.full_access:
-            render_viral_share()
+    with profiling.profile_run(profile_mode, label=st.session_state.get("nav_page", "app")):
+        if not st.session_state.access_granted:
+            if st.session_state.view == "landing":
+                render_landing_page()
+            else:
+                render_auth_interface()
         else:
-            render_dashboard_layout()
+            if not st.session_state.full_access:
+                render_viral_share()
+            else:
+                render_dashboard_layout()
+
+    if is_admin():
+        with st.sidebar:
+            profiling.render_profile_panel(profile_mode)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,212 @@
+"""
+FAKE SUPABASE CLIENT
+In-Memory Nachbildung der PostgREST Query-API mit Zählern für Queries und übertragene Bytes
+"""
+
+import json
+import operator
+import threading
+
+class FakeResponse:
+    """Antwort wie supabase-py (data + optional count)."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+# PostgREST-Filter -> Vergleich
+OPERATORS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le
+}
+
+def _matches(value, op, expected):
+    """Vergleich wie PostgREST (NULL matcht keinen Vergleich)."""
+    if op == "in":
+        return value in expected
+    if op == "is":
+        return value is expected
+    if value is None:
+        return False
+    try:
+        return OPERATORS[op](value, expected)
+    except TypeError:
+        # z.B. ISO-Timestamp gegen datetime
+        return OPERATORS[op](str(value), str(expected))
+
+def _sort_key(value):
+    """NULLs zuletzt, gemischte Typen stabil vergleichbar."""
+    return (value is None, value if value is not None else 0)
+
+class FakeQuery:
+    """Builder für table(...).select/eq/order/range/... .execute()."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.count_mode = None
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.row_limit = None
+
+    # --- Aktionen ---
+    def select(self, columns="*", count=None):
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None):
+        # Benchmarks messen nur Lesepfade; Upserts werden wie Inserts gezählt
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # --- Filter ---
+    def _filter(self, column, op, value):
+        self.filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "is", None if value in (None, "null") else value)
+
+    # --- Sortierung & Pagination ---
+    def order(self, column, desc=False):
+        # "a,b,c" wie in fetch_all_rows
+        for name in column.split(","):
+            self.orders.append((name.strip(), desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def range(self, start, end):
+        self.offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def _select_rows(self):
+        rows = [row for row in self.client.tables.get(self.table, [])
+                if all(_matches(row.get(col), op, value) for col, op, value in self.filters)]
+        # Stabile Mehrfach-Sortierung: letzte Spalte zuerst
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+        return rows
+
+    def execute(self):
+        with self.client.lock:
+            if self.action == "insert":
+                rows = self.payload if isinstance(self.payload, list) else [self.payload]
+                self.client.tables.setdefault(self.table, []).extend(dict(row) for row in rows)
+                return self.client.record(self.table, FakeResponse(rows))
+            if self.action == "update":
+                rows = self._select_rows()
+                for row in rows:
+                    row.update(self.payload)
+                return self.client.record(self.table, FakeResponse(rows))
+            if self.action == "delete":
+                rows = self._select_rows()
+                ids = {id(row) for row in rows}
+                self.client.tables[self.table] = [row for row in self.client.tables.get(self.table, []) if id(row) not in ids]
+                return self.client.record(self.table, FakeResponse(rows))
+
+            rows = self._select_rows()
+            total = len(rows) if self.count_mode else None
+            end = None if self.row_limit is None else self.offset + self.row_limit
+            rows = rows[self.offset:end]
+            if self.columns.strip() != "*":
+                names = [name.strip() for name in self.columns.split(",")]
+                rows = [{name: row.get(name) for name in names} for row in rows]
+            else:
+                rows = [dict(row) for row in rows]
+            return self.client.record(self.table, FakeResponse(rows, total))
+
+class FakeRpc:
+    """rpc(name, params).execute() über registrierte Python-Handler."""
+
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        handler = self.client.rpc_handlers.get(self.name)
+        data = handler(self.client.tables, **self.params) if handler else []
+        with self.client.lock:
+            return self.client.record(f"rpc:{self.name}", FakeResponse(data))
+
+class FakeSupabase:
+    """
+    In-Memory Client mit derselben Aufruf-Syntax wie supabase-py.
+
+    Args:
+        tables: {Tabelle: Liste von dicts}
+        rpc_handlers: {RPC-Name: Funktion(tables, **params)}
+    """
+
+    def __init__(self, tables=None, rpc_handlers=None):
+        self.tables = tables or {}
+        self.rpc_handlers = rpc_handlers or {}
+        self.lock = threading.RLock()
+        self.reset_counters()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def reset_counters(self):
+        self.queries = 0
+        self.bytes_transferred = 0
+        self.per_table = {}
+
+    def record(self, table, response):
+        """Zählt Query und Antwortgröße (JSON wie über PostgREST)."""
+        size = len(json.dumps(response.data, default=str).encode("utf-8"))
+        self.queries += 1
+        self.bytes_transferred += size
+        stats = self.per_table.setdefault(table, {"queries": 0, "bytes": 0})
+        stats["queries"] += 1
+        stats["bytes"] += size
+        return response
@@ -0,0 +1,171 @@
+"""
+BENCHMARK FIXTURES
+Synthetische Tabellen (modules/synthetic.py) als In-Memory Zeilen für den Fake-Client
+"""
+
+import pandas as pd
+from modules.synthetic import iter_dataset
+from modules.rollups import GRANULARITIES, METRICS as ROLLUP_METRICS
+
+# Creator, dessen Seiten gerendert werden (erster synthetischer Creator)
+BENCH_USER = "creator00000@example.com"
+
+def _records(frame):
+    """DataFrame -> PostgREST-ähnliche dicts (ISO-Timestamps, None statt NaN)."""
+    frame = frame.copy()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.DatetimeTZDtype):
+            frame[col] = frame[col].dt.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+def _customer_tables(revenue):
+    """Abgeleitete Kunden-Tabellen (in Supabase per Trigger/View gepflegt)."""
+    if revenue.empty:
+        return {"customer_activity": [], "of_customers": [], "whale_watcher": []}
+
+    now = revenue["created_at"].max()
+    grouped = revenue.groupby(["user_id", "platform", "source"])
+    activity = grouped.agg(
+        first_seen=("created_at", "min"),
+        last_seen=("created_at", "max"),
+        lifetime_spend=("amount_net", "sum"),
+        purchase_count=("amount_net", "size")
+    ).reset_index().rename(columns={"source": "customer"})
+    for days in (7, 30):
+        recent = revenue[revenue["created_at"] >= now - pd.Timedelta(days=days)]
+        spend = recent.groupby(["user_id", "platform", "source"])["amount_net"].sum()
+        activity[f"spend_{days}d"] = spend.reindex(
+            pd.MultiIndex.from_frame(activity[["user_id", "platform", "customer"]])
+        ).fillna(0.0).to_numpy()
+
+    customers = activity[activity["platform"] == "onlyfans"].rename(columns={
+        "customer": "customer_username",
+        "lifetime_spend": "total_spent",
+        "last_seen": "last_purchase_date"
+    })
+    customers = customers.assign(
+        customer_id=customers["customer_username"],
+        subscription_status="active",
+        avg_purchase_amount=(customers["total_spent"] / customers["purchase_count"]).round(2)
+    )[["user_id", "customer_username", "customer_id", "total_spent", "subscription_status",
+       "last_purchase_date", "purchase_count", "avg_purchase_amount"]]
+
+    return {
+        "customer_activity": _records(activity),
+        "of_customers": _records(customers),
+        "whale_watcher": _records(customers.sort_values("total_spent", ascending=False))
+    }
+
+def _global_reach(stats):
+    """global_reach_summary: letzter Follower-Stand pro Handle, summiert pro User."""
+    if stats.empty:
+        return []
+
+    latest = stats.sort_values("created_at").groupby(["user_id", "platform", "handle"]).tail(1)
+    rows = []
+    for user_id, group in latest.groupby("user_id"):
+        group = group.sort_values("followers", ascending=False)
+        rows.append({
+            "user_id": user_id,
+            "total_followers": int(group["followers"].sum()),
+            "platform_count": int(group["platform"].nunique()),
+            "platform_breakdown": group[["platform", "followers", "handle"]].to_dict("records"),
+            "last_updated": group["created_at"].max().isoformat()
+        })
+    return rows
+
+def _bucket_starts(created_at, granularity):
+    """date_trunc(granularity) in UTC (Wochen beginnen montags wie in Postgres)."""
+    naive = created_at.dt.tz_convert(None)
+    if granularity == "week":
+        return naive.dt.to_period("W").dt.start_time.dt.tz_localize("UTC")
+    return naive.dt.floor("h" if granularity == "hour" else "D").dt.tz_localize("UTC")
+
+def _stats_rollups(stats):
+    """stats_rollups (in Supabase per Trigger aus stats_history gepflegt, Migration 018)."""
+    if stats.empty:
+        return []
+
+    frame = stats.assign(
+        platform=stats["platform"].fillna("unknown"),
+        handle=stats["handle"].fillna(""),
+        likes=stats["total_likes"],
+        views=stats["video_views"]
+    ).sort_values("created_at")
+    keys = ["user_id", "platform", "handle"]
+    stat_funcs = [("first", "first"), ("min", "min"), ("max", "max"), ("last", "last")]
+
+    parts = []
+    for granularity in GRANULARITIES:
+        grouped = frame.assign(bucket=_bucket_starts(frame["created_at"], granularity)).groupby(keys + ["bucket"])
+        agg = grouped.agg(
+            samples=("created_at", "size"),
+            first_at=("created_at", "min"),
+            last_at=("created_at", "max"),
+            **{f"{metric}_{stat}": (metric, func) for metric in ROLLUP_METRICS for stat, func in stat_funcs}
+        ).reset_index()
+        # open = letzter Wert des vorherigen Buckets der Serie (erster Bucket: erster Wert)
+        series = agg.groupby(keys)
+        for metric in ROLLUP_METRICS:
+            agg[f"{metric}_open"] = series[f"{metric}_last"].shift().fillna(agg[f"{metric}_first"])
+            agg[f"{metric}_delta"] = agg[f"{metric}_last"] - agg[f"{metric}_open"]
+        parts.append(agg.drop(columns=[f"{metric}_first" for metric in ROLLUP_METRICS]).assign(granularity=granularity))
+
+    return _records(pd.concat(parts, ignore_index=True))
+
+def deal_pipeline_stats(tables, p_user_id):
+    """Nachbildung der RPC deal_pipeline_stats (Migration 010)."""
+    deals = [row for row in tables.get("deals", []) if row.get("user_id") == p_user_id]
+    status_counts = {}
+    for row in deals:
+        status_counts[row.get("status") or "Unknown"] = status_counts.get(row.get("status") or "Unknown", 0) + 1
+
+    currency_stats = {}
+    for currency in {row.get("currency") or "USD" for row in deals if row.get("amount") is not None}:
+        group = [row for row in deals if (row.get("currency") or "USD") == currency and row.get("amount") is not None]
+        currency_stats[currency] = {
+            "pipeline_value": sum(row["amount"] for row in group if row.get("status") != "Closed"),
+            "closed_value": sum(row["amount"] for row in group if row.get("status") == "Closed"),
+            "avg_deal_size": round(sum(row["amount"] for row in group) / len(group), 2)
+        }
+
+    return [{
+        "deal_count": len(deals),
+        "closed_this_month": 0,
+        "status_counts": status_counts,
+        "currency_stats": currency_stats
+    }]
+
+RPC_HANDLERS = {
+    "deal_pipeline_stats": deal_pipeline_stats
+}
+
+def load_fixtures(scale, seed=42):
+    """
+    Erzeugt alle Tabellen einer Skalierung als In-Memory Zeilen.
+
+    Args:
+        scale: Schlüssel aus modules.synthetic.SCALES
+        seed: Seed für reproduzierbare Daten
+
+    Returns:
+        dict: {Tabelle: Liste von dicts} inkl. abgeleiteter Kunden-/Reach-Tabellen
+    """
+    frames = {}
+    for table, frame in iter_dataset(scale, seed=seed):
+        frames.setdefault(table, []).append(frame)
+    frames = {table: pd.concat(parts, ignore_index=True) for table, parts in frames.items()}
+
+    tables = {}
+    for table, frame in frames.items():
+        frame.insert(0, "id", range(1, len(frame) + 1))
+        # Versions-Spalte aus Migration 022 (per Trigger gepflegt)
+        if table == "revenue_history":
+            frame["updated_at"] = frame["created_at"]
+        tables[table] = _records(frame)
+
+    tables.update(_customer_tables(frames["revenue_history"]))
+    tables["global_reach_summary"] = _global_reach(frames["stats_history"])
+    tables["stats_rollups"] = _stats_rollups(frames["stats_history"])
+    return tables
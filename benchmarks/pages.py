@@ -0,0 +1,49 @@
+"""
+BENCHMARK PAGES
+Render-Pfade als AppTest-Scripts (jede Funktion wird von AppTest.from_function als eigenes Script ausgeführt)
+"""
+
+# Hinweis: Die Funktionen laufen als eigenständiger Script-Quelltext -> Imports innerhalb der Funktion
+
+def dashboard_page(client):
+    from unittest import mock
+    # app.py erstellt den Client beim Import -> auf den Fake umbiegen
+    with mock.patch("supabase.create_client", return_value=client):
+        import app
+    app.supabase = client
+    app.get_supabase_client.clear()
+    app.render_dashboard(client)
+
+def finance_page(client):
+    from modules import finance
+    finance.render_finance(client)
+
+def crm_page(client):
+    from modules import crm
+    crm.render_crm(client)
+
+def revenue_vault_page(client):
+    from modules import revenue_vault
+    revenue_vault.render_revenue_vault(client)
+
+def whale_watcher_page(client):
+    from modules import onlyfans_analytics
+    onlyfans_analytics.display_whale_watcher(client)
+
+def alert_dashboard_page(client):
+    from modules import alerts
+    alerts.display_alert_dashboard(client)
+
+# Buttons, die nach dem ersten Render geklickt werden (Label), damit der teure Pfad mitgemessen wird
+PAGE_CLICKS = {
+    "alerts": ["🔍 JETZT PRÜFEN"]
+}
+
+PAGES = {
+    "dashboard": dashboard_page,
+    "finance": finance_page,
+    "crm": crm_page,
+    "revenue_vault": revenue_vault_page,
+    "whale_watcher": whale_watcher_page,
+    "alerts": alert_dashboard_page
+}
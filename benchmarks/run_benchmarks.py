@@ -0,0 +1,189 @@
+import os
+import re
+import sys
+import json
+import time
+import tracemalloc
+
+# Repo-Root für "modules"/"benchmarks" Import (Script läuft als benchmarks/run_benchmarks.py)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.fixtures import BENCH_USER, RPC_HANDLERS, load_fixtures
+from benchmarks.pages import PAGES, PAGE_CLICKS
+
+# Konfiguration per Umgebungsvariablen
+BENCH_SCALES = os.environ.get("BENCH_SCALES", "10k,100k").split(",")
+BENCH_PAGES = os.environ.get("BENCH_PAGES", ",".join(PAGES)).split(",")
+BENCH_SEED = int(os.environ.get("BENCH_SEED", "42"))
+# 1 = Budgets aus den Messwerten (+ Headroom) neu schreiben statt prüfen
+BENCH_UPDATE_BUDGETS = os.environ.get("BENCH_UPDATE_BUDGETS") == "1"
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+# Toleranz beim Neuschreiben der Budgets: Queries und Bytes sind mit festem Seed deterministisch,
+# Laufzeit und Speicher schwanken je nach Runner
+BUDGET_EXTRA_QUERIES = 1
+BUDGET_BYTES_FACTOR = 1.1
+BUDGET_MEMORY_FACTOR = 1.25
+BUDGET_TIME_FACTOR = 2.0
+# Absoluter Zuschlag, damit sehr kleine Messwerte nicht an Rundung/Jitter scheitern
+BUDGET_MEMORY_SLACK_MB = 0.5
+BUDGET_TIME_SLACK_MS = 50.0
+APP_TIMEOUT = 300
+
+# Gemessene Werte pro Seite & Skalierung (alle als Obergrenze im Budget)
+METRICS = ["wall_ms", "queries", "bytes", "peak_mb", "warm_ms", "warm_queries"]
+
+# st.error-Meldungen der Fehler-Handler ("Finance Error: ...", "ENGINE CRITICAL ERROR: ...",
+# "Fehler beim Laden: ..."); andere st.error-Ausgaben (z.B. HIGH-Alerts) sind normaler Inhalt
+ERROR_HANDLER_PATTERN = re.compile(r"^[^:]*(Error|ERROR|Fehler|FEHLER|CONNECTION LOST)[^:]*:")
+
+# app.py prüft beim Import die Secrets (Werte werden vom Fake-Client ignoriert)
+BENCH_SECRETS = {
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_KEY": "benchmark",
+    "BREVO_API_KEY": "benchmark",
+    "RAPIDAPI_KEY": "benchmark",
+    "GEMINI_API_KEY": "benchmark"
+}
+
+def new_app(page, client):
+    """Frische AppTest-Instanz mit Bench-User und leeren Caches."""
+    at = AppTest.from_function(PAGES[page], args=(client,), default_timeout=APP_TIMEOUT)
+    for key, value in BENCH_SECRETS.items():
+        at.secrets[key] = value
+    at.session_state["user_email"] = BENCH_USER
+    at.session_state["adult_content_enabled"] = True
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    return at
+
+def run_page(at, page):
+    """Render + Klicks aus PAGE_CLICKS (jeder Klick ist ein weiterer Script-Durchlauf)."""
+    at.run()
+    for label in PAGE_CLICKS.get(page, []):
+        buttons = [button for button in at.button if button.label == label]
+        if not buttons:
+            raise RuntimeError(f"{page}: Button '{label}' nicht gefunden")
+        buttons[0].click()
+        at.run()
+
+def timed_run(at, page, client):
+    """Ein Seitenaufruf: (Millisekunden, Queries, Bytes)."""
+    client.reset_counters()
+    started = time.perf_counter()
+    run_page(at, page)
+    return (time.perf_counter() - started) * 1000, client.queries, client.bytes_transferred
+
+def page_errors(at):
+    """Exceptions und von den Fehler-Handlern der Seiten per st.error angezeigte Exceptions."""
+    return [str(e.value) for e in at.exception] + \
+        [f"st.error: {e.value}" for e in at.error if ERROR_HANDLER_PATTERN.match(str(e.value))]
+
+def benchmark_page(page, client):
+    """
+    Misst eine Seite: kalter Lauf (leere Caches), warmer Rerun und Peak-Memory.
+
+    Peak-Memory wird in einem eigenen kalten Lauf gemessen, weil tracemalloc
+    die Laufzeit deutlich verlangsamt.
+
+    Returns:
+        dict: METRICS + errors (Exceptions der Seite)
+    """
+    at = new_app(page, client)
+    wall_ms, queries, transferred = timed_run(at, page, client)
+    errors = page_errors(at)
+    warm_ms, warm_queries, _ = timed_run(at, page, client)
+
+    at = new_app(page, client)
+    tracemalloc.start()
+    run_page(at, page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "queries": queries,
+        "bytes": transferred,
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "warm_ms": round(warm_ms, 1),
+        "warm_queries": warm_queries,
+        "errors": errors
+    }
+
+def load_budgets():
+    if not os.path.exists(BUDGETS_PATH):
+        return {}
+    with open(BUDGETS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def budget_for(metric, value):
+    """Obergrenze aus einem Messwert (Queries +1, Bytes +10%, Peak-Memory +25% +0.5 MB, Laufzeit x2 +50 ms)."""
+    if "queries" in metric:
+        return value + BUDGET_EXTRA_QUERIES
+    if metric == "bytes":
+        return int(value * BUDGET_BYTES_FACTOR)
+    if metric == "peak_mb":
+        return round(value * BUDGET_MEMORY_FACTOR + BUDGET_MEMORY_SLACK_MB, 1)
+    return round(value * BUDGET_TIME_FACTOR + BUDGET_TIME_SLACK_MS, 1)
+
+def save_budgets(results):
+    budgets = load_budgets()
+    for (page, scale), measured in results.items():
+        budgets.setdefault(page, {})[scale] = {metric: budget_for(metric, measured[metric]) for metric in METRICS}
+    with open(BUDGETS_PATH, "w", encoding="utf-8") as f:
+        json.dump(budgets, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def check_budgets(results, budgets):
+    """Liste der Budget-Verletzungen (fehlende Budgets werden gemeldet, nicht als Fehler gewertet)."""
+    violations = []
+    for (page, scale), measured in results.items():
+        budget = budgets.get(page, {}).get(scale)
+        if budget is None:
+            print(f"⚠️ Kein Budget für {page} @ {scale}")
+            continue
+        for metric in METRICS:
+            if metric in budget and measured[metric] > budget[metric]:
+                violations.append(f"{page} @ {scale}: {metric} {measured[metric]} > Budget {budget[metric]}")
+    return violations
+
+def run_benchmarks():
+    started = time.time()
+    results = {}
+    failures = []
+
+    for scale in BENCH_SCALES:
+        fixture_started = time.time()
+        client = FakeSupabase(load_fixtures(scale, seed=BENCH_SEED), RPC_HANDLERS)
+        rows = sum(len(rows) for rows in client.tables.values())
+        print(f"\n=== Skalierung {scale}: {rows:,} Zeilen (Fixtures in {time.time() - fixture_started:.2f}s) ===")
+        print(f"{'PAGE':<16}{'WALL ms':>10}{'QUERIES':>9}{'KB':>10}{'PEAK MB':>9}{'WARM ms':>10}{'WARM Q':>8}")
+
+        for page in BENCH_PAGES:
+            measured = benchmark_page(page, client)
+            results[(page, scale)] = measured
+            print(f"{page:<16}{measured['wall_ms']:>10.1f}{measured['queries']:>9}{measured['bytes'] / 1024:>10.1f}"
+                  f"{measured['peak_mb']:>9.1f}{measured['warm_ms']:>10.1f}{measured['warm_queries']:>8}")
+            for error in measured["errors"]:
+                failures.append(f"{page} @ {scale}: {error}")
+
+    if BENCH_UPDATE_BUDGETS:
+        save_budgets(results)
+        print(f"\n✅ Budgets aktualisiert: {BUDGETS_PATH}")
+    else:
+        failures.extend(check_budgets(results, load_budgets()))
+
+    print(f"\nBenchmarks abgeschlossen in {time.time() - started:.2f}s")
+    if failures:
+        print("❌ Performance-Regressionen:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("✅ Alle Seiten innerhalb der Budgets")
+
+if __name__ == "__main__":
+    run_benchmarks()
@@ -0,0 +1,38 @@
+-- Migration 009: CRM Pipeline Grid
+-- Datum: 2026-10-19
+-- Beschreibung: Numerische amount-Spalte und Indizes für serverseitige Filter, Sortierung und Pagination im CRM
+
+-- Alt-Schema (stage/date) auf status/deadline umbenennen: das CRM filtert und sortiert
+-- serverseitig nach diesen Spalten und mappt Alt-Spalten nicht mehr im Client
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='deals' AND column_name='stage')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='deals' AND column_name='status') THEN
+        ALTER TABLE deals RENAME COLUMN stage TO status;
+    END IF;
+    IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='deals' AND column_name='date')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='deals' AND column_name='deadline') THEN
+        ALTER TABLE deals RENAME COLUMN date TO deadline;
+    END IF;
+END $$;
+
+-- Numerischer Deal-Wert (value bleibt als Anzeige-Text erhalten)
+ALTER TABLE deals
+ADD COLUMN IF NOT EXISTS amount NUMERIC(12,2);
+
+-- Bestehende Deals im Sync-Format "$123.45" übernehmen
+UPDATE deals
+SET amount = NULLIF(regexp_replace(value, '[^0-9.]', '', 'g'), '')::NUMERIC
+WHERE amount IS NULL
+AND value ~ '^\$?[0-9]+(\.[0-9]{1,2})?$';
+
+-- Indizes für die Pipeline-Abfragen (user_id + Filter/Sortierspalte)
+CREATE INDEX IF NOT EXISTS idx_deals_user_created ON deals(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_deals_user_status ON deals(user_id, status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_deals_user_amount ON deals(user_id, amount DESC);
+
+-- Kommentar
+COMMENT ON COLUMN deals.amount IS 'Numerischer Deal-Wert für Filter und Sortierung im CRM';
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: CRM Pipeline Grid vorbereitet' AS status;
@@ -0,0 +1,121 @@
+-- Migration 010: Numerische Deal-Werte & Pipeline-Aggregate
+-- Datum: 2026-10-19
+-- Beschreibung: Fügt deals.currency hinzu, befüllt amount/currency aus dem alten value-Text
+--               und erstellt die RPC-Funktion deal_pipeline_stats für die DEALS-KPIs
+
+-- 1. WÄHRUNG (+ closed_at für "Signed This Month", fehlt im alten CRM-Schema)
+-- closed_at bleibt für bestehende Closed-Deals NULL: der Abschlusszeitpunkt ist unbekannt
+-- (ein NOW()-Default würde alle Alt-Deals als "diesen Monat abgeschlossen" zählen)
+ALTER TABLE deals
+ADD COLUMN IF NOT EXISTS amount NUMERIC(12,2),
+ADD COLUMN IF NOT EXISTS currency TEXT DEFAULT 'USD',
+ADD COLUMN IF NOT EXISTS closed_at TIMESTAMP WITH TIME ZONE;
+
+-- closed_at setzen, sobald ein Deal auf Closed wechselt (und zurücksetzen, wenn er wieder geöffnet wird)
+CREATE OR REPLACE FUNCTION set_deal_closed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'Closed' THEN
+        IF TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM 'Closed' THEN
+            NEW.closed_at := NOW();
+        END IF;
+    ELSE
+        NEW.closed_at := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_deal_closed_at ON deals;
+CREATE TRIGGER trg_deal_closed_at
+    BEFORE INSERT OR UPDATE OF status ON deals
+    FOR EACH ROW EXECUTE FUNCTION set_deal_closed_at();
+
+-- 2. PARSER für Alt-Werte wie "$1,234.50", "8.000 €" oder "12.000,50 EUR"
+-- Letztes Trennzeichen mit 1-2 Nachkommastellen = Dezimaltrenner, alle anderen = Tausender
+CREATE OR REPLACE FUNCTION parse_deal_value(p_value TEXT)
+RETURNS NUMERIC AS $$
+DECLARE
+    cleaned TEXT := regexp_replace(COALESCE(p_value, ''), '[^0-9,.]', '', 'g');
+BEGIN
+    IF cleaned !~ '[0-9]' THEN
+        RETURN NULL;
+    END IF;
+    
+    IF cleaned ~ '[.,][0-9]{1,2}$' THEN
+        RETURN (
+            regexp_replace(substring(cleaned FROM '^(.*)[.,][0-9]{1,2}$'), '[.,]', '', 'g')
+            || '.' || substring(cleaned FROM '[.,]([0-9]{1,2})$')
+        )::NUMERIC;
+    END IF;
+    
+    RETURN regexp_replace(cleaned, '[.,]', '', 'g')::NUMERIC;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- 3. BACKFILL (ein set-basiertes UPDATE statt Zeile-für-Zeile in Python)
+UPDATE deals
+SET amount = COALESCE(amount, parse_deal_value(value)),
+    currency = CASE
+        WHEN value ~* '(€|EUR)' THEN 'EUR'
+        WHEN value ~* '(£|GBP)' THEN 'GBP'
+        ELSE 'USD'
+    END
+WHERE value IS NOT NULL AND value <> '';
+
+-- 4. PIPELINE-AGGREGATE (eine Abfrage für alle DEALS-KPIs)
+-- Beträge werden pro Währung summiert (keine Umrechnung: USD, EUR und GBP nicht addieren)
+DROP FUNCTION IF EXISTS deal_pipeline_stats(TEXT);
+CREATE OR REPLACE FUNCTION deal_pipeline_stats(p_user_id TEXT)
+RETURNS TABLE (
+    deal_count BIGINT,
+    closed_this_month BIGINT,
+    status_counts JSONB,
+    currency_stats JSONB -- {"USD": {"pipeline_value", "closed_value", "avg_deal_size"}, ...}
+) AS $$
+    WITH user_deals AS (
+        SELECT status, amount, COALESCE(currency, 'USD') AS currency, closed_at
+        FROM deals
+        WHERE user_id = p_user_id
+    )
+    SELECT
+        COUNT(*) AS deal_count,
+        COUNT(*) FILTER (
+            WHERE status = 'Closed'
+            AND closed_at >= date_trunc('month', NOW())
+        ) AS closed_this_month,
+        COALESCE(
+            (SELECT jsonb_object_agg(status, cnt)
+             FROM (SELECT COALESCE(status, 'Unknown') AS status, COUNT(*) AS cnt
+                   FROM user_deals GROUP BY 1) per_status),
+            '{}'::JSONB
+        ) AS status_counts,
+        COALESCE(
+            (SELECT jsonb_object_agg(currency, jsonb_build_object(
+                        'pipeline_value', pipeline_value,
+                        'closed_value', closed_value,
+                        'avg_deal_size', avg_deal_size))
+             FROM (SELECT currency,
+                          COALESCE(SUM(amount) FILTER (WHERE status <> 'Closed'), 0) AS pipeline_value,
+                          COALESCE(SUM(amount) FILTER (WHERE status = 'Closed'), 0) AS closed_value,
+                          COALESCE(ROUND(AVG(amount), 2), 0) AS avg_deal_size
+                   FROM user_deals
+                   WHERE amount IS NOT NULL
+                   GROUP BY currency) per_currency),
+            '{}'::JSONB
+        ) AS currency_stats
+    FROM user_deals;
+$$ LANGUAGE sql STABLE;
+
+-- Index für Aggregat + Status-Filter
+CREATE INDEX IF NOT EXISTS idx_deals_user_status_amount ON deals(user_id, status) INCLUDE (amount, currency);
+
+-- Kommentare
+COMMENT ON COLUMN deals.currency IS 'Währung des Deal-Werts (USD, EUR, GBP)';
+COMMENT ON COLUMN deals.closed_at IS 'Zeitpunkt des Wechsels auf Closed (Trigger trg_deal_closed_at, NULL für Alt-Deals)';
+COMMENT ON FUNCTION deal_pipeline_stats IS 'Pipeline-Value, Closed-Value und durchschnittliche Deal-Größe pro Währung sowie Deal-Anzahl pro Status in einer Abfrage';
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Deal-Werte numerisch, Pipeline-Aggregate erstellt' AS status;
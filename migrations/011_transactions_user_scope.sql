@@ -0,0 +1,52 @@
+-- Migration 011: Transactions pro User
+-- Datum: 2026-10-19
+-- Beschreibung: Fügt transactions.user_id hinzu, damit Finance nur die Ausgaben des eingeloggten Users summiert
+--
+-- VERHALTENSÄNDERUNG: Finance filtert ab jetzt mit user_id = eingeloggter User. Buchungen ohne
+-- Owner (user_id NULL) tauchen in keinem Burn Rate / Ledger mehr auf. Abschnitt 2 ordnet
+-- Alt-Buchungen zu, soweit der Owner ableitbar ist; der Rest wird am Ende gemeldet und muss
+-- manuell zugeordnet werden:
+--   UPDATE transactions SET user_id = '<creator@email>' WHERE user_id IS NULL AND ...;
+
+-- 1. OWNER-SPALTE
+ALTER TABLE transactions
+ADD COLUMN IF NOT EXISTS user_id TEXT;
+
+-- 2. BACKFILL
+-- a) CRM-Buchungen "Deal: <brand>" -> Owner des Deals (nur wenn die Brand eindeutig einem User gehört)
+UPDATE transactions t
+SET user_id = d.user_id
+FROM (
+    SELECT brand, MIN(user_id) AS user_id
+    FROM deals
+    GROUP BY brand
+    HAVING COUNT(DISTINCT user_id) = 1
+) d
+WHERE t.user_id IS NULL
+AND t.description = 'Deal: ' || d.brand;
+
+-- b) Single-Account-Installationen: alle restlichen Alt-Buchungen gehören dem einzigen Creator
+UPDATE transactions
+SET user_id = (SELECT MIN(email) FROM profiles)
+WHERE user_id IS NULL
+AND (SELECT COUNT(DISTINCT email) FROM profiles) = 1;
+
+-- c) Nicht zuordenbare Buchungen melden (bleiben bis zur manuellen Zuordnung unsichtbar)
+DO $$
+DECLARE
+    orphaned BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO orphaned FROM transactions WHERE user_id IS NULL;
+    IF orphaned > 0 THEN
+        RAISE NOTICE 'transactions: % Buchungen ohne user_id - werden in Finance nicht angezeigt, bitte manuell zuordnen', orphaned;
+    END IF;
+END $$;
+
+-- 3. Index für Finance-Abfragen (User + Typ, stabile Pagination über id)
+CREATE INDEX IF NOT EXISTS idx_transactions_user_type ON transactions(user_id, type, id);
+
+-- Kommentar
+COMMENT ON COLUMN transactions.user_id IS 'Creator Email (Owner der Buchung)';
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: transactions.user_id hinzugefügt' AS status;
@@ -0,0 +1,59 @@
+-- Migration 012: Revenue Forecasting
+-- Datum: 2026-10-19
+-- Beschreibung: Tägliche Umsatz-Aggregate als Input und Tabelle für gefittete Forecast-Modelle + Projektionen
+
+-- 1. TÄGLICHE NETTO-UMSÄTZE pro User & Plattform (Input für den Nightly-Fit)
+CREATE OR REPLACE VIEW revenue_daily AS
+SELECT
+    user_id,
+    platform,
+    (created_at AT TIME ZONE 'UTC')::DATE AS day,
+    SUM(amount_net) AS amount
+FROM revenue_history
+GROUP BY user_id, platform, (created_at AT TIME ZONE 'UTC')::DATE;
+
+COMMENT ON VIEW revenue_daily IS 'Netto-Umsatz pro User, Plattform und Tag (UTC)';
+
+-- 2. FORECAST-MODELLE (Holt-Winters-Zustand, wird nightly inkrementell fortgeschrieben)
+CREATE TABLE IF NOT EXISTS revenue_forecasts (
+    id BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    -- Parameter & Zustand
+    alpha DOUBLE PRECISION,
+    beta DOUBLE PRECISION,
+    gamma DOUBLE PRECISION,
+    phi DOUBLE PRECISION,
+    level DOUBLE PRECISION,
+    trend DOUBLE PRECISION,
+    season DOUBLE PRECISION[],
+    sigma DOUBLE PRECISION,
+    n_obs INTEGER DEFAULT 0,
+    history_total DOUBLE PRECISION DEFAULT 0,
+    days_since_fit INTEGER DEFAULT 0,
+    last_date DATE,
+    -- Projektionen (80%-Intervall)
+    forecast_30 DECIMAL(12,2),
+    lower_30 DECIMAL(12,2),
+    upper_30 DECIMAL(12,2),
+    forecast_60 DECIMAL(12,2),
+    lower_60 DECIMAL(12,2),
+    upper_60 DECIMAL(12,2),
+    forecast_90 DECIMAL(12,2),
+    lower_90 DECIMAL(12,2),
+    upper_90 DECIMAL(12,2),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(user_id, platform)
+);
+
+-- Index für schnelle Abfragen pro User
+CREATE INDEX IF NOT EXISTS idx_revenue_forecasts_user ON revenue_forecasts(user_id);
+
+-- Kommentar
+COMMENT ON TABLE revenue_forecasts IS 'Gefittete Holt-Winters-Modelle und 30/60/90-Tage-Projektionen pro User & Plattform';
+
+-- RLS deaktivieren (Nightly-Job schreibt mit Service-Key)
+ALTER TABLE revenue_forecasts DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Revenue Forecasting erstellt' AS status;
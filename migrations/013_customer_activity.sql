@@ -0,0 +1,252 @@
+-- Migration 013: Customer Activity Rollup
+-- Datum: 2026-10-19
+-- Beschreibung: Letzte Aktivität, Lifetime-Spend und rollierende 7/30-Tage-Umsätze pro Kunde,
+--               inkrementell per Trigger auf revenue_history gepflegt (statt History-Scans)
+
+-- 1. TAGES-BUCKETS pro Kunde (Basis für die rollierenden Fenster)
+CREATE TABLE IF NOT EXISTS customer_activity_daily (
+    user_id TEXT NOT NULL, -- Creator Email
+    platform TEXT NOT NULL,
+    customer TEXT NOT NULL, -- revenue_history.source
+    day DATE NOT NULL, -- UTC
+    amount DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    purchases INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, platform, customer, day)
+);
+
+COMMENT ON TABLE customer_activity_daily IS 'Netto-Umsatz und Käufe pro Kunde und Tag (UTC), gepflegt per Trigger';
+
+-- 2. CUSTOMER ACTIVITY (eine Zeile pro User, Plattform & Kunde)
+CREATE TABLE IF NOT EXISTS customer_activity (
+    user_id TEXT NOT NULL, -- Creator Email
+    platform TEXT NOT NULL,
+    customer TEXT NOT NULL, -- revenue_history.source
+    first_seen TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_seen TIMESTAMP WITH TIME ZONE NOT NULL,
+    lifetime_spend DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    purchase_count INTEGER NOT NULL DEFAULT 0,
+    spend_7d DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    spend_30d DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, platform, customer)
+);
+
+-- Indizes für Inaktivitäts- und Whale-Abfragen (Index-Lookups statt History-Scan)
+CREATE INDEX IF NOT EXISTS idx_customer_activity_last_seen ON customer_activity(user_id, last_seen);
+CREATE INDEX IF NOT EXISTS idx_customer_activity_spend ON customer_activity(user_id, lifetime_spend DESC);
+
+COMMENT ON TABLE customer_activity IS 'Letzte Aktivität, Lifetime-Spend und 7/30-Tage-Umsatz pro Kunde (Rollup von revenue_history)';
+
+-- 3. TRIGGER-FUNKTION (Statement-Level, verarbeitet Batch-Inserts in einem Durchgang)
+CREATE OR REPLACE FUNCTION customer_activity_apply()
+RETURNS TRIGGER AS $$
+DECLARE
+    today DATE := (NOW() AT TIME ZONE 'UTC')::DATE;
+BEGIN
+    -- Tages-Buckets hochzählen
+    INSERT INTO customer_activity_daily AS d (user_id, platform, customer, day, amount, purchases)
+    SELECT
+        user_id,
+        platform,
+        COALESCE(NULLIF(source, ''), 'unknown'),
+        (COALESCE(created_at, NOW()) AT TIME ZONE 'UTC')::DATE,
+        SUM(amount_net),
+        COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, platform, customer, day) DO UPDATE
+    SET amount = d.amount + EXCLUDED.amount,
+        purchases = d.purchases + EXCLUDED.purchases;
+
+    -- Lifetime-Werte fortschreiben
+    INSERT INTO customer_activity AS a (user_id, platform, customer, first_seen, last_seen, lifetime_spend, purchase_count)
+    SELECT
+        user_id,
+        platform,
+        COALESCE(NULLIF(source, ''), 'unknown'),
+        MIN(COALESCE(created_at, NOW())),
+        MAX(COALESCE(created_at, NOW())),
+        SUM(amount_net),
+        COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, platform, customer) DO UPDATE
+    SET first_seen = LEAST(a.first_seen, EXCLUDED.first_seen),
+        last_seen = GREATEST(a.last_seen, EXCLUDED.last_seen),
+        lifetime_spend = a.lifetime_spend + EXCLUDED.lifetime_spend,
+        purchase_count = a.purchase_count + EXCLUDED.purchase_count,
+        updated_at = NOW();
+
+    -- Rollierende Fenster nur für die betroffenen Kunden neu berechnen (max. 30 Buckets je Kunde)
+    UPDATE customer_activity a
+    SET spend_7d = w.spend_7d,
+        spend_30d = w.spend_30d
+    FROM (
+        SELECT
+            d.user_id,
+            d.platform,
+            d.customer,
+            COALESCE(SUM(d.amount) FILTER (WHERE d.day > today - 7), 0) AS spend_7d,
+            COALESCE(SUM(d.amount), 0) AS spend_30d
+        FROM customer_activity_daily d
+        JOIN (
+            SELECT DISTINCT user_id, platform, COALESCE(NULLIF(source, ''), 'unknown') AS customer
+            FROM new_rows
+        ) touched USING (user_id, platform, customer)
+        WHERE d.day > today - 30
+        GROUP BY d.user_id, d.platform, d.customer
+    ) w
+    WHERE a.user_id = w.user_id
+    AND a.platform = w.platform
+    AND a.customer = w.customer;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_customer_activity ON revenue_history;
+CREATE TRIGGER trg_customer_activity
+AFTER INSERT ON revenue_history
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION customer_activity_apply();
+
+-- 4. NIGHTLY REFRESH (Fenster altern auch ohne neue Umsätze)
+CREATE OR REPLACE FUNCTION refresh_customer_activity()
+RETURNS INTEGER AS $$
+DECLARE
+    today DATE := (NOW() AT TIME ZONE 'UTC')::DATE;
+    refreshed INTEGER;
+BEGIN
+    -- Kunden ohne Bucket im 30-Tage-Fenster auf 0 setzen
+    UPDATE customer_activity
+    SET spend_7d = 0,
+        spend_30d = 0
+    WHERE (spend_7d <> 0 OR spend_30d <> 0)
+    AND (last_seen AT TIME ZONE 'UTC')::DATE <= today - 30;
+
+    -- Alle übrigen Fenster aus den Tages-Buckets neu berechnen
+    UPDATE customer_activity a
+    SET spend_7d = w.spend_7d,
+        spend_30d = w.spend_30d
+    FROM (
+        SELECT
+            user_id,
+            platform,
+            customer,
+            COALESCE(SUM(amount) FILTER (WHERE day > today - 7), 0) AS spend_7d,
+            COALESCE(SUM(amount), 0) AS spend_30d
+        FROM customer_activity_daily
+        WHERE day > today - 30
+        GROUP BY user_id, platform, customer
+    ) w
+    WHERE a.user_id = w.user_id
+    AND a.platform = w.platform
+    AND a.customer = w.customer
+    AND (a.spend_7d IS DISTINCT FROM w.spend_7d OR a.spend_30d IS DISTINCT FROM w.spend_30d);
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION refresh_customer_activity IS 'Berechnet spend_7d/spend_30d nightly neu (Fenster-Alterung ohne neue Inserts)';
+
+-- 5. BACKFILL aus der bestehenden Historie (set-based, einmalig)
+TRUNCATE customer_activity_daily;
+TRUNCATE customer_activity;
+
+INSERT INTO customer_activity_daily (user_id, platform, customer, day, amount, purchases)
+SELECT
+    user_id,
+    platform,
+    COALESCE(NULLIF(source, ''), 'unknown'),
+    (created_at AT TIME ZONE 'UTC')::DATE,
+    SUM(amount_net),
+    COUNT(*)
+FROM revenue_history
+WHERE created_at IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO customer_activity (user_id, platform, customer, first_seen, last_seen, lifetime_spend, purchase_count)
+SELECT
+    user_id,
+    platform,
+    COALESCE(NULLIF(source, ''), 'unknown'),
+    MIN(created_at),
+    MAX(created_at),
+    SUM(amount_net),
+    COUNT(*)
+FROM revenue_history
+WHERE created_at IS NOT NULL
+GROUP BY 1, 2, 3;
+
+SELECT refresh_customer_activity();
+
+-- 6. WHALE_INACTIVE über den Rollup (Index-Lookup statt DISTINCT ON über die Historie)
+CREATE OR REPLACE FUNCTION check_performance_alerts(p_user_id TEXT)
+RETURNS TABLE (
+    alert_type TEXT,
+    message TEXT,
+    severity TEXT
+) AS $$
+BEGIN
+    -- Alert 1: Whale Inaktivität (>7 Tage)
+    RETURN QUERY
+    SELECT
+        'WHALE_INACTIVE'::TEXT as alert_type,
+        'Top-Spender inaktiv seit >7 Tagen: ' || COUNT(*)::TEXT || ' Whales benötigen Attention!' as message,
+        'HIGH'::TEXT as severity
+    FROM customer_activity
+    WHERE user_id = p_user_id
+    AND last_seen < NOW() - INTERVAL '7 days'
+    HAVING COUNT(*) > 0;
+
+    -- Alert 2: Content-Burnout (Score <20)
+    RETURN QUERY
+    SELECT
+        'CONTENT_BURNOUT'::TEXT as alert_type,
+        'Content-Burnout detected: ' || COUNT(*)::TEXT || ' Assets mit Score <20!' as message,
+        'MEDIUM'::TEXT as severity
+    FROM top_performing_content
+    WHERE user_id = p_user_id
+    AND (conversion_rate * 10) < 20
+    HAVING COUNT(*) > 0;
+
+    -- Alert 3: Revenue-Drop (>20% weniger als letzte Woche)
+    RETURN QUERY
+    SELECT
+        'REVENUE_DROP'::TEXT as alert_type,
+        'Revenue-Drop: Diese Woche ' || ROUND((1 - (this_week / last_week)) * 100)::TEXT || '% weniger als letzte Woche!' as message,
+        'HIGH'::TEXT as severity
+    FROM (
+        SELECT
+            COALESCE(SUM(CASE WHEN created_at >= NOW() - INTERVAL '7 days' THEN amount_net ELSE 0 END), 0) as this_week,
+            COALESCE(SUM(CASE WHEN created_at >= NOW() - INTERVAL '14 days' AND created_at < NOW() - INTERVAL '7 days' THEN amount_net ELSE 0 END), 1) as last_week
+        FROM revenue_history
+        WHERE user_id = p_user_id
+    ) revenue_comparison
+    WHERE this_week < (last_week * 0.8) AND last_week > 0;
+
+    -- Alert 4: Follower-Drop (negative growth)
+    RETURN QUERY
+    SELECT
+        'FOLLOWER_DROP'::TEXT as alert_type,
+        'Follower-Drop auf ' || platform || ': ' || ABS(net_growth)::TEXT || ' Follower verloren!' as message,
+        'MEDIUM'::TEXT as severity
+    FROM stats_history
+    WHERE user_id = p_user_id
+    AND net_growth < 0
+    AND created_at >= NOW() - INTERVAL '24 hours'
+    ORDER BY created_at DESC
+    LIMIT 3;
+
+END;
+$$ LANGUAGE plpgsql;
+
+-- RLS deaktivieren (Trigger & Nightly-Job schreiben)
+ALTER TABLE customer_activity DISABLE ROW LEVEL SECURITY;
+ALTER TABLE customer_activity_daily DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Customer Activity Rollup erstellt' AS status;
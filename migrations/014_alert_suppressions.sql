@@ -0,0 +1,24 @@
+-- Migration 014: Alert Suppressions
+-- Datum: 2026-10-19
+-- Beschreibung: Merkt sich pro User, Alert-Typ und Subject den letzten Versand (Deduplizierung für den Alert-Job)
+
+CREATE TABLE IF NOT EXISTS alert_suppressions (
+    user_id TEXT NOT NULL, -- Creator Email
+    alert_type TEXT NOT NULL, -- WHALE_INACTIVE, REVENUE_DROP, ...
+    subject TEXT NOT NULL DEFAULT '', -- z.B. "instagram/handle" bei FOLLOWER_DROP
+    last_sent_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_message TEXT,
+    PRIMARY KEY (user_id, alert_type, subject)
+);
+
+-- Index für Aufräumen alter Einträge
+CREATE INDEX IF NOT EXISTS idx_alert_suppressions_sent ON alert_suppressions(last_sent_at);
+
+-- Kommentar
+COMMENT ON TABLE alert_suppressions IS 'Letzter Alert-Versand pro User/Typ/Subject (Suppression-Fenster)';
+
+-- RLS deaktivieren (Alert-Job schreibt mit Service-Key)
+ALTER TABLE alert_suppressions DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Alert Suppressions erstellt' AS status;
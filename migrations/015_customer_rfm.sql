@@ -0,0 +1,184 @@
+-- Migration 015: RFM-Segmentierung & Tier-Summary
+-- Datum: 2026-10-19
+-- Beschreibung: Gespeicherte RFM-Scores und Tiers in of_customers, Quintil-Grenzen pro Creator
+--               und per Trigger gepflegte, exakte Tier-/Segment-Zählungen
+
+-- 1. TIER als Generated Column (immer konsistent mit total_spent, keine Klassifizierung pro Query)
+ALTER TABLE of_customers
+ADD COLUMN IF NOT EXISTS customer_tier TEXT GENERATED ALWAYS AS (
+    CASE
+        WHEN total_spent >= 1000 THEN 'WHALE'
+        WHEN total_spent >= 500 THEN 'DOLPHIN'
+        WHEN total_spent >= 100 THEN 'FISH'
+        ELSE 'MINNOW'
+    END
+) STORED;
+
+-- 2. RFM-SCORES (berechnet von modules/rfm.py)
+ALTER TABLE of_customers
+ADD COLUMN IF NOT EXISTS r_score SMALLINT,
+ADD COLUMN IF NOT EXISTS f_score SMALLINT,
+ADD COLUMN IF NOT EXISTS m_score SMALLINT,
+ADD COLUMN IF NOT EXISTS rfm_segment TEXT,
+ADD COLUMN IF NOT EXISTS rfm_updated_at TIMESTAMP WITH TIME ZONE;
+
+-- Indizes für Top-Spender pro Creator und Tier-Filter
+CREATE INDEX IF NOT EXISTS idx_of_customers_user_spent ON of_customers(user_id, total_spent DESC);
+CREATE INDEX IF NOT EXISTS idx_of_customers_user_tier ON of_customers(user_id, customer_tier);
+
+COMMENT ON COLUMN of_customers.customer_tier IS 'WHALE/DOLPHIN/FISH/MINNOW aus total_spent (generiert)';
+COMMENT ON COLUMN of_customers.rfm_segment IS 'RFM-Segment (CHAMPIONS, LOYAL, AT_RISK, NEW, HIBERNATING, NEEDS_ATTENTION)';
+
+-- 3. FANS MIT VERALTETEN SCORES (inkrementelles Re-Scoring nach neuen Käufen)
+-- updated_at wurde bisher nie gepflegt: Trigger setzt es bei Änderungen der Kauf-Daten.
+-- Reine Score-Updates (r/f/m_score, rfm_segment) ändern updated_at nicht, sonst wäre
+-- jeder gerade gescorte Fan sofort wieder veraltet.
+CREATE OR REPLACE FUNCTION of_customers_touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.total_spent, NEW.purchase_count, NEW.last_purchase_date, NEW.subscription_status)
+       IS DISTINCT FROM (OLD.total_spent, OLD.purchase_count, OLD.last_purchase_date, OLD.subscription_status) THEN
+        NEW.updated_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_of_customers_updated_at ON of_customers;
+CREATE TRIGGER trg_of_customers_updated_at
+BEFORE UPDATE ON of_customers
+FOR EACH ROW
+EXECUTE FUNCTION of_customers_touch_updated_at();
+
+-- Versions-Key für das Re-Scoring in der App (neuester updated_at pro Creator)
+CREATE INDEX IF NOT EXISTS idx_of_customers_user_updated ON of_customers(user_id, updated_at DESC);
+
+CREATE OR REPLACE VIEW of_customers_rfm_stale AS
+SELECT
+    id,
+    user_id,
+    customer_username,
+    total_spent,
+    purchase_count,
+    last_purchase_date,
+    r_score,
+    f_score,
+    m_score,
+    rfm_segment
+FROM of_customers
+WHERE rfm_updated_at IS NULL
+OR updated_at > rfm_updated_at;
+
+COMMENT ON VIEW of_customers_rfm_stale IS 'Fans ohne oder mit veralteten RFM-Scores';
+
+-- 4. QUINTIL-GRENZEN pro Creator (nightly neu berechnet, dazwischen für inkrementelles Scoring)
+CREATE TABLE IF NOT EXISTS rfm_breakpoints (
+    user_id TEXT PRIMARY KEY, -- Creator Email
+    recency DOUBLE PRECISION[] NOT NULL, -- Tage seit letztem Kauf
+    frequency DOUBLE PRECISION[] NOT NULL, -- purchase_count
+    monetary DOUBLE PRECISION[] NOT NULL, -- total_spent
+    customer_count INTEGER DEFAULT 0,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE rfm_breakpoints IS 'RFM-Quintil-Grenzen (20/40/60/80%) pro Creator';
+
+-- 5. TIER-/SEGMENT-SUMMARY (exakte Zählungen ohne Scan über alle Fans)
+CREATE TABLE IF NOT EXISTS customer_tier_summary (
+    user_id TEXT NOT NULL, -- Creator Email
+    dimension TEXT NOT NULL, -- tier, segment
+    label TEXT NOT NULL,
+    customers INTEGER NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, dimension, label)
+);
+
+COMMENT ON TABLE customer_tier_summary IS 'Anzahl Fans und Umsatz pro Tier bzw. RFM-Segment, gepflegt per Trigger';
+
+-- Trigger-Funktion: alte Zeilen abziehen, neue Zeilen addieren (Statement-Level)
+CREATE OR REPLACE FUNCTION customer_tier_summary_apply()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO customer_tier_summary AS s (user_id, dimension, label, customers, revenue)
+        SELECT o.user_id, d.dimension, d.label, -COUNT(*), -COALESCE(SUM(o.total_spent), 0)
+        FROM old_rows o
+        CROSS JOIN LATERAL (VALUES ('tier', o.customer_tier), ('segment', COALESCE(o.rfm_segment, 'UNSCORED'))) d(dimension, label)
+        GROUP BY o.user_id, d.dimension, d.label
+        ON CONFLICT (user_id, dimension, label) DO UPDATE
+        SET customers = s.customers + EXCLUDED.customers,
+            revenue = s.revenue + EXCLUDED.revenue,
+            updated_at = NOW();
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO customer_tier_summary AS s (user_id, dimension, label, customers, revenue)
+        SELECT n.user_id, d.dimension, d.label, COUNT(*), COALESCE(SUM(n.total_spent), 0)
+        FROM new_rows n
+        CROSS JOIN LATERAL (VALUES ('tier', n.customer_tier), ('segment', COALESCE(n.rfm_segment, 'UNSCORED'))) d(dimension, label)
+        GROUP BY n.user_id, d.dimension, d.label
+        ON CONFLICT (user_id, dimension, label) DO UPDATE
+        SET customers = s.customers + EXCLUDED.customers,
+            revenue = s.revenue + EXCLUDED.revenue,
+            updated_at = NOW();
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_customer_tier_summary_insert ON of_customers;
+CREATE TRIGGER trg_customer_tier_summary_insert
+AFTER INSERT ON of_customers
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION customer_tier_summary_apply();
+
+DROP TRIGGER IF EXISTS trg_customer_tier_summary_update ON of_customers;
+CREATE TRIGGER trg_customer_tier_summary_update
+AFTER UPDATE ON of_customers
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION customer_tier_summary_apply();
+
+DROP TRIGGER IF EXISTS trg_customer_tier_summary_delete ON of_customers;
+CREATE TRIGGER trg_customer_tier_summary_delete
+AFTER DELETE ON of_customers
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION customer_tier_summary_apply();
+
+-- Backfill der Summary aus dem aktuellen Bestand
+TRUNCATE customer_tier_summary;
+
+INSERT INTO customer_tier_summary (user_id, dimension, label, customers, revenue)
+SELECT c.user_id, d.dimension, d.label, COUNT(*), COALESCE(SUM(c.total_spent), 0)
+FROM of_customers c
+CROSS JOIN LATERAL (VALUES ('tier', c.customer_tier), ('segment', COALESCE(c.rfm_segment, 'UNSCORED'))) d(dimension, label)
+GROUP BY c.user_id, d.dimension, d.label;
+
+-- 6. WHALE WATCHER VIEW nutzt die gespeicherten Tiers (+ RFM-Spalten)
+CREATE OR REPLACE VIEW whale_watcher AS
+SELECT
+    user_id,
+    customer_username,
+    total_spent,
+    subscription_status,
+    purchase_count,
+    avg_purchase_amount,
+    last_purchase_date,
+    customer_tier,
+    r_score,
+    f_score,
+    m_score,
+    rfm_segment
+FROM of_customers
+ORDER BY total_spent DESC;
+
+-- RLS deaktivieren (Nightly-Job schreibt mit Service-Key)
+ALTER TABLE rfm_breakpoints DISABLE ROW LEVEL SECURITY;
+ALTER TABLE customer_tier_summary DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: RFM-Segmentierung & Tier-Summary erstellt' AS status;
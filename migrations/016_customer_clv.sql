@@ -0,0 +1,49 @@
+-- Migration 016: Customer Lifetime Value
+-- Datum: 2026-10-19
+-- Beschreibung: BG/NBD- und Gamma-Gamma-Parameter pro Creator sowie CLV/Churn-Scores pro Fan (Nightly-Job)
+
+-- 1. MODELL-PARAMETER pro Creator (Zeiteinheit Wochen)
+CREATE TABLE IF NOT EXISTS clv_params (
+    user_id TEXT PRIMARY KEY, -- Creator Email
+    -- BG/NBD
+    r DOUBLE PRECISION,
+    alpha DOUBLE PRECISION,
+    a DOUBLE PRECISION,
+    b DOUBLE PRECISION,
+    -- Gamma-Gamma
+    p DOUBLE PRECISION,
+    q DOUBLE PRECISION,
+    gamma DOUBLE PRECISION,
+    n_customers INTEGER DEFAULT 0,
+    fitted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE clv_params IS 'BG/NBD + Gamma-Gamma Parameter pro Creator (modules/clv.py)';
+
+-- 2. CLV-SCORES pro Fan (Schlüssel wie customer_activity)
+CREATE TABLE IF NOT EXISTS customer_clv (
+    user_id TEXT NOT NULL, -- Creator Email
+    platform TEXT NOT NULL,
+    customer TEXT NOT NULL,
+    lifetime_spend DECIMAL(12,2) DEFAULT 0.00,
+    p_alive DOUBLE PRECISION,
+    churn_prob DOUBLE PRECISION,
+    expected_purchases DOUBLE PRECISION, -- nächste 90 Tage
+    expected_spend DECIMAL(12,2), -- Ø Warenkorb (Gamma-Gamma)
+    clv DECIMAL(12,2), -- erwarteter Umsatz nächste 90 Tage
+    value_at_risk DECIMAL(12,2), -- churn_prob * lifetime_spend
+    scored_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, platform, customer)
+);
+
+-- Index für die "At-Risk"-Liste (Top-N pro Creator als Index-Scan)
+CREATE INDEX IF NOT EXISTS idx_customer_clv_risk ON customer_clv(user_id, value_at_risk DESC);
+
+COMMENT ON TABLE customer_clv IS 'CLV, Churn-Wahrscheinlichkeit und Value-at-Risk pro Fan (nightly)';
+
+-- RLS deaktivieren (Nightly-Job schreibt mit Service-Key)
+ALTER TABLE clv_params DISABLE ROW LEVEL SECURITY;
+ALTER TABLE customer_clv DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Customer Lifetime Value erstellt' AS status;
@@ -0,0 +1,49 @@
+-- Migration 017: Vault Rank Snapshots
+-- Datum: 2026-10-19
+-- Beschreibung: Tägliche Ranking-Snapshots der Vault-Assets (Scores aus modules/content_scoring.py)
+
+CREATE TABLE IF NOT EXISTS vault_rank_snapshots (
+    user_id TEXT NOT NULL, -- Creator Email
+    asset_id INTEGER NOT NULL, -- vault_assets.id
+    snapshot_date DATE NOT NULL,
+    rank INTEGER NOT NULL,
+    composite_score DECIMAL(5,1),
+    conversion_rate DECIMAL(12,4),
+    engagement_score DECIMAL(8,2),
+    total_revenue DECIMAL(10,2),
+    PRIMARY KEY (user_id, snapshot_date, asset_id)
+);
+
+-- Index für "letzter Snapshot vor Datum X" und Rang-Verläufe pro Asset
+CREATE INDEX IF NOT EXISTS idx_vault_rank_snapshots_date ON vault_rank_snapshots(user_id, snapshot_date DESC, rank);
+CREATE INDEX IF NOT EXISTS idx_vault_rank_snapshots_asset ON vault_rank_snapshots(asset_id, snapshot_date);
+
+-- updated_at von vault_assets wurde bisher nie gepflegt (nur DEFAULT NOW() beim Insert):
+-- Trigger setzt es bei jeder inhaltlichen Änderung, damit es als Cache-Versions-Key taugt
+CREATE OR REPLACE FUNCTION vault_assets_touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF ROW(NEW.*) IS DISTINCT FROM ROW(OLD.*) THEN
+        NEW.updated_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_vault_assets_updated_at ON vault_assets;
+CREATE TRIGGER trg_vault_assets_updated_at
+BEFORE UPDATE ON vault_assets
+FOR EACH ROW
+EXECUTE FUNCTION vault_assets_touch_updated_at();
+
+-- Index für den Cache-Versions-Key der Vault-Seite und der Alerts (neuester updated_at pro Creator)
+CREATE INDEX IF NOT EXISTS idx_vault_user_updated ON vault_assets(user_id, updated_at DESC);
+
+-- Kommentar
+COMMENT ON TABLE vault_rank_snapshots IS 'Tägliche Vault-Rankings pro Creator (Composite-Score, Conversion, Engagement)';
+
+-- RLS deaktivieren (Nightly-Job schreibt mit Service-Key)
+ALTER TABLE vault_rank_snapshots DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Vault Rank Snapshots erstellt' AS status;
@@ -0,0 +1,233 @@
+-- Migration 018: Stats Rollups
+-- Datum: 2026-10-19
+-- Beschreibung: Stündliche, tägliche und wöchentliche Buckets von stats_history (open/min/max/last/delta
+--               für Follower, Likes und Views), inkrementell per Trigger gepflegt
+
+-- 1. ROLLUP-TABELLE (eine Zeile pro User, Granularität, Plattform, Handle & Bucket)
+CREATE TABLE IF NOT EXISTS stats_rollups (
+    user_id TEXT NOT NULL, -- Creator Email
+    granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day', 'week')),
+    platform TEXT NOT NULL,
+    handle TEXT NOT NULL DEFAULT '',
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL, -- Bucket-Start (UTC)
+    samples INTEGER NOT NULL DEFAULT 0,
+    first_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    -- open = letzter Wert des vorherigen Buckets (bzw. erster Wert bei der ersten Messung)
+    followers_open BIGINT,
+    followers_min BIGINT,
+    followers_max BIGINT,
+    followers_last BIGINT,
+    followers_delta BIGINT GENERATED ALWAYS AS (followers_last - followers_open) STORED,
+    likes_open BIGINT,
+    likes_min BIGINT,
+    likes_max BIGINT,
+    likes_last BIGINT,
+    likes_delta BIGINT GENERATED ALWAYS AS (likes_last - likes_open) STORED,
+    views_open BIGINT,
+    views_min BIGINT,
+    views_max BIGINT,
+    views_last BIGINT,
+    views_delta BIGINT GENERATED ALWAYS AS (views_last - views_open) STORED,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, granularity, platform, handle, bucket)
+);
+
+-- Index für Dashboard-Zeiträume ("letzte 12 Monate" = ein Range-Scan über wenige hundert Zeilen)
+CREATE INDEX IF NOT EXISTS idx_stats_rollups_range ON stats_rollups(user_id, granularity, bucket);
+
+COMMENT ON TABLE stats_rollups IS 'Zeit-Buckets (hour/day/week) von stats_history pro Handle, gepflegt per Trigger';
+COMMENT ON COLUMN stats_rollups.followers_delta IS 'Follower-Veränderung im Bucket inkl. Sprung seit dem vorherigen Bucket';
+
+-- 2. TRIGGER-FUNKTION (Statement-Level, verarbeitet Batch-Inserts in einem Durchgang)
+CREATE OR REPLACE FUNCTION stats_rollups_apply()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH points AS (
+        SELECT
+            n.user_id,
+            g.granularity,
+            COALESCE(n.platform, 'unknown') AS platform,
+            COALESCE(n.handle, '') AS handle,
+            date_trunc(g.granularity, COALESCE(n.created_at, NOW()) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+            COALESCE(n.created_at, NOW()) AS created_at,
+            n.followers::BIGINT AS followers,
+            n.total_likes AS likes,
+            n.video_views AS views
+        FROM new_rows n
+        CROSS JOIN (VALUES ('hour'), ('day'), ('week')) g(granularity)
+    ),
+    agg AS (
+        SELECT
+            user_id, granularity, platform, handle, bucket,
+            COUNT(*) AS samples,
+            MIN(created_at) AS first_at,
+            MAX(created_at) AS last_at,
+            (ARRAY_AGG(followers ORDER BY created_at) FILTER (WHERE followers IS NOT NULL))[1] AS followers_first,
+            MIN(followers) AS followers_min,
+            MAX(followers) AS followers_max,
+            (ARRAY_AGG(followers ORDER BY created_at DESC) FILTER (WHERE followers IS NOT NULL))[1] AS followers_last,
+            (ARRAY_AGG(likes ORDER BY created_at) FILTER (WHERE likes IS NOT NULL))[1] AS likes_first,
+            MIN(likes) AS likes_min,
+            MAX(likes) AS likes_max,
+            (ARRAY_AGG(likes ORDER BY created_at DESC) FILTER (WHERE likes IS NOT NULL))[1] AS likes_last,
+            (ARRAY_AGG(views ORDER BY created_at) FILTER (WHERE views IS NOT NULL))[1] AS views_first,
+            MIN(views) AS views_min,
+            MAX(views) AS views_max,
+            (ARRAY_AGG(views ORDER BY created_at DESC) FILTER (WHERE views IS NOT NULL))[1] AS views_last
+        FROM points
+        GROUP BY user_id, granularity, platform, handle, bucket
+    )
+    INSERT INTO stats_rollups AS r (
+        user_id, granularity, platform, handle, bucket, samples, first_at, last_at,
+        followers_open, followers_min, followers_max, followers_last,
+        likes_open, likes_min, likes_max, likes_last,
+        views_open, views_min, views_max, views_last
+    )
+    SELECT
+        a.user_id, a.granularity, a.platform, a.handle, a.bucket, a.samples, a.first_at, a.last_at,
+        COALESCE(LAG(a.followers_last) OVER w, prev.followers_last, a.followers_first),
+        a.followers_min, a.followers_max, a.followers_last,
+        COALESCE(LAG(a.likes_last) OVER w, prev.likes_last, a.likes_first),
+        a.likes_min, a.likes_max, a.likes_last,
+        COALESCE(LAG(a.views_last) OVER w, prev.views_last, a.views_first),
+        a.views_min, a.views_max, a.views_last
+    FROM agg a
+    -- Letzter bestehender Bucket davor (PK-Lookup)
+    LEFT JOIN LATERAL (
+        SELECT p.followers_last, p.likes_last, p.views_last
+        FROM stats_rollups p
+        WHERE p.user_id = a.user_id
+        AND p.granularity = a.granularity
+        AND p.platform = a.platform
+        AND p.handle = a.handle
+        AND p.bucket < a.bucket
+        ORDER BY p.bucket DESC
+        LIMIT 1
+    ) prev ON TRUE
+    WINDOW w AS (PARTITION BY a.user_id, a.granularity, a.platform, a.handle ORDER BY a.bucket)
+    ON CONFLICT (user_id, granularity, platform, handle, bucket) DO UPDATE
+    SET samples = r.samples + EXCLUDED.samples,
+        first_at = LEAST(r.first_at, EXCLUDED.first_at),
+        last_at = GREATEST(r.last_at, EXCLUDED.last_at),
+        followers_min = LEAST(r.followers_min, EXCLUDED.followers_min),
+        followers_max = GREATEST(r.followers_max, EXCLUDED.followers_max),
+        followers_last = CASE WHEN EXCLUDED.last_at >= r.last_at
+                              THEN COALESCE(EXCLUDED.followers_last, r.followers_last) ELSE r.followers_last END,
+        likes_min = LEAST(r.likes_min, EXCLUDED.likes_min),
+        likes_max = GREATEST(r.likes_max, EXCLUDED.likes_max),
+        likes_last = CASE WHEN EXCLUDED.last_at >= r.last_at
+                          THEN COALESCE(EXCLUDED.likes_last, r.likes_last) ELSE r.likes_last END,
+        views_min = LEAST(r.views_min, EXCLUDED.views_min),
+        views_max = GREATEST(r.views_max, EXCLUDED.views_max),
+        views_last = CASE WHEN EXCLUDED.last_at >= r.last_at
+                          THEN COALESCE(EXCLUDED.views_last, r.views_last) ELSE r.views_last END,
+        updated_at = NOW();
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stats_rollups ON stats_history;
+CREATE TRIGGER trg_stats_rollups
+AFTER INSERT ON stats_history
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION stats_rollups_apply();
+
+-- 3. REBUILD aus der Roh-Historie (Backfill & Korrektur nach nachträglich eingefügten Snapshots)
+CREATE OR REPLACE FUNCTION rebuild_stats_rollups(p_user_id TEXT DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    DELETE FROM stats_rollups
+    WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    WITH points AS (
+        SELECT
+            s.user_id,
+            g.granularity,
+            COALESCE(s.platform, 'unknown') AS platform,
+            COALESCE(s.handle, '') AS handle,
+            date_trunc(g.granularity, s.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+            s.created_at,
+            s.followers::BIGINT AS followers,
+            s.total_likes AS likes,
+            s.video_views AS views
+        FROM stats_history s
+        CROSS JOIN (VALUES ('hour'), ('day'), ('week')) g(granularity)
+        WHERE s.created_at IS NOT NULL
+        AND (p_user_id IS NULL OR s.user_id = p_user_id)
+    ),
+    agg AS (
+        SELECT
+            user_id, granularity, platform, handle, bucket,
+            COUNT(*) AS samples,
+            MIN(created_at) AS first_at,
+            MAX(created_at) AS last_at,
+            (ARRAY_AGG(followers ORDER BY created_at) FILTER (WHERE followers IS NOT NULL))[1] AS followers_first,
+            MIN(followers) AS followers_min,
+            MAX(followers) AS followers_max,
+            (ARRAY_AGG(followers ORDER BY created_at DESC) FILTER (WHERE followers IS NOT NULL))[1] AS followers_last,
+            (ARRAY_AGG(likes ORDER BY created_at) FILTER (WHERE likes IS NOT NULL))[1] AS likes_first,
+            MIN(likes) AS likes_min,
+            MAX(likes) AS likes_max,
+            (ARRAY_AGG(likes ORDER BY created_at DESC) FILTER (WHERE likes IS NOT NULL))[1] AS likes_last,
+            (ARRAY_AGG(views ORDER BY created_at) FILTER (WHERE views IS NOT NULL))[1] AS views_first,
+            MIN(views) AS views_min,
+            MAX(views) AS views_max,
+            (ARRAY_AGG(views ORDER BY created_at DESC) FILTER (WHERE views IS NOT NULL))[1] AS views_last
+        FROM points
+        GROUP BY user_id, granularity, platform, handle, bucket
+    )
+    INSERT INTO stats_rollups (
+        user_id, granularity, platform, handle, bucket, samples, first_at, last_at,
+        followers_open, followers_min, followers_max, followers_last,
+        likes_open, likes_min, likes_max, likes_last,
+        views_open, views_min, views_max, views_last
+    )
+    SELECT
+        user_id, granularity, platform, handle, bucket, samples, first_at, last_at,
+        COALESCE(LAG(followers_last) OVER w, followers_first), followers_min, followers_max, followers_last,
+        COALESCE(LAG(likes_last) OVER w, likes_first), likes_min, likes_max, likes_last,
+        COALESCE(LAG(views_last) OVER w, views_first), views_min, views_max, views_last
+    FROM agg
+    WINDOW w AS (PARTITION BY user_id, granularity, platform, handle ORDER BY bucket);
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION rebuild_stats_rollups IS 'Baut stats_rollups aus stats_history neu auf (NULL = alle User)';
+
+-- 4. BACKFILL aus der bestehenden Historie (set-based, einmalig)
+SELECT rebuild_stats_rollups();
+
+-- 5. RETENTION der Stunden-Buckets (Tages-/Wochen-Buckets bleiben dauerhaft)
+-- Das Dashboard nutzt Stunden nur für kurze Zeiträume (rollups.choose_granularity), ältere
+-- Stunden-Buckets würden ohne Retention unbegrenzt wachsen (24 Zeilen pro Handle und Tag)
+CREATE INDEX IF NOT EXISTS idx_stats_rollups_hour_bucket ON stats_rollups(bucket) WHERE granularity = 'hour';
+
+CREATE OR REPLACE FUNCTION prune_stats_rollups(p_hour_days INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+    pruned INTEGER;
+BEGIN
+    DELETE FROM stats_rollups
+    WHERE granularity = 'hour'
+    AND bucket < date_trunc('day', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' - make_interval(days => p_hour_days);
+
+    GET DIAGNOSTICS pruned = ROW_COUNT;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION prune_stats_rollups IS 'Löscht Stunden-Buckets älter als p_hour_days (nightly mit dem Roh-Fenster der Compaction)';
+
+-- RLS deaktivieren (Trigger & Dashboard lesen mit Service-Key)
+ALTER TABLE stats_rollups DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Stats Rollups erstellt' AS status;
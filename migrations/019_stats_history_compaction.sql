@@ -0,0 +1,168 @@
+-- Migration 019: stats_history Compaction
+-- Datum: 2026-10-19
+-- Beschreibung: Retention-Policy für Roh-Snapshots: volle Auflösung im aktuellen Fenster, ältere Daten
+--               auf den letzten Snapshot pro Tag bzw. Woche verdichtet (net_growth-Summen bleiben erhalten)
+
+-- 1. MARKIERUNG verdichteter Snapshots
+ALTER TABLE stats_history
+ADD COLUMN IF NOT EXISTS compacted_to TEXT CHECK (compacted_to IN ('day', 'week'));
+
+COMMENT ON COLUMN stats_history.compacted_to IS 'NULL = Roh-Snapshot, day/week = letzter Snapshot der Periode (net_growth = Periodensumme)';
+
+-- Index für den Cutoff-Scan der Compaction
+CREATE INDEX IF NOT EXISTS idx_stats_history_created_at ON stats_history(created_at);
+
+-- 2. FORTSCHRITT der Compaction (eine Zeile): alles vor weekly_until ist auf Wochen verdichtet,
+-- alles vor raw_until mindestens auf Tage. Ein normaler Nightly-Lauf liest damit nur die Fenster
+-- an den beiden Grenzen (daily_cutoff und raw_cutoff) statt der kompletten Historie.
+-- Nachträglich importierte alte Snapshots: Zeile löschen -> nächster Lauf startet beim ältesten Snapshot.
+CREATE TABLE IF NOT EXISTS stats_history_compaction_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    weekly_until TIMESTAMP WITH TIME ZONE,
+    raw_until TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE stats_history_compaction_state IS 'High-Water-Marks der stats_history Compaction (weekly_until, raw_until)';
+
+-- 3. COMPACTION (ein Zeitfenster pro Aufruf, vorwärts laufend bis done)
+-- Jeder Aufruf liest nur [p_from, p_from + 4 Wochen) über idx_stats_history_created_at statt
+-- aller Zeilen vor dem Cutoff. Fenster beginnen montags, damit keine Tages- oder Wochenperiode
+-- auf zwei Fenster verteilt wird. p_from = NULL setzt bei weekly_until fort und springt nach der
+-- Wochen-Grenze direkt zu raw_until.
+DROP FUNCTION IF EXISTS compact_stats_history(INTEGER, INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION compact_stats_history(
+    p_from TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_raw_days INTEGER DEFAULT 30,
+    p_daily_days INTEGER DEFAULT 365,
+    p_batch_size INTEGER DEFAULT 5000
+)
+RETURNS TABLE (
+    deleted_rows INTEGER,
+    compacted_periods INTEGER,
+    next_from TIMESTAMP WITH TIME ZONE,
+    done BOOLEAN
+) AS $$
+DECLARE
+    -- Perioden-Grenzen auf Tages- bzw. Wochenanfang (UTC), damit nur vollständige Perioden verdichtet werden
+    raw_cutoff TIMESTAMP WITH TIME ZONE := date_trunc('day', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        - make_interval(days => p_raw_days);
+    daily_cutoff TIMESTAMP WITH TIME ZONE := date_trunc('week', (NOW() AT TIME ZONE 'UTC') - make_interval(days => p_daily_days))
+        AT TIME ZONE 'UTC';
+    window_start TIMESTAMP WITH TIME ZONE;
+    window_end TIMESTAMP WITH TIME ZONE;
+    v_next TIMESTAMP WITH TIME ZONE;
+    v_deleted INTEGER;
+    v_periods INTEGER;
+    state stats_history_compaction_state%ROWTYPE;
+BEGIN
+    INSERT INTO stats_history_compaction_state (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+    SELECT * INTO state FROM stats_history_compaction_state WHERE id FOR UPDATE;
+
+    -- Fortsetzen beim Wochen-High-Water-Mark, beim ersten Lauf ab dem ältesten Snapshot (Index-Lookup)
+    IF p_from IS NULL THEN
+        p_from := state.weekly_until;
+    END IF;
+    IF p_from IS NULL THEN
+        SELECT MIN(created_at) INTO p_from FROM stats_history;
+    END IF;
+    IF p_from IS NULL OR p_from >= raw_cutoff THEN
+        RETURN QUERY SELECT 0, 0, raw_cutoff, TRUE;
+        RETURN;
+    END IF;
+
+    window_start := date_trunc('week', p_from AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    window_end := LEAST(window_start + INTERVAL '4 weeks', raw_cutoff);
+
+    WITH old_rows AS (
+        SELECT
+            s.id,
+            s.user_id,
+            s.platform,
+            s.handle,
+            s.created_at,
+            s.net_growth,
+            CASE WHEN s.created_at < daily_cutoff THEN 'week' ELSE 'day' END AS granularity
+        FROM stats_history s
+        WHERE s.created_at >= window_start
+        AND s.created_at < window_end
+    ),
+    bucketed AS (
+        SELECT o.*, date_trunc(o.granularity, o.created_at AT TIME ZONE 'UTC') AS period
+        FROM old_rows o
+    ),
+    periods AS (
+        -- Perioden mit nur einem Snapshot sind schon verdichtet (oder brauchen es nicht)
+        SELECT
+            user_id,
+            platform,
+            handle,
+            granularity,
+            period,
+            (ARRAY_AGG(id ORDER BY created_at DESC, id DESC))[1] AS keep_id,
+            SUM(COALESCE(net_growth, 0)) AS net_growth
+        FROM bucketed
+        GROUP BY user_id, platform, handle, granularity, period
+        HAVING COUNT(*) > 1
+        LIMIT p_batch_size
+    ),
+    kept AS (
+        -- Letzter Snapshot der Periode bleibt und trägt das Perioden-Wachstum
+        UPDATE stats_history s
+        SET net_growth = p.net_growth,
+            compacted_to = p.granularity
+        FROM periods p
+        WHERE s.id = p.keep_id
+        RETURNING s.id
+    ),
+    removed AS (
+        DELETE FROM stats_history s
+        USING bucketed b
+        JOIN periods p
+            ON b.user_id = p.user_id
+            AND b.platform IS NOT DISTINCT FROM p.platform
+            AND b.handle IS NOT DISTINCT FROM p.handle
+            AND b.granularity = p.granularity
+            AND b.period = p.period
+        WHERE s.id = b.id
+        AND s.id <> p.keep_id
+        RETURNING s.id
+    )
+    SELECT (SELECT COUNT(*) FROM removed), (SELECT COUNT(*) FROM kept)
+    INTO v_deleted, v_periods;
+
+    -- Batch-Limit erreicht: dasselbe Fenster noch einmal
+    IF v_periods >= p_batch_size THEN
+        RETURN QUERY SELECT v_deleted, v_periods, window_start, FALSE;
+        RETURN;
+    END IF;
+
+    -- Fenster vollständig: High-Water-Marks nachziehen (nur zusammenhängend, nie zurück)
+    IF window_start <= COALESCE(state.weekly_until, window_start) THEN
+        state.weekly_until := GREATEST(state.weekly_until, LEAST(window_end, daily_cutoff));
+    END IF;
+    IF window_end > daily_cutoff AND window_start <= COALESCE(state.raw_until, window_start) THEN
+        state.raw_until := GREATEST(state.raw_until, window_end);
+    END IF;
+    UPDATE stats_history_compaction_state
+    SET weekly_until = state.weekly_until, raw_until = state.raw_until, updated_at = NOW()
+    WHERE id;
+
+    -- Wochen-Bereich fertig -> direkt zum Tages-High-Water-Mark springen (Fenster beginnen montags)
+    v_next := window_end;
+    IF v_next >= daily_cutoff AND state.raw_until > v_next THEN
+        v_next := date_trunc('week', state.raw_until AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    END IF;
+
+    RETURN QUERY SELECT v_deleted, v_periods, v_next, v_next >= raw_cutoff;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION compact_stats_history IS 'Verdichtet ein 4-Wochen-Fenster ab p_from: älter als p_raw_days auf Tages-, älter als p_daily_days auf Wochenwerte; liefert gelöschte Zeilen, Perioden und den Start des nächsten Fensters';
+
+-- Hinweis: stats_rollups (Migration 018) bleibt unverändert; rebuild_stats_rollups() nach einer Compaction
+-- würde für verdichtete Zeiträume nur noch Tages-/Wochenauflösung liefern.
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: stats_history Compaction erstellt' AS status;
@@ -0,0 +1,260 @@
+-- Migration 020: History Indizes & Partitionierung
+-- Datum: 2026-10-19
+-- Beschreibung: Composite-/Covering-Indizes für die häufigsten Zugriffsmuster und monatliche
+--               Range-Partitionierung von stats_history und revenue_history (nach created_at)
+--
+-- Hinweis: Die Tabellen werden in einer Transaktion umkopiert (Schreibzugriffe sind währenddessen
+--          gesperrt). Query-Pläne vorher/nachher: scripts/benchmark_query_plans.sql
+
+BEGIN;
+
+-- 1. PARTITIONS-HELFER: Monats-Partitionen bis p_months_ahead Monate in die Zukunft anlegen
+-- Zeilen, die schon in der DEFAULT-Partition liegen (z.B. created_at weit in der Zukunft), würden
+-- CREATE TABLE ... PARTITION OF scheitern lassen ("updated partition constraint for default partition
+-- would be violated") - sie werden vorher herausgenommen und danach direkt in die neue Partition
+-- geschrieben (direkt, damit die Statement-Trigger der Parent-Tabelle nicht erneut feuern).
+CREATE OR REPLACE FUNCTION ensure_history_partitions(
+    p_table TEXT,
+    p_from DATE DEFAULT CURRENT_DATE,
+    p_months_ahead INTEGER DEFAULT 3,
+    p_parent TEXT DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::DATE;
+    last_month DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead))::DATE;
+    partition_name TEXT;
+    default_name TEXT := p_table || '_default';
+    range_start TIMESTAMP WITH TIME ZONE;
+    range_end TIMESTAMP WITH TIME ZONE;
+    parked BIGINT := 0;
+    created INTEGER := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        -- Name immer nach der Ziel-Tabelle (z.B. stats_history_y2026m10), auch beim Umkopieren
+        partition_name := format('%s_y%sm%s', p_table, to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            range_start := month_start::TIMESTAMP AT TIME ZONE 'UTC';
+            range_end := (month_start + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+
+            -- Passende Zeilen aus der DEFAULT-Partition parken
+            parked := 0;
+            IF to_regclass(default_name) IS NOT NULL THEN
+                EXECUTE format(
+                    'CREATE TEMP TABLE history_partition_move ON COMMIT DROP AS
+                     WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *)
+                     SELECT * FROM moved',
+                    default_name, range_start, range_end
+                );
+                GET DIAGNOSTICS parked = ROW_COUNT;
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                COALESCE(p_parent, p_table),
+                range_start,
+                range_end
+            );
+            created := created + 1;
+
+            IF to_regclass('pg_temp.history_partition_move') IS NOT NULL THEN
+                IF parked > 0 THEN
+                    EXECUTE format('INSERT INTO %I SELECT * FROM history_partition_move', partition_name);
+                    RAISE NOTICE '%: % Zeilen aus % übernommen', partition_name, parked, default_name;
+                END IF;
+                DROP TABLE history_partition_move;
+            END IF;
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION ensure_history_partitions IS 'Legt fehlende Monats-Partitionen bis p_months_ahead Monate voraus an';
+
+-- Nightly: kommende Monate für beide History-Tabellen anlegen (scripts/compact_stats_history.py)
+CREATE OR REPLACE FUNCTION ensure_all_history_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+BEGIN
+    RETURN ensure_history_partitions('stats_history', CURRENT_DATE, p_months_ahead)
+         + ensure_history_partitions('revenue_history', CURRENT_DATE, p_months_ahead);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. UMWANDLUNG einer bestehenden Tabelle in eine nach created_at partitionierte Tabelle
+CREATE OR REPLACE FUNCTION partition_history_table(p_table TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+    staging TEXT := p_table || '_partitioned';
+    id_sequence TEXT := pg_get_serial_sequence(p_table, 'id');
+    is_identity BOOLEAN;
+    first_day DATE;
+    copied BIGINT;
+    pol RECORD;
+BEGIN
+    -- Bereits partitioniert -> nichts zu tun
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = p_table::regclass) THEN
+        RETURN 0;
+    END IF;
+
+    SELECT attidentity <> '' INTO is_identity
+    FROM pg_attribute
+    WHERE attrelid = p_table::regclass AND attname = 'id';
+
+    -- Partitionsschlüssel ist Teil des Primary Keys und darf nicht NULL sein
+    EXECUTE format('UPDATE %I SET created_at = %L WHERE created_at IS NULL', p_table, 'epoch');
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) PARTITION BY RANGE (created_at)',
+        staging, p_table
+    );
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN created_at SET NOT NULL, ADD PRIMARY KEY (id, created_at)', staging);
+
+    -- Monats-Partitionen ab dem ältesten Eintrag + DEFAULT für Ausreißer
+    EXECUTE format('SELECT MIN(created_at AT TIME ZONE ''UTC'')::DATE FROM %I WHERE created_at > %L', p_table, 'epoch')
+    INTO first_day;
+    PERFORM ensure_history_partitions(p_table, COALESCE(first_day, CURRENT_DATE), 3, staging);
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', p_table || '_default', staging);
+
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', staging, p_table);
+    GET DIAGNOSTICS copied = ROW_COUNT;
+
+    -- ID-Sequenz übernehmen (SERIAL: Ownership umhängen, IDENTITY: neue Sequenz)
+    IF is_identity THEN
+        id_sequence := p_table || '_row_id_seq';
+        EXECUTE format('CREATE SEQUENCE IF NOT EXISTS %I', id_sequence);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN id SET DEFAULT nextval(%L)', staging, id_sequence);
+    END IF;
+    IF id_sequence IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', id_sequence, staging);
+        EXECUTE format('SELECT setval(%L, GREATEST((SELECT COALESCE(MAX(id), 0) FROM %I), 1))', id_sequence, staging);
+    END IF;
+
+    -- RLS & Policies übernehmen
+    IF (SELECT relrowsecurity FROM pg_class WHERE oid = p_table::regclass) THEN
+        EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', staging);
+    END IF;
+    FOR pol IN SELECT * FROM pg_policies WHERE schemaname = 'public' AND tablename = p_table LOOP
+        EXECUTE format(
+            'CREATE POLICY %I ON %I AS %s FOR %s TO %s%s%s',
+            pol.policyname, staging, pol.permissive, pol.cmd, array_to_string(pol.roles, ', '),
+            CASE WHEN pol.qual IS NOT NULL THEN ' USING (' || pol.qual || ')' ELSE '' END,
+            CASE WHEN pol.with_check IS NOT NULL THEN ' WITH CHECK (' || pol.with_check || ')' ELSE '' END
+        );
+    END LOOP;
+
+    -- Tausch (Trigger, Indizes & Views werden unten neu angelegt)
+    EXECUTE format('DROP TABLE %I', p_table);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', staging, p_table);
+
+    RETURN copied;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION partition_history_table IS 'Kopiert eine History-Tabelle in eine monatlich nach created_at partitionierte Tabelle';
+
+-- Abhängige Views vorübergehend entfernen (werden unten identisch neu erstellt)
+DROP MATERIALIZED VIEW IF EXISTS global_reach_summary;
+DROP VIEW IF EXISTS revenue_summary;
+DROP VIEW IF EXISTS revenue_daily;
+
+SELECT partition_history_table('stats_history') AS stats_history_rows;
+SELECT partition_history_table('revenue_history') AS revenue_history_rows;
+
+-- 3. COMPOSITE- & COVERING-INDIZES (auf der Parent-Tabelle, gelten für alle Partitionen)
+
+-- Dashboard, Alerts, Correlation: user_id + ORDER BY created_at
+CREATE INDEX IF NOT EXISTS idx_stats_history_user_created
+    ON stats_history(user_id, created_at DESC) INCLUDE (platform, handle, followers, net_growth);
+-- calculate_growth: platform + handle + ORDER BY created_at DESC LIMIT 1
+CREATE INDEX IF NOT EXISTS idx_stats_history_series_created
+    ON stats_history(platform, handle, created_at DESC) INCLUDE (followers);
+-- table_version(): Anzahl + neueste ID pro User
+CREATE INDEX IF NOT EXISTS idx_stats_history_user_id ON stats_history(user_id, id DESC);
+-- Bestehende Indizes (Migration 003 / 019)
+CREATE INDEX IF NOT EXISTS idx_stats_history_growth ON stats_history(net_growth DESC) WHERE net_growth IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_stats_history_created_at ON stats_history(created_at);
+
+-- Revenue-Seite, Forecast, Correlation: user_id + ORDER BY created_at
+CREATE INDEX IF NOT EXISTS idx_rev_user_created
+    ON revenue_history(user_id, created_at DESC) INCLUDE (amount_net, platform, source);
+-- Top-Transaktionen: user_id + ORDER BY amount_net
+CREATE INDEX IF NOT EXISTS idx_rev_user_amount ON revenue_history(user_id, amount_net DESC);
+-- table_version(): Anzahl + neueste ID pro User
+CREATE INDEX IF NOT EXISTS idx_rev_user_id ON revenue_history(user_id, id DESC);
+-- Bestehende Indizes (Migration 004; idx_rev_user ist durch idx_rev_user_created abgedeckt)
+CREATE INDEX IF NOT EXISTS idx_rev_platform ON revenue_history(platform);
+CREATE INDEX IF NOT EXISTS idx_rev_created ON revenue_history(created_at DESC);
+DROP INDEX IF EXISTS idx_rev_user;
+
+-- 4. TRIGGER neu anlegen (Statement-Level auf der partitionierten Tabelle)
+DROP TRIGGER IF EXISTS trg_stats_rollups ON stats_history;
+CREATE TRIGGER trg_stats_rollups
+AFTER INSERT ON stats_history
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION stats_rollups_apply();
+
+DROP TRIGGER IF EXISTS trg_customer_activity ON revenue_history;
+CREATE TRIGGER trg_customer_activity
+AFTER INSERT ON revenue_history
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION customer_activity_apply();
+
+-- 5. VIEWS neu erstellen (Definitionen aus Migration 002, 004, 012)
+CREATE MATERIALIZED VIEW IF NOT EXISTS global_reach_summary AS
+SELECT
+    user_id,
+    SUM(followers) as total_followers,
+    COUNT(DISTINCT platform) as platform_count,
+    jsonb_agg(
+        jsonb_build_object(
+            'platform', platform,
+            'followers', followers,
+            'handle', handle
+        ) ORDER BY followers DESC
+    ) as platform_breakdown,
+    MAX(created_at) as last_updated
+FROM stats_history
+WHERE followers IS NOT NULL
+GROUP BY user_id;
+
+CREATE INDEX IF NOT EXISTS idx_global_reach_user ON global_reach_summary(user_id);
+COMMENT ON MATERIALIZED VIEW global_reach_summary IS 'Aggregierte Cross-Platform Reichweiten-Metriken pro User';
+
+CREATE OR REPLACE VIEW revenue_summary AS
+SELECT
+    user_id,
+    platform,
+    COUNT(*) as transaction_count,
+    SUM(amount_gross) as total_gross,
+    SUM(amount_net) as total_net,
+    AVG(fee_percentage) as avg_fee,
+    MAX(created_at) as last_transaction
+FROM revenue_history
+GROUP BY user_id, platform;
+
+COMMENT ON VIEW revenue_summary IS 'Aggregierte Revenue-Übersicht pro User und Plattform';
+
+CREATE OR REPLACE VIEW revenue_daily AS
+SELECT
+    user_id,
+    platform,
+    (created_at AT TIME ZONE 'UTC')::DATE AS day,
+    SUM(amount_net) AS amount
+FROM revenue_history
+GROUP BY user_id, platform, (created_at AT TIME ZONE 'UTC')::DATE;
+
+COMMENT ON VIEW revenue_daily IS 'Netto-Umsatz pro User, Plattform und Tag (UTC)';
+
+ANALYZE stats_history;
+ANALYZE revenue_history;
+
+COMMIT;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: History-Indizes & Partitionierung erstellt' AS status;
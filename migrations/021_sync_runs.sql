@@ -0,0 +1,49 @@
+-- Migration 021: Sync Runs
+-- Datum: 2026-10-19
+-- Beschreibung: Einheitliches Sync-Log für alle Plattformen (Dauer, Upstream-Latenz, HTTP-Status, geschriebene Zeilen, Fehlerklasse)
+
+-- 1. SYNC_RUNS Tabelle (ein Eintrag pro Sync-Versuch, geschrieben gebündelt von modules/sync_log.py)
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL, -- Creator Email
+    platform TEXT NOT NULL, -- instagram, tiktok, onlyfans, fansly, youtube
+    handle TEXT,
+    trigger TEXT NOT NULL DEFAULT 'manual', -- sidebar, onboarding, api_connections, revenue, youtube, of_panel, scheduled
+    status TEXT NOT NULL, -- success, failed
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    finished_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    upstream_ms INTEGER, -- Antwortzeit der Plattform-API (NULL = kein Upstream-Call)
+    http_status INTEGER,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    error_class TEXT, -- Exception-Typ oder UpstreamRejected
+    error_message TEXT
+);
+
+-- 2. Indizes: Sync-History pro User (paginiert) und Upstream-Auswertung pro Plattform
+CREATE INDEX IF NOT EXISTS idx_sync_runs_user_started ON sync_runs(user_id, started_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sync_runs_user_platform_started ON sync_runs(user_id, platform, started_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sync_runs_platform_started ON sync_runs(platform, started_at DESC);
+
+COMMENT ON TABLE sync_runs IS 'Log aller Plattform-Syncs (Dauer, Upstream-Latenz, Status, Zeilen)';
+
+-- 3. Upstream-Health pro User, Plattform und Tag (welche API wird langsamer / fällt aus?)
+CREATE OR REPLACE VIEW sync_upstream_health AS
+SELECT
+    user_id,
+    platform,
+    DATE_TRUNC('day', started_at) AS day,
+    COUNT(*) AS runs,
+    COUNT(*) FILTER (WHERE status = 'failed') AS failures,
+    ROUND(AVG(upstream_ms)) AS avg_upstream_ms,
+    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY upstream_ms) AS p95_upstream_ms,
+    ROUND(AVG(duration_ms)) AS avg_duration_ms,
+    SUM(rows_written) AS rows_written
+FROM sync_runs
+GROUP BY user_id, platform, DATE_TRUNC('day', started_at);
+
+-- RLS deaktivieren (Log-Writer schreibt mit Service-Key aus einem Hintergrund-Thread)
+ALTER TABLE sync_runs DISABLE ROW LEVEL SECURITY;
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Sync Runs erstellt' AS status;
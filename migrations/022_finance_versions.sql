@@ -0,0 +1,44 @@
+-- Migration 022: Finance Versions-Keys
+-- Datum: 2026-10-19
+-- Beschreibung: updated_at für revenue_history und transactions (per Trigger gepflegt), damit der
+--               Finance-Cache auch Korrekturen von Beträgen und Löschen + Neu-Anlegen erkennt
+
+-- 1. VERSIONS-SPALTE (Bestandszeilen bekommen den Migrationszeitpunkt)
+ALTER TABLE revenue_history
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+ALTER TABLE transactions
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+COMMENT ON COLUMN revenue_history.updated_at IS 'Letzte Änderung (Insert/Update) - Versions-Key für den Finance-Cache';
+COMMENT ON COLUMN transactions.updated_at IS 'Letzte Änderung (Insert/Update) - Versions-Key für den Finance-Cache';
+
+-- 2. TRIGGER: jede Änderung setzt updated_at (Anzahl + neuester updated_at ändern sich damit
+-- bei Insert, Update und Delete; ein neu angelegter Ersatz bekommt einen neueren Zeitstempel)
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row-Trigger auf der partitionierten revenue_history gilt für alle (auch künftige) Partitionen
+DROP TRIGGER IF EXISTS trg_revenue_history_updated_at ON revenue_history;
+CREATE TRIGGER trg_revenue_history_updated_at
+BEFORE UPDATE ON revenue_history
+FOR EACH ROW
+EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS trg_transactions_updated_at ON transactions;
+CREATE TRIGGER trg_transactions_updated_at
+BEFORE UPDATE ON transactions
+FOR EACH ROW
+EXECUTE FUNCTION touch_updated_at();
+
+-- 3. INDIZES für table_version(order_col="updated_at"): Anzahl + neuester updated_at pro User
+CREATE INDEX IF NOT EXISTS idx_rev_user_updated ON revenue_history(user_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_updated ON transactions(user_id, updated_at DESC);
+
+-- Bestätigung
+SELECT 'Migration erfolgreich: Finance Versions-Keys erstellt' AS status;
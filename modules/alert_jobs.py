@@ -0,0 +1,167 @@
+"""
+ALERT JOBS
+Sharding, Suppression-Fenster und gebündelter Digest-Versand für die Alert-Engine
+"""
+
+import html
+import zlib
+import requests
+import pandas as pd
+from modules import metrics
+
+SUPPRESSION_COLUMNS = ["user_id", "alert_type", "subject", "last_sent_at"]
+SUPPRESSION_KEY = ["user_id", "alert_type", "subject"]
+
+# Wie lange ein gesendeter Alert (pro User, Typ & Subject) stumm bleibt
+SUPPRESSION_HOURS = {
+    "WHALE_INACTIVE": 72,
+    "CONTENT_BURNOUT": 168,
+    "REVENUE_DROP": 24,
+    "FOLLOWER_DROP": 24
+}
+DEFAULT_SUPPRESSION_HOURS = 24
+
+SEVERITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+SEVERITY_EMOJI = {"HIGH": "🚨", "MEDIUM": "⚠️", "LOW": "ℹ️"}
+
+BREVO_URL = "https://api.brevo.com/v3/smtp/email"
+
+def shard_of(user_id, shard_count):
+    """Stabile Shard-Nummer eines Users (unabhängig von Prozess & Python-Hash-Seed)."""
+    return zlib.crc32(str(user_id).encode("utf-8")) % shard_count
+
+def shard_users(user_ids, shard_index, shard_count):
+    """
+    Filtert die User, die dieser Worker bearbeitet.
+
+    Args:
+        user_ids: Alle User Emails
+        shard_index: Index dieses Workers (0-basiert)
+        shard_count: Anzahl Worker
+
+    Returns:
+        list: Sortierte User Emails des Shards
+    """
+    return sorted({u for u in user_ids if u and shard_of(u, shard_count) == shard_index})
+
+def filter_suppressed(alerts, suppressions, now=None, hours=None):
+    """
+    Entfernt Alerts, die innerhalb ihres Suppression-Fensters schon versendet wurden.
+
+    Args:
+        alerts: DataFrame mit user_id, alert_type, subject, message, severity
+        suppressions: alert_suppressions-Zeilen (list of dicts oder DataFrame)
+        now: Referenzzeitpunkt (default: jetzt, UTC)
+        hours: Fenster pro alert_type (default: SUPPRESSION_HOURS)
+
+    Returns:
+        DataFrame: Fällige Alerts
+    """
+    if alerts.empty:
+        return alerts
+
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    hours = hours or SUPPRESSION_HOURS
+
+    sent = pd.DataFrame(suppressions, columns=SUPPRESSION_COLUMNS)
+    sent["last_sent_at"] = pd.to_datetime(sent["last_sent_at"], utc=True, errors="coerce")
+
+    keyed = alerts.assign(subject=alerts["subject"].fillna("").astype(str))
+    merged = keyed.merge(sent, on=SUPPRESSION_KEY, how="left")
+
+    window = pd.to_timedelta(merged["alert_type"].map(hours).fillna(DEFAULT_SUPPRESSION_HOURS), unit="h")
+    due = merged["last_sent_at"].isna() | (merged["last_sent_at"] <= now - window)
+    return keyed[due.to_numpy()].reset_index(drop=True)
+
+def suppression_records(alerts, now=None):
+    """Upsert-Payload für alert_suppressions nach erfolgreichem Versand."""
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    records = alerts[SUPPRESSION_KEY + ["message"]].rename(columns={"message": "last_message"})
+    records = records.drop_duplicates(SUPPRESSION_KEY, keep="last")
+    records["subject"] = records["subject"].fillna("").astype(str)
+    records["last_sent_at"] = now.isoformat()
+    return records.to_dict("records")
+
+def build_digest(alerts):
+    """
+    Baut eine Digest-Email aus allen Alerts eines Users.
+
+    Args:
+        alerts: DataFrame (ein User) mit alert_type, message, severity
+
+    Returns:
+        tuple: (subject, html)
+    """
+    ordered = alerts.assign(_rank=alerts["severity"].map(SEVERITY_ORDER).fillna(len(SEVERITY_ORDER)))\
+        .sort_values(["_rank", "alert_type"])
+    top = ordered.iloc[0]
+    emoji = SEVERITY_EMOJI.get(top["severity"], "📊")
+
+    if len(ordered) == 1:
+        subject = f"{emoji} PERFORMANCE ALERT: {top['alert_type'].replace('_', ' ')}"
+    else:
+        subject = f"{emoji} PERFORMANCE DIGEST: {len(ordered)} Alerts"
+
+    rows = "".join(
+        f"""
+                        <tr style="border-bottom: 1px solid #eee;">
+                            <td style="padding: 10px 0; width: 30px;">{SEVERITY_EMOJI.get(row.severity, "📊")}</td>
+                            <td style="padding: 10px 0;"><strong>{html.escape(str(row.alert_type))}</strong><br>{html.escape(str(row.message))}</td>
+                        </tr>"""
+        for row in ordered.itertuples()
+    )
+
+    body = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; padding: 20px;">
+                    <h2 style="color: #1f1f1f;">{emoji} System-Meldung</h2>
+                    <table style="width: 100%; border-collapse: collapse; font-size: 15px; color: #333;">{rows}
+                    </table>
+                    <a href="https://content-core.streamlit.app"
+                       style="display: inline-block; padding: 10px 20px; background: #007bff; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px;">
+                        Dashboard prüfen
+                    </a>
+                    <p style="font-size: 12px; color: #999; margin-top: 30px;">
+                        Content Core Performance Alert System
+                    </p>
+                </body>
+            </html>
+            """
+    return subject, body
+
+def send_digest(api_key, user_email, alerts):
+    """
+    Versendet alle Alerts eines Users als eine Email via Brevo.
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    if not api_key or alerts.empty:
+        return False
+
+    subject, body = build_digest(alerts)
+    payload = {
+        "sender": {
+            "name": "Content Core",
+            "email": "alerts@content-core.com"
+        },
+        "to": [
+            {
+                "email": user_email,
+                "name": "User"
+            }
+        ],
+        "subject": subject,
+        "htmlContent": body
+    }
+    headers = {
+        "accept": "application/json",
+        "api-key": api_key,
+        "content-type": "application/json"
+    }
+
+    response = requests.post(BREVO_URL, json=payload, headers=headers, timeout=15)
+    metrics.record_upstream("brevo", response)
+    sent = response.status_code == 201
+    metrics.EMAILS.inc(type="alert_digest", status="success" if sent else "failed")
+    return sent
@@ -0,0 +1,249 @@
+"""
+ALERT RULES ENGINE
+Lokale, vektorisierte Auswertung der Performance-Alerts (Spiegel von check_performance_alerts)
+"""
+
+import copy
+import pandas as pd
+import numpy as np
+from modules.anomaly import follower_anomalies, revenue_anomalies
+
+ALERT_COLUMNS = ["user_id", "alert_type", "subject", "message", "severity"]
+
+# Historie für die Follower-Baseline (Rolling Median/MAD über die letzten Snapshots)
+STATS_HISTORY_DAYS = 30
+
+# Deklarative Regeln mit konfigurierbaren Schwellwerten (Defaults = Migration 008)
+DEFAULT_RULES = {
+    "WHALE_INACTIVE": {
+        "enabled": True,
+        "severity": "HIGH",
+        "inactive_days": 7
+    },
+    "CONTENT_BURNOUT": {
+        "enabled": True,
+        "severity": "MEDIUM",
+        "min_score": 20,
+        "score_factor": 10
+    },
+    "REVENUE_DROP": {
+        "enabled": True,
+        "severity": "HIGH",
+        "drop_pct": 20,
+        "baseline_weeks": 8,
+        "z_threshold": 3.0
+    },
+    "FOLLOWER_DROP": {
+        "enabled": True,
+        "severity": "MEDIUM",
+        "lookback_hours": 24,
+        "max_alerts": 3,
+        "baseline_points": 14,
+        "z_threshold": 3.5,
+        "method": "mad"
+    }
+}
+
+def default_rules():
+    """Kopie der Default-Regeln (zum Anpassen der Schwellwerte)."""
+    return copy.deepcopy(DEFAULT_RULES)
+
+def frame_windows(now=None, rules=None):
+    """
+    Ladefenster der Eingabe-Frames: nur die Zeiträume, die die Regeln tatsächlich brauchen.
+
+    Die Grenzen liegen auf Tagesanfang (UTC), damit sie sich als Cache-Key nur einmal am Tag ändern.
+
+    Returns:
+        dict: {"revenue": ISO-Zeitstempel, "stats": ISO-Zeitstempel}
+    """
+    rules = rules or DEFAULT_RULES
+    today = (pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")).normalize()
+    revenue_days = 7 * (rules["REVENUE_DROP"]["baseline_weeks"] + 1)
+    return {
+        "revenue": (today - pd.Timedelta(days=revenue_days)).isoformat(),
+        "stats": (today - pd.Timedelta(days=STATS_HISTORY_DAYS)).isoformat()
+    }
+
+def _utc(values):
+    """Zeitstempel spaltenweise nach UTC parsen."""
+    return pd.to_datetime(values, utc=True, errors="coerce", format="mixed")
+
+def prepare_frames(revenue_rows=None, vault_rows=None, stats_rows=None, activity_rows=None):
+    """
+    Baut die Eingabe-Frames der Engine aus Supabase-Zeilen (beliebig viele User).
+
+    Args:
+        revenue_rows: revenue_history (user_id, source, amount_net, created_at)
+        vault_rows: vault_assets (user_id, total_revenue, ppv_opens)
+        stats_rows: stats_history (user_id, platform, handle, net_growth, created_at)
+        activity_rows: customer_activity (user_id, platform, customer, last_seen), optional
+
+    Returns:
+        dict: {"revenue", "vault", "stats"} (+ "activity") DataFrames mit festen Spalten/Typen
+    """
+    revenue = pd.DataFrame(revenue_rows or [], columns=["user_id", "source", "platform", "amount_net", "created_at"])
+    revenue["amount_net"] = pd.to_numeric(revenue["amount_net"], errors="coerce").fillna(0.0)
+    revenue["created_at"] = _utc(revenue["created_at"])
+
+    vault = pd.DataFrame(vault_rows or [], columns=["user_id", "total_revenue", "ppv_opens"])
+    vault["total_revenue"] = pd.to_numeric(vault["total_revenue"], errors="coerce").fillna(0.0)
+    vault["ppv_opens"] = pd.to_numeric(vault["ppv_opens"], errors="coerce").fillna(0)
+
+    stats = pd.DataFrame(stats_rows or [], columns=["user_id", "platform", "handle", "followers", "net_growth", "created_at"])
+    stats["net_growth"] = pd.to_numeric(stats["net_growth"], errors="coerce").fillna(0)
+    stats["created_at"] = _utc(stats["created_at"])
+
+    frames = {"revenue": revenue, "vault": vault, "stats": stats}
+
+    # Rollup aus Migration 013 ersetzt das "letzter Umsatz pro Quelle" aus der Historie
+    if activity_rows is not None:
+        activity = pd.DataFrame(activity_rows, columns=["user_id", "platform", "customer", "last_seen"])
+        activity["last_seen"] = _utc(activity["last_seen"])
+        frames["activity"] = activity
+
+    return frames
+
+def _alerts(user_ids, alert_type, messages, severity, subjects=""):
+    """Erstellt Alert-Zeilen im einheitlichen Format."""
+    return pd.DataFrame({
+        "user_id": np.asarray(user_ids),
+        "alert_type": alert_type,
+        "subject": subjects,
+        "message": np.asarray(messages, dtype=object),
+        "severity": severity
+    }, columns=ALERT_COLUMNS)
+
+def rule_whale_inactive(frames, config, now):
+    """Revenue-Quellen, deren letzter Umsatz älter als inactive_days ist."""
+    if "activity" in frames:
+        last_seen = frames["activity"]
+    else:
+        revenue = frames["revenue"]
+        last_seen = revenue.groupby(["user_id", "source"], as_index=False)["created_at"].max()
+        last_seen = last_seen.rename(columns={"created_at": "last_seen"})
+
+    inactive = last_seen[last_seen["last_seen"] < now - pd.Timedelta(days=config["inactive_days"])]
+    counts = inactive.groupby("user_id").size()
+    if counts.empty:
+        return None
+
+    messages = "Top-Spender inaktiv seit >" + str(config["inactive_days"]) + " Tagen: " \
+        + counts.astype(str).to_numpy(dtype=object) + " Whales benötigen Attention!"
+    return _alerts(counts.index, "WHALE_INACTIVE", messages, config["severity"])
+
+def rule_content_burnout(frames, config, now):
+    """Vault-Assets mit Score (Conversion Rate x Faktor) unter min_score."""
+    vault = frames["vault"]
+    vault = vault[(vault["total_revenue"] > 0) | (vault["ppv_opens"] > 0)]
+    if vault.empty:
+        return None
+
+    opens = vault["ppv_opens"].to_numpy(dtype=float)
+    conversion = np.divide(vault["total_revenue"].to_numpy(dtype=float), opens,
+                           out=np.zeros(len(vault)), where=opens > 0)
+    burned = vault[conversion * config["score_factor"] < config["min_score"]]
+    counts = burned.groupby("user_id").size()
+    if counts.empty:
+        return None
+
+    messages = "Content-Burnout detected: " + counts.astype(str).to_numpy(dtype=object) \
+        + " Assets mit Score <" + str(config["min_score"]) + "!"
+    return _alerts(counts.index, "CONTENT_BURNOUT", messages, config["severity"])
+
+def rule_revenue_drop(frames, config, now):
+    """
+    Wochen-Umsatz pro Plattform signifikant unter dem Median der Vorwochen (robuster z-Score).
+
+    Serien mit zu wenig Historie fallen auf den festen Vergleich mit der Vorwoche zurück.
+    In beiden Fällen muss der Rückgang mindestens drop_pct betragen.
+    """
+    revenue = frames["revenue"]
+    if revenue.empty:
+        return None
+
+    scores = revenue_anomalies(revenue, now=now, weeks=config["baseline_weeks"], threshold=config["z_threshold"])
+    if scores.empty:
+        return None
+
+    factor = 1 - config["drop_pct"] / 100
+    z = scores["z"].to_numpy(dtype=float)
+    this_week = scores["this_week"].to_numpy(dtype=float)
+    baseline = scores["baseline"].to_numpy(dtype=float)
+    last_week = np.nan_to_num(scores["last_week"].to_numpy(dtype=float))
+
+    significant = (z <= -config["z_threshold"]) & (this_week < baseline * factor)
+    fallback = np.isnan(z) & (last_week > 0) & (this_week < last_week * factor)
+    hit = significant | fallback
+    if not hit.any():
+        return None
+
+    dropped = scores[hit]
+    reference = np.where(significant, baseline, last_week)[hit]
+    pct = pd.Series(np.round((1 - this_week[hit] / reference) * 100).astype(int), index=dropped.index).astype(str)
+    compared = pd.Series(np.where(significant[hit], "dem Wochen-Median (z=" + np.char.mod("%.1f", z[hit]) + ")",
+                                  "letzter Woche"), index=dropped.index)
+    platform = dropped["platform"].astype(str)
+
+    messages = "Revenue-Drop auf " + platform + ": Diese Woche " + pct + "% unter " + compared + "!"
+    return _alerts(dropped["user_id"], "REVENUE_DROP", messages.to_numpy(dtype=object), config["severity"],
+                   platform.to_numpy(dtype=object))
+
+def rule_follower_drop(frames, config, now):
+    """Statistisch signifikante Follower-Einbrüche im Lookback-Fenster (max. max_alerts pro User)."""
+    scores = follower_anomalies(
+        frames["stats"], now=now,
+        lookback_hours=config["lookback_hours"],
+        window=config["baseline_points"],
+        threshold=config["z_threshold"],
+        method=config["method"]
+    )
+    if scores.empty:
+        return None
+
+    # Stärkste Einbrüche zuerst
+    recent = scores.sort_values("z").groupby("user_id").head(config["max_alerts"])
+    platform = recent["platform"].astype(str)
+    messages = "Follower-Drop auf " + platform + ": " + recent["net_growth"].abs().astype(int).astype(str) \
+        + " Follower verloren (z=" + recent["z"].round(1).astype(str) + ")!"
+    subjects = platform + "/" + recent["handle"].astype(str)
+    return _alerts(recent["user_id"], "FOLLOWER_DROP", messages.to_numpy(dtype=object), config["severity"],
+                   subjects.to_numpy(dtype=object))
+
+# Regel-Name -> Auswertungsfunktion
+RULE_EVALUATORS = {
+    "WHALE_INACTIVE": rule_whale_inactive,
+    "CONTENT_BURNOUT": rule_content_burnout,
+    "REVENUE_DROP": rule_revenue_drop,
+    "FOLLOWER_DROP": rule_follower_drop
+}
+
+def evaluate_rules(frames, rules=None, now=None):
+    """
+    Wertet alle aktiven Regeln für alle User in den Frames in einem Durchlauf aus.
+
+    Args:
+        frames: Ergebnis von prepare_frames() (ein oder viele User)
+        rules: Regel-Konfiguration (default: DEFAULT_RULES)
+        now: Referenzzeitpunkt (default: jetzt, UTC)
+
+    Returns:
+        DataFrame mit ALERT_COLUMNS
+    """
+    rules = rules or DEFAULT_RULES
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")
+    if now.tzinfo is None:
+        now = now.tz_localize("UTC")
+
+    results = []
+    for name, config in rules.items():
+        evaluator = RULE_EVALUATORS.get(name)
+        if evaluator is None or not config.get("enabled", True):
+            continue
+        alerts = evaluator(frames, config, now)
+        if alerts is not None and not alerts.empty:
+            results.append(alerts)
+
+    if not results:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    return pd.concat(results, ignore_index=True)
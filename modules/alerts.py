@@ -4,192 +4,244 @@ Automatische Email-Benachrichtigungen für kritische Events
 """
 
 import streamlit as st
-import requests
+import pandas as pd
+from modules.alert_rules import prepare_frames, evaluate_rules, default_rules, frame_windows
+from modules.alert_jobs import filter_suppressed, suppression_records, send_digest
+from modules.data_loader import table_version, fetch_all_rows
+from modules import metrics
 
-def send_performance_alert(alert_type, message, severity="MEDIUM"):
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_alert_frames(_supabase, user_email, data_version, revenue_since, stats_since):
     """
-    Sendet Performance-Alert via Brevo (Sendinblue) Email.
+    Lädt die Eingabe-Frames der Alert-Engine (gecacht pro Daten-Version und Ladefenster).
+    
+    Wie scripts/alert_scan.py nur die Zeitfenster aus frame_windows(), damit ein
+    Sync (neue Version) nicht die komplette Historie nachlädt.
+    
+    Returns:
+        dict: {"revenue", "vault", "stats", "activity"} DataFrames
+    """
+    revenue_rows = fetch_all_rows(_supabase, "revenue_history", "id, user_id, source, platform, amount_net, created_at", user_email,
+                                  since=revenue_since)
+    vault_rows = fetch_all_rows(_supabase, "vault_assets", "id, user_id, total_revenue, ppv_opens", user_email)
+    stats_rows = fetch_all_rows(_supabase, "stats_history", "id, user_id, platform, handle, followers, net_growth, created_at", user_email,
+                                since=stats_since)
+    activity_rows = fetch_all_rows(_supabase, "customer_activity", "user_id, platform, customer, last_seen", user_email,
+                                   order_col="platform,customer")
+    return prepare_frames(revenue_rows, vault_rows, stats_rows, activity_rows)
+
+def get_alert_version(supabase, user_email):
+    """Versions-Schlüssel über alle Tabellen, die in die Alert-Regeln einfließen (vault_assets.updated_at per Trigger, Migration 017)."""
+    return "|".join([
+        table_version(supabase, "revenue_history", user_email),
+        table_version(supabase, "stats_history", user_email),
+        table_version(supabase, "vault_assets", user_email, order_col="updated_at")
+    ])
+
+def get_alert_rules():
+    """Aktive Regel-Konfiguration der Session (Schwellwerte im Dashboard anpassbar)."""
+    if "alert_rules" not in st.session_state:
+        st.session_state.alert_rules = default_rules()
+    return st.session_state.alert_rules
+
+def evaluate_user_alerts(supabase, user_email, rules=None):
+    """
+    Wertet die Alert-Regeln lokal aus (ersetzt den RPC check_performance_alerts).
+    
+    Returns:
+        DataFrame: Alerts mit user_id, alert_type, subject, message, severity
+    """
+    rules = rules or get_alert_rules()
+    windows = frame_windows(rules=rules)
+    frames = load_alert_frames(supabase, user_email, get_alert_version(supabase, user_email),
+                               windows["revenue"], windows["stats"])
+    with metrics.ALERT_EVALUATION.time(scope="user"):
+        alerts = evaluate_rules(frames, rules)
+    metrics.ALERTS_FOUND.inc(len(alerts), scope="user")
+    return alerts
+
+def check_alerts(supabase, user_email, rules=None):
+    """
+    Wertet die Alert-Regeln für einen User aus.
+    
+    Returns:
+        list: Alerts als dicts (alert_type, subject, message, severity)
+    """
+    return evaluate_user_alerts(supabase, user_email, rules).drop(columns="user_id").to_dict("records")
+
+def deliver_alerts(supabase, user_email, alerts, respect_suppression=True):
+    """
+    Versendet Alerts als ein Digest und merkt den Versand in alert_suppressions.
     
     Args:
-        alert_type: Art des Alerts (z.B. WHALE_INACTIVE)
-        message: Alert-Nachricht
-        severity: HIGH, MEDIUM, LOW
+        supabase: Supabase Client
+        user_email: Empfänger
+        alerts: DataFrame aus evaluate_user_alerts()
+        respect_suppression: Bereits gemeldete Alerts im Fenster überspringen
     
     Returns:
-        bool: True bei Erfolg
+        int: Anzahl versendeter Alerts
+    """
+    if respect_suppression and not alerts.empty:
+        sent = supabase.table("alert_suppressions")\
+            .select("user_id, alert_type, subject, last_sent_at")\
+            .eq("user_id", user_email)\
+            .execute()
+        alerts = filter_suppressed(alerts, sent.data or [])
+    
+    if alerts.empty:
+        return 0
+    
+    brevo_api_key = st.secrets.get("BREVO_API_KEY", "")
+    if not brevo_api_key:
+        st.warning("⚠️ BREVO_API_KEY nicht konfiguriert. Alerts werden nicht versendet.")
+        return 0
+    
+    if not send_digest(brevo_api_key, user_email, alerts):
+        return 0
+    
+    supabase.table("alert_suppressions")\
+        .upsert(suppression_records(alerts), on_conflict="user_id,alert_type,subject")\
+        .execute()
+    return len(alerts)
+
+def check_alerts_after_sync(supabase, user_email):
+    """
+    Prüft die Alerts direkt nach einem Sync und meldet neue Treffer per Toast.
+    
+    Returns:
+        int: Anzahl Alerts
     """
     try:
-        # Brevo API Key aus Secrets
-        brevo_api_key = st.secrets.get("BREVO_API_KEY", "")
-        
-        if not brevo_api_key:
-            st.warning("⚠️ BREVO_API_KEY nicht konfiguriert. Alerts werden nicht versendet.")
-            return False
-        
-        user_email = st.session_state.get('user_email', 'unknown')
-        
-        # Severity-Emoji
-        severity_emoji = {
-            "HIGH": "🚨",
-            "MEDIUM": "⚠️",
-            "LOW": "ℹ️"
-        }
-        emoji = severity_emoji.get(severity, "📊")
-        
-        # Brevo API Endpoint
-        url = "https://api.brevo.com/v3/smtp/email"
-        
-        headers = {
-            "accept": "application/json",
-            "api-key": brevo_api_key,
-            "content-type": "application/json"
-        }
-        
-        payload = {
-            "sender": {
-                "name": "Content Core",
-                "email": "alerts@content-core.com"
-            },
-            "to": [
-                {
-                    "email": user_email,
-                    "name": "User"
-                }
-            ],
-            "subject": f"{emoji} PERFORMANCE ALERT: {alert_type.replace('_', ' ')}",
-            "htmlContent": f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; padding: 20px;">
-                    <h2 style="color: #1f1f1f;">{emoji} System-Meldung</h2>
-                    <p style="font-size: 16px; color: #333;">{message}</p>
-                    <hr style="border: 1px solid #eee; margin: 20px 0;">
-                    <p style="font-size: 14px; color: #666;">
-                        <strong>Severity:</strong> {severity}<br>
-                        <strong>Alert Type:</strong> {alert_type}
-                    </p>
-                    <a href="https://content-core.streamlit.app" 
-                       style="display: inline-block; padding: 10px 20px; background: #007bff; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px;">
-                        Dashboard prüfen
-                    </a>
-                    <p style="font-size: 12px; color: #999; margin-top: 30px;">
-                        Content Core Performance Alert System
-                    </p>
-                </body>
-            </html>
-            """
-        }
-        
-        response = requests.post(url, json=payload, headers=headers)
-        
-        return response.status_code == 201
-        
+        alerts = check_alerts(supabase, user_email)
+        st.session_state.alert_results = alerts
+        if alerts:
+            st.toast(f"🚨 {len(alerts)} Performance-Alert(s) - siehe ALERTS")
+        return len(alerts)
     except Exception as e:
-        st.error(f"Email Error: {e}")
-        return False
+        # Silent fail - Sync soll durch Alerts nicht scheitern
+        print(f"Alert Engine Error: {e}")
+        metrics.PIPELINE_ERRORS.inc(pipeline="alerts")
+        return 0
 
 def run_alert_engine(supabase):
     """
     Führt Alert-Engine aus und versendet Benachrichtigungen.
     
-    Prüft Performance-Metriken via RPC und sendet Alerts bei kritischen Events.
+    Prüft Performance-Metriken lokal und sendet fällige Alerts (Suppression-Fenster)
+    gebündelt als ein Digest. Der geplante Multi-User-Lauf ist scripts/alert_scan.py.
     """
     try:
         user_email = st.session_state.get('user_email', 'unknown')
         
-        # RPC-Call für Performance-Alerts
-        alerts = supabase.rpc('check_performance_alerts', {'p_user_id': user_email}).execute()
-        
-        if alerts.data and len(alerts.data) > 0:
-            # Alerts verarbeiten
-            for alert in alerts.data:
-                alert_type = alert.get('alert_type', 'UNKNOWN')
-                message = alert.get('message', 'No message')
-                severity = alert.get('severity', 'MEDIUM')
-                
-                # Email senden
-                send_performance_alert(alert_type, message, severity)
-            
-            return len(alerts.data)
-        
-        return 0
+        alerts = evaluate_user_alerts(supabase, user_email)
+        return deliver_alerts(supabase, user_email, alerts)
         
     except Exception as e:
         # Silent fail - Alert-Engine soll App nicht crashen
         print(f"Alert Engine Error: {e}")
+        metrics.PIPELINE_ERRORS.inc(pipeline="alerts")
         return 0
 
+def _display_alert(alert):
+    """Zeigt einen Alert passend zur Severity an."""
+    alert_type = alert.get('alert_type', 'UNKNOWN')
+    message = alert.get('message', 'No message')
+    severity = alert.get('severity', 'MEDIUM')
+    
+    if severity == "HIGH":
+        st.error(f"🚨 **{alert_type}**: {message}")
+    elif severity == "MEDIUM":
+        st.warning(f"⚠️ **{alert_type}**: {message}")
+    else:
+        st.info(f"ℹ️ **{alert_type}**: {message}")
+
 def display_alert_dashboard(supabase):
     """Rendert Alert-Dashboard mit manueller Trigger-Option."""
     st.title("🚨 PERFORMANCE ALERTS")
     
     user_email = st.session_state.get('user_email', 'unknown')
+    rules = get_alert_rules()
     
-    st.info("""
+    st.info(f"""
     **Automatisches Alert-System**
     
-    Das System prüft automatisch:
-    - 🐋 Whale-Inaktivität (>7 Tage)
-    - 🔥 Content-Burnout (Score <20)
-    - 💰 Revenue-Drops (>20% weniger)
-    - 📉 Follower-Drops (negative Growth)
+    Das System prüft nach jedem Sync automatisch:
+    - 🐋 Whale-Inaktivität (>{rules['WHALE_INACTIVE']['inactive_days']} Tage)
+    - 🔥 Content-Burnout (Score <{rules['CONTENT_BURNOUT']['min_score']})
+    - 💰 Revenue-Drops (>{rules['REVENUE_DROP']['drop_pct']}% unter dem Wochen-Median, z ≤ -{rules['REVENUE_DROP']['z_threshold']})
+    - 📉 Follower-Drops (signifikant, z ≤ -{rules['FOLLOWER_DROP']['z_threshold']})
     """)
     
     # Manuelle Prüfung
     if st.button("🔍 JETZT PRÜFEN", use_container_width=True):
         with st.spinner("Prüfe Performance-Metriken..."):
             try:
-                alerts = supabase.rpc('check_performance_alerts', {'p_user_id': user_email}).execute()
-                
-                if alerts.data and len(alerts.data) > 0:
-                    st.warning(f"⚠️ {len(alerts.data)} Alert(s) gefunden!")
-                    
-                    for alert in alerts.data:
-                        alert_type = alert.get('alert_type', 'UNKNOWN')
-                        message = alert.get('message', 'No message')
-                        severity = alert.get('severity', 'MEDIUM')
-                        
-                        # Display Alert
-                        if severity == "HIGH":
-                            st.error(f"🚨 **{alert_type}**: {message}")
-                        elif severity == "MEDIUM":
-                            st.warning(f"⚠️ **{alert_type}**: {message}")
-                        else:
-                            st.info(f"ℹ️ **{alert_type}**: {message}")
-                    
-                    # Email-Option
-                    if st.button("📧 ALERTS PER EMAIL SENDEN"):
-                        sent_count = 0
-                        for alert in alerts.data:
-                            if send_performance_alert(
-                                alert.get('alert_type'),
-                                alert.get('message'),
-                                alert.get('severity')
-                            ):
-                                sent_count += 1
-                        
-                        if sent_count > 0:
-                            st.success(f"✅ {sent_count} Alert(s) per Email versendet!")
-                        else:
-                            st.error("❌ Email-Versand fehlgeschlagen")
-                else:
-                    st.success("✅ Keine Alerts! Alles läuft optimal.")
-                    
+                st.session_state.alert_results = check_alerts(supabase, user_email, rules)
             except Exception as e:
                 st.error(f"Alert Check Error: {e}")
-                st.info("💡 Stelle sicher, dass Migration 008 ausgeführt wurde: `migrations/008_performance_alerts.sql`")
     
-    # Alert-History (optional)
+    alerts = st.session_state.get("alert_results")
+    if alerts is not None:
+        if len(alerts) > 0:
+            st.warning(f"⚠️ {len(alerts)} Alert(s) gefunden!")
+            
+            for alert in alerts:
+                _display_alert(alert)
+            
+            # Email-Option (ein Digest, manueller Versand ignoriert das Suppression-Fenster)
+            if st.button("📧 ALERTS PER EMAIL SENDEN"):
+                try:
+                    sent_count = deliver_alerts(
+                        supabase, user_email,
+                        pd.DataFrame(alerts).assign(user_id=user_email),
+                        respect_suppression=False
+                    )
+                except Exception as e:
+                    sent_count = 0
+                    print(f"Alert Digest Error: {e}")
+                
+                if sent_count > 0:
+                    st.success(f"✅ {sent_count} Alert(s) per Email versendet!")
+                else:
+                    st.error("❌ Email-Versand fehlgeschlagen")
+        else:
+            st.success("✅ Keine Alerts! Alles läuft optimal.")
+    
+    # Alert-Konfiguration
     st.markdown("---")
     st.markdown("### 📜 ALERT-KONFIGURATION")
     
     with st.expander("⚙️ ALERT-SCHWELLWERTE"):
-        st.markdown("""
-        **Aktuelle Schwellwerte:**
+        col1, col2 = st.columns(2)
+        with col1:
+            rules['WHALE_INACTIVE']['inactive_days'] = st.number_input(
+                "Whale-Inaktivität (Tage)", min_value=1, value=int(rules['WHALE_INACTIVE']['inactive_days']), key="rule_whale_days"
+            )
+            rules['CONTENT_BURNOUT']['min_score'] = st.number_input(
+                "Content-Burnout (Score <)", min_value=1, max_value=100, value=int(rules['CONTENT_BURNOUT']['min_score']), key="rule_burnout_score"
+            )
+        with col2:
+            rules['REVENUE_DROP']['drop_pct'] = st.number_input(
+                "Revenue-Drop (% vs. Vorwoche)", min_value=1, max_value=100, value=int(rules['REVENUE_DROP']['drop_pct']), key="rule_revenue_drop"
+            )
+            rules['FOLLOWER_DROP']['lookback_hours'] = st.number_input(
+                "Follower-Drop Zeitraum (Stunden)", min_value=1, value=int(rules['FOLLOWER_DROP']['lookback_hours']), key="rule_follower_hours"
+            )
+        
+        col3, col4 = st.columns(2)
+        with col3:
+            rules['REVENUE_DROP']['z_threshold'] = st.number_input(
+                "Revenue-Drop Signifikanz (|z| ≥)", min_value=1.0, max_value=10.0, step=0.5,
+                value=float(rules['REVENUE_DROP']['z_threshold']), key="rule_revenue_z"
+            )
+        with col4:
+            rules['FOLLOWER_DROP']['z_threshold'] = st.number_input(
+                "Follower-Drop Signifikanz (|z| ≥)", min_value=1.0, max_value=10.0, step=0.5,
+                value=float(rules['FOLLOWER_DROP']['z_threshold']), key="rule_follower_z"
+            )
         
-        - **Whale-Inaktivität:** >7 Tage
-        - **Content-Burnout:** Score <20
-        - **Revenue-Drop:** >20% weniger als Vorwoche
-        - **Follower-Drop:** Negative Growth in letzten 24h
+        for name in rules:
+            rules[name]['enabled'] = st.checkbox(name, value=rules[name].get('enabled', True), key=f"rule_enabled_{name}")
         
-        *Schwellwerte können in `migrations/008_performance_alerts.sql` angepasst werden.*
-        """)
+        st.caption("Regeln werden lokal ausgewertet (`modules/alert_rules.py`); die Defaults entsprechen `migrations/008_performance_alerts.sql`.")
@@ -0,0 +1,233 @@
+"""
+ANOMALY DETECTION
+Robuste Rolling-Statistiken (Median/MAD, EWMA) über alle Follower- und Revenue-Serien in einem NumPy-Durchlauf
+"""
+
+import warnings
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from modules.forecasting import build_daily_matrix
+
+# MAD -> Standardabweichung (Normalverteilung)
+MAD_SCALE = 1.4826
+
+FOLLOWER_KEYS = ["user_id", "platform", "handle"]
+REVENUE_KEYS = ["user_id", "platform"]
+
+def _utc_now(now):
+    """Referenzzeitpunkt als UTC-Timestamp."""
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    return now.tz_localize("UTC") if now.tzinfo is None else now.tz_convert("UTC")
+
+def pack_series(frame, keys, time_col, value_col, max_points=None):
+    """
+    Packt Langformat-Zeilen rechtsbündig in eine Matrix Serien x Beobachtungen.
+
+    Args:
+        frame: DataFrame mit keys, time_col, value_col
+        keys: Spalten, die eine Serie identifizieren
+        time_col: Sortierspalte
+        value_col: Messwert
+        max_points: Nur die letzten N Beobachtungen je Serie (default: alle)
+
+    Returns:
+        tuple: (keys DataFrame, times ndarray, values ndarray [Serien, Punkte]),
+               links mit NaT/NaN aufgefüllt
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=keys), np.empty((0, 0), dtype="datetime64[ns]"), np.empty((0, 0))
+
+    ordered = frame.sort_values(keys + [time_col], kind="mergesort")
+    grouped = ordered.groupby(keys, sort=False, dropna=False)
+    codes = grouped.ngroup().to_numpy()
+    position = grouped.cumcount().to_numpy()
+    lengths = np.bincount(codes)
+
+    # Position vom Ende der Serie (0 = neuester Punkt)
+    from_end = lengths[codes] - 1 - position
+    width = int(lengths.max()) if max_points is None else int(min(lengths.max(), max_points))
+    keep = from_end < width
+
+    values = np.full((len(lengths), width), np.nan)
+    times = np.full((len(lengths), width), np.datetime64("NaT"), dtype="datetime64[ns]")
+    cols = width - 1 - from_end[keep]
+    values[codes[keep], cols] = pd.to_numeric(ordered[value_col], errors="coerce").to_numpy(dtype=float)[keep]
+    times[codes[keep], cols] = pd.to_datetime(ordered[time_col], utc=True).dt.tz_localize(None).to_numpy()[keep]
+
+    key_frame = ordered.loc[grouped.head(1).index, keys].reset_index(drop=True)
+    return key_frame, times, values
+
+def robust_zscores(values, window, recent=1, min_periods=5, min_scale=1.0):
+    """
+    Robuster z-Score der letzten `recent` Spalten gegen die jeweils `window` vorherigen Werte.
+
+    Args:
+        values: Matrix [Serien, Punkte] (NaN = fehlt)
+        window: Länge der Baseline vor jedem Punkt
+        recent: Anzahl der zu bewertenden Spalten am Ende
+        min_periods: Mindestanzahl gültiger Baseline-Werte (sonst z = NaN)
+        min_scale: Untergrenze für die Streuung (verhindert z = inf bei konstanten Serien)
+
+    Returns:
+        tuple: (median, scale, z) je [Serien, recent]
+    """
+    n_series, n_points = values.shape
+    recent = min(recent, n_points)
+
+    # Baseline-Fenster für jede Position j = values[:, j-window:j]
+    padded = np.hstack([np.full((n_series, window), np.nan), values])
+    baseline = sliding_window_view(padded, window, axis=1)[:, n_points - recent:n_points]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(baseline, axis=-1)
+        mad = np.nanmedian(np.abs(baseline - median[..., None]), axis=-1)
+
+    scale = np.maximum(np.nan_to_num(mad * MAD_SCALE), min_scale)
+    z = (values[:, n_points - recent:] - median) / scale
+    z[(~np.isnan(baseline)).sum(axis=-1) < min_periods] = np.nan
+    return median, scale, z
+
+def ewma_zscores(values, span, recent=1, min_periods=5, min_scale=1.0):
+    """
+    z-Score gegen EWMA-Mittel und -Varianz (eine Schleife über die Zeit, vektorisiert über alle Serien).
+
+    Returns:
+        tuple: (mean, scale, z) je [Serien, recent]
+    """
+    n_series, n_points = values.shape
+    recent = min(recent, n_points)
+    alpha = 2.0 / (span + 1.0)
+
+    mean = np.full(n_series, np.nan)
+    var = np.zeros(n_series)
+    seen = np.zeros(n_series, dtype=int)
+    out_mean = np.full((n_series, recent), np.nan)
+    out_scale = np.full((n_series, recent), np.nan)
+    out_z = np.full((n_series, recent), np.nan)
+
+    for j in range(n_points):
+        x = values[:, j]
+        valid = ~np.isnan(x)
+
+        # Bewertung mit dem Zustand VOR dem Punkt
+        if j >= n_points - recent:
+            k = j - (n_points - recent)
+            scale = np.maximum(np.sqrt(var), min_scale)
+            out_mean[:, k] = mean
+            out_scale[:, k] = scale
+            out_z[:, k] = np.where(seen >= min_periods, (x - mean) / scale, np.nan)
+
+        first = valid & np.isnan(mean)
+        mean = np.where(first, x, mean)
+        update = valid & ~first
+        delta = np.where(update, x - mean, 0.0)
+        mean = mean + alpha * delta
+        var = np.where(update, (1 - alpha) * (var + alpha * delta ** 2), var)
+        seen = seen + valid
+
+    return out_mean, out_scale, out_z
+
+def follower_anomalies(stats, now=None, lookback_hours=24, window=14, threshold=3.5, min_periods=5,
+                       method="mad", recent=5):
+    """
+    Signifikante Follower-Einbrüche (net_growth) pro User, Plattform & Handle.
+
+    Args:
+        stats: DataFrame mit user_id, platform, handle, net_growth, created_at
+        now: Referenzzeitpunkt (default: jetzt, UTC)
+        lookback_hours: Nur Snapshots aus diesem Zeitraum melden
+        window: Baseline-Länge (Snapshots) bzw. EWMA-Span
+        threshold: |z| ab dem ein Einbruch signifikant ist
+        min_periods: Mindest-Historie je Serie
+        method: "mad" (Rolling Median/MAD) oder "ewma"
+        recent: Letzte N Snapshots je Serie, die bewertet werden
+
+    Returns:
+        DataFrame: user_id, platform, handle, created_at, net_growth, baseline, z
+    """
+    columns = FOLLOWER_KEYS + ["created_at", "net_growth", "baseline", "z"]
+    if stats.empty:
+        return pd.DataFrame(columns=columns)
+
+    now = _utc_now(now)
+    frame = stats.assign(platform=stats["platform"].fillna("unknown"), handle=stats["handle"].fillna(""))
+    keys, times, values = pack_series(frame.dropna(subset=["created_at"]), FOLLOWER_KEYS, "created_at", "net_growth",
+                                      max_points=window + recent)
+    if values.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    scorer = robust_zscores if method == "mad" else ewma_zscores
+    center, _, z = scorer(values, window, recent=recent, min_periods=min_periods)
+
+    recent_times = times[:, -z.shape[1]:]
+    since = (now - pd.Timedelta(hours=lookback_hours)).tz_convert(None).to_datetime64()
+    hit = (z <= -threshold) & (recent_times >= since) & (values[:, -z.shape[1]:] < 0)
+
+    rows, cols = np.nonzero(hit)
+    result = keys.iloc[rows].reset_index(drop=True)
+    result["created_at"] = pd.to_datetime(recent_times[rows, cols]).tz_localize("UTC")
+    result["net_growth"] = values[:, -z.shape[1]:][rows, cols]
+    result["baseline"] = center[rows, cols]
+    result["z"] = z[rows, cols]
+    return result[columns]
+
+def weekly_revenue(revenue, now=None, weeks=8):
+    """
+    Netto-Umsatz der letzten weeks+1 Wochen (rückwärts ab gestern) pro User & Plattform.
+
+    Nur abgeschlossene Tage: der angebrochene heutige Tag würde die aktuelle Woche
+    gegenüber den vollen Vorwochen verkürzen und den z-Score künstlich senken.
+
+    Returns:
+        tuple: (keys DataFrame, Matrix [Serien, Wochen]; letzte Spalte = letzte 7 vollen Tage)
+    """
+    now = _utc_now(now)
+    end = now.tz_convert(None).normalize() - pd.Timedelta(days=1)
+    if revenue.empty:
+        return pd.DataFrame(columns=REVENUE_KEYS), np.empty((0, 0))
+
+    daily = pd.DataFrame({
+        "user_id": revenue["user_id"],
+        "platform": revenue["platform"].fillna("unknown"),
+        "date": revenue["created_at"].dt.tz_convert(None).dt.normalize(),
+        "amount": revenue["amount_net"]
+    }).dropna(subset=["date"])
+    index, _, Y = build_daily_matrix(daily, end=end)
+    if Y.size == 0:
+        return pd.DataFrame(columns=REVENUE_KEYS), np.empty((0, 0))
+
+    # Auf volle Wochen links auffüllen (NaN = vor dem ersten Umsatz)
+    n_days = 7 * (weeks + 1)
+    if Y.shape[1] < n_days:
+        Y = np.hstack([np.full((Y.shape[0], n_days - Y.shape[1]), np.nan), Y])
+    blocks = Y[:, -n_days:].reshape(len(Y), weeks + 1, 7)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        weekly = np.where(np.isnan(blocks).all(axis=-1), np.nan, np.nansum(blocks, axis=-1))
+
+    return index.to_frame(index=False), weekly
+
+def revenue_anomalies(revenue, now=None, weeks=8, threshold=3.0, min_periods=4, min_scale=1.0):
+    """
+    Wochen-Umsatz der aktuellen Woche gegen Median/MAD der Vorwochen pro User & Plattform.
+
+    Returns:
+        DataFrame: user_id, platform, this_week, last_week, baseline, z
+                   (z = NaN bei zu wenig Historie)
+    """
+    columns = REVENUE_KEYS + ["this_week", "last_week", "baseline", "z"]
+    keys, weekly = weekly_revenue(revenue, now=now, weeks=weeks)
+    if weekly.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    median, _, z = robust_zscores(weekly, weeks, recent=1, min_periods=min_periods, min_scale=min_scale)
+
+    result = keys.copy()
+    result["this_week"] = np.nan_to_num(weekly[:, -1])
+    result["last_week"] = weekly[:, -2]
+    result["baseline"] = median[:, 0]
+    result["z"] = z[:, 0]
+    return result[columns]
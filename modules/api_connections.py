@@ -6,6 +6,7 @@ Sichere Verwaltung von API-Tokens für Platform-Integrationen
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+from modules import sync_history
 
 def display_connection_manager(supabase):
     """Quick Connection Manager für Fansly & OnlyFans."""
@@ -44,7 +45,7 @@ def display_connection_manager(supabase):
         
         if st.button("SYNC FANSLY NOW", use_container_width=True):
             from app import sync_fansly_api
-            if sync_fansly_api(user_email):
+            if sync_fansly_api(user_email, trigger="api_connections"):
                 st.success("✅ Fansly Daten aktualisiert!")
                 st.rerun()
             else:
@@ -201,6 +202,10 @@ def render_api_connections(supabase):
         else:
             st.warning("API Token erforderlich")
     
+    # Sync-Log aller Plattformen (Dauer, Upstream-Latenz, Fehler)
+    st.markdown("---")
+    sync_history.render_sync_history(supabase, user_email, key="api_sync_history")
+    
     # Platform-Specific Guides
     st.markdown("---")
     st.markdown("### 📚 PLATFORM GUIDES")
@@ -1,30 +1,36 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from modules.sections import render_sections
 
-def render_channels():
-    st.title("CHANNELS")
+def render_youtube():
+    col1, col2 = st.columns(2)
+    col1.metric("Subscribers", "12.450", "+150")
+    col2.metric("Watch Time (h)", "1.200", "+5%")
     
-    platform = st.tabs(["YOUTUBE", "TIKTOK", "INSTAGRAM"])
-    
-    with platform[0]: # YouTube
-        col1, col2 = st.columns(2)
-        col1.metric("Subscribers", "12.450", "+150")
-        col2.metric("Watch Time (h)", "1.200", "+5%")
-        
-        # YouTube Content Performance
-        yt_data = pd.DataFrame({
-            "Video": ["AI Tutorial", "Day in Life", "Setup Tour"],
-            "Views": [5400, 3200, 8900],
-            "Retention": ["45%", "38%", "52%"]
-        })
-        st.dataframe(yt_data, width="stretch", hide_index=True)
+    # YouTube Content Performance
+    yt_data = pd.DataFrame({
+        "Video": ["AI Tutorial", "Day in Life", "Setup Tour"],
+        "Views": [5400, 3200, 8900],
+        "Retention": ["45%", "38%", "52%"]
+    })
+    st.dataframe(yt_data, width="stretch", hide_index=True)
+
+def render_tiktok():
+    st.subheader("TikTok Viral Tracker")
+    st.info("Verbindung zu TikTok Business API wird initialisiert...")
+    # Placeholder für TikTok Metriken
+    st.metric("Total Likes", "450.2K", "+12.4K")
 
-    with platform[1]: # TikTok
-        st.subheader("TikTok Viral Tracker")
-        st.info("Verbindung zu TikTok Business API wird initialisiert...")
-        # Placeholder für TikTok Metriken
-        st.metric("Total Likes", "450.2K", "+12.4K")
+def render_instagram():
+    st.write("Daten werden aus dem Dashboard-Snapshot übernommen.")
 
-    with platform[2]: # Instagram
-        st.write("Daten werden aus dem Dashboard-Snapshot übernommen.")
+def render_channels():
+    st.title("CHANNELS")
+    
+    # Nur die ausgewählte Plattform wird gerendert
+    render_sections("channels", {
+        "YOUTUBE": render_youtube,
+        "TIKTOK": render_tiktok,
+        "INSTAGRAM": render_instagram
+    })
@@ -0,0 +1,364 @@
+"""
+CUSTOMER LIFETIME VALUE ENGINE
+BG/NBD (Kauf- & Churn-Prozess) + Gamma-Gamma (Warenkorbwert) in NumPy, gebatcht über alle Creator
+"""
+
+import time
+import pandas as pd
+import numpy as np
+
+KEY_COLUMNS = ["user_id", "platform", "customer"]
+ACTIVITY_COLUMNS = KEY_COLUMNS + ["first_seen", "last_seen", "lifetime_spend", "purchase_count"]
+
+# Zeiteinheit des Modells: Wochen (gut skalierte Parameter)
+TIME_UNIT_DAYS = 7.0
+HORIZON_DAYS = 90
+
+# Unter dieser Fan-Anzahl wird kein eigener Fit gemacht (Default-Parameter)
+MIN_CUSTOMERS = 20
+
+# Fixes Rechenbudget: Nelder-Mead-Iterationen pro Batch
+MAX_ITER = 300
+TOLERANCE = 1e-6
+
+BGNBD_PARAMS = ["r", "alpha", "a", "b"]
+GG_PARAMS = ["p", "q", "gamma"]
+
+# Startwerte/Fallback (Größenordnung aus Fader, Hardie & Lee 2005, Zeiteinheit Wochen)
+DEFAULT_BGNBD = {"r": 0.25, "alpha": 4.0, "a": 0.8, "b": 2.4}
+DEFAULT_GG = {"p": 6.0, "q": 4.0, "gamma": 15.0}
+
+# Suchraum der Optimierung (ohne Grenzen laufen a/b bzw. p/q bei sehr homogenen Fans gegen unendlich)
+PARAM_BOUNDS = {
+    "r": (1e-4, 1e3), "alpha": (1e-4, 1e5), "a": (1e-4, 1e3), "b": (1e-4, 1e3),
+    "p": (1e-4, 1e3), "q": (1e-4, 1e3), "gamma": (1e-4, 1e6)
+}
+
+# Ab diesem a ist die Beta-Verteilung der Dropout-Rate praktisch ein fester Wert p = a/(a+b):
+# Grenzfall statt 2F1-Reihe (deren Terme wachsen etwa wie (a*z)^n/n! und laufen über)
+FIXED_P_MIN_A = 100.0
+
+# Schwelle für die "At-Risk"-Liste
+AT_RISK_CHURN = 0.5
+
+# Lanczos-Approximation (g=7, n=9) für log Gamma
+LANCZOS_G = 7.0
+LANCZOS_COEF = np.array([
+    0.99999999999980993, 676.5203681218851, -1259.1392167224028,
+    771.32342877765313, -176.61502916214059, 12.507343278686905,
+    -0.13857109526572012, 9.9843695780195716e-6, 1.5056327351493116e-7
+])
+HALF_LOG_2PI = 0.5 * np.log(2 * np.pi)
+
+def gammaln(x):
+    """log Gamma(x) für x > 0 (vektorisiert, kleine x per Rekursion)."""
+    x = np.asarray(x, dtype=float)
+    small = x < 0.5
+    z = np.where(small, x + 1.0, x) - 1.0
+
+    series = LANCZOS_COEF[0] + sum(LANCZOS_COEF[i] / (z + i) for i in range(1, len(LANCZOS_COEF)))
+    t = z + LANCZOS_G + 0.5
+    result = HALF_LOG_2PI + (z + 0.5) * np.log(t) - t + np.log(series)
+    # Gamma(x) = Gamma(x + 1) / x
+    return np.where(small, result - np.log(x), result)
+
+def hyp2f1(a, b, c, z, max_terms=300):
+    """Gaußsche hypergeometrische Funktion 2F1 per Reihe (|z| < 1, vektorisiert)."""
+    a, b, c, z = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, c, z)))
+    term = np.ones_like(z)
+    total = np.ones_like(z)
+    for n in range(max_terms):
+        term = term * (a + n) * (b + n) / ((c + n) * (n + 1)) * z
+        total = total + term
+        if np.all(np.abs(term) <= 1e-12 * np.abs(total)):
+            break
+    return total
+
+def prepare_customers(rows, now=None):
+    """
+    Baut die Modell-Eingabe aus customer_activity-Zeilen (Migration 013).
+
+    Returns:
+        DataFrame mit KEY_COLUMNS + x (Wiederholungskäufe), t_x (Zeitpunkt letzter Kauf),
+        T (Alter), purchases, monetary (Ø Warenkorb), lifetime_spend - Zeiten in Wochen
+    """
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    frame = pd.DataFrame(rows or [], columns=ACTIVITY_COLUMNS)
+
+    first = pd.to_datetime(frame["first_seen"], utc=True, errors="coerce")
+    last = pd.to_datetime(frame["last_seen"], utc=True, errors="coerce")
+    purchases = pd.to_numeric(frame["purchase_count"], errors="coerce").fillna(0)
+    spend = pd.to_numeric(frame["lifetime_spend"], errors="coerce").fillna(0.0)
+
+    unit = TIME_UNIT_DAYS * 86400
+    customers = frame[KEY_COLUMNS].copy()
+    customers["x"] = (purchases - 1).clip(lower=0).to_numpy(dtype=float)
+    customers["t_x"] = ((last - first).dt.total_seconds() / unit).clip(lower=0).to_numpy()
+    customers["T"] = ((now - first).dt.total_seconds() / unit).clip(lower=0).to_numpy()
+    customers["purchases"] = purchases.to_numpy(dtype=float)
+    customers["monetary"] = np.where(purchases > 0, spend / purchases.where(purchases > 0, 1), 0.0)
+    customers["lifetime_spend"] = spend.to_numpy(dtype=float)
+
+    valid = first.notna() & last.notna() & (purchases > 0)
+    customers = customers[valid.to_numpy()].reset_index(drop=True)
+    # t_x <= T (Zeitstempel-Rundung)
+    customers["T"] = np.maximum(customers["T"], customers["t_x"])
+    return customers
+
+def _bgnbd_loglik(params, x, t_x, T):
+    """Log-Likelihood pro Fan, params [n, 4] = (r, alpha, a, b)."""
+    r, alpha, a, b = params.T
+    repeat = x > 0
+
+    a1 = gammaln(r + x) - gammaln(r) + r * np.log(alpha)
+    a2 = gammaln(a + b) + gammaln(b + x) - gammaln(b) - gammaln(a + b + x)
+    a3 = -(r + x) * np.log(alpha + T)
+    a4 = np.where(
+        repeat,
+        np.log(a) - np.log(np.maximum(b + x - 1, 1e-12)) - (r + x) * np.log(alpha + t_x),
+        -np.inf
+    )
+    return a1 + a2 + np.logaddexp(a3, a4)
+
+def _gg_loglik(params, x, m):
+    """Gamma-Gamma Log-Likelihood pro Fan, params [n, 3] = (p, q, gamma)."""
+    p, q, gamma = params.T
+    px = p * x
+    return (gammaln(px + q) - gammaln(px) - gammaln(q) + q * np.log(gamma)
+            + (px - 1) * np.log(m) + px * np.log(x) - (px + q) * np.log(gamma + m * x))
+
+def _log_bounds(names):
+    """Untere/obere Grenzen der Parameter im Log-Raum (Reihenfolge wie names)."""
+    bounds = np.log(np.array([PARAM_BOUNDS[name] for name in names], dtype=float))
+    return bounds[:, 0], bounds[:, 1]
+
+def batched_nelder_mead(objective, start, max_iter=MAX_ITER, tol=TOLERANCE, step=0.5, bounds=None):
+    """
+    Nelder-Mead für k unabhängige Probleme gleichzeitig (ein Simplex pro Creator).
+
+    Args:
+        objective: f(theta [k, d]) -> [k] (zu minimieren)
+        start: Startpunkte [k, d]
+        max_iter: Iterationsbudget (fixe Rechenzeit pro Batch)
+        tol: Abbruch, sobald alle Simplizes flach sind
+        bounds: (lower [d], upper [d]) - alle Punkte werden in diese Box geklemmt
+
+    Returns:
+        ndarray: Beste Punkte [k, d]
+    """
+    lower, upper = bounds if bounds is not None else (-np.inf, np.inf)
+
+    def clip(points):
+        return np.clip(points, lower, upper)
+
+    k, d = start.shape
+    start = clip(start)
+    simplex = np.repeat(start[:, None, :], d + 1, axis=1)
+    # Startschritt an der oberen Grenze nach innen, damit der Simplex nicht kollabiert
+    offsets = np.where(start[:, None, :] + step > upper, -step, step) * np.eye(d)[None, :, :]
+    simplex[:, 1:, :] += offsets
+    values = np.stack([objective(simplex[:, i]) for i in range(d + 1)], axis=1)
+
+    for _ in range(max_iter):
+        order = np.argsort(values, axis=1)
+        simplex = np.take_along_axis(simplex, order[:, :, None], axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        if np.all(values[:, -1] - values[:, 0] <= tol * (1 + np.abs(values[:, 0]))):
+            break
+
+        best, second_worst, worst = values[:, 0], values[:, -2], values[:, -1]
+        centroid = simplex[:, :-1].mean(axis=1)
+
+        reflected = clip(2 * centroid - simplex[:, -1])
+        f_reflected = objective(reflected)
+        expanded = clip(3 * centroid - 2 * simplex[:, -1])
+        f_expanded = objective(expanded)
+        outside = f_reflected < worst
+        contracted = clip(np.where(outside[:, None], 1.5 * centroid - 0.5 * simplex[:, -1],
+                                   0.5 * centroid + 0.5 * simplex[:, -1]))
+        f_contracted = objective(contracted)
+
+        expand = (f_reflected < best) & (f_expanded < f_reflected)
+        reflect = ~expand & (f_reflected < second_worst)
+        contract = ~expand & ~reflect & (f_contracted < np.minimum(f_reflected, worst))
+        shrink = ~(expand | reflect | contract)
+
+        candidate = np.where(expand[:, None], expanded, np.where(reflect[:, None], reflected, contracted))
+        f_candidate = np.where(expand, f_expanded, np.where(reflect, f_reflected, f_contracted))
+        simplex[~shrink, -1] = candidate[~shrink]
+        values[~shrink, -1] = f_candidate[~shrink]
+
+        if shrink.any():
+            shrunk = simplex[:, :1] + 0.5 * (simplex - simplex[:, :1])
+            for i in range(1, d + 1):
+                f_shrunk = objective(shrunk[:, i])
+                simplex[shrink, i] = shrunk[shrink, i]
+                values[shrink, i] = f_shrunk[shrink]
+
+    return simplex[np.arange(k), np.argmin(values, axis=1)]
+
+def _negative_loglik(loglik, index, weights, k, columns, bounds):
+    """Baut das Batch-Objective: Summe der negativen Log-Likelihood pro Creator (theta in bounds geklemmt)."""
+    lower, upper = bounds
+
+    def objective(theta):
+        with np.errstate(all="ignore"):
+            ll = loglik(np.exp(np.clip(theta, lower, upper))[index], *columns)
+        total = np.bincount(index, weights=weights * ll, minlength=k)
+        return np.where(np.isfinite(total), -total, np.inf)
+    return objective
+
+def _compress(customers, index, columns):
+    """Fasst identische (Creator, Eingaben) zusammen - Gewicht = Anzahl Fans."""
+    keys = np.column_stack([index] + [np.round(customers[col].to_numpy(dtype=float), 2) for col in columns])
+    unique, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    return unique[:, 0].astype(int), [unique[:, i + 1] for i in range(len(columns))], counts.astype(float)
+
+def fit_params(customers, previous=None, max_iter=MAX_ITER, budget_seconds=None, batch_size=500):
+    """
+    Fittet BG/NBD und Gamma-Gamma für alle Creator in gebatchten Optimierungen.
+
+    Args:
+        customers: Ergebnis von prepare_customers()
+        previous: Bereits gespeicherte Parameter (Warmstart & Fallback bei Budget-Ende)
+        max_iter: Iterationsbudget pro Batch
+        budget_seconds: Gesamtbudget; danach bleiben Creator auf previous/Defaults
+        batch_size: Creator pro Optimierungs-Batch
+
+    Returns:
+        DataFrame: Index user_id, Spalten BGNBD_PARAMS + GG_PARAMS + n_customers
+    """
+    columns = BGNBD_PARAMS + GG_PARAMS
+    counts = customers.groupby("user_id").size()
+    params = pd.DataFrame(
+        {**DEFAULT_BGNBD, **DEFAULT_GG}, index=pd.Index(counts.index, name="user_id"), columns=columns, dtype=float
+    )
+    if previous is not None and not previous.empty:
+        known = params.index.intersection(previous.index)
+        params.loc[known, columns] = previous.loc[known, columns].to_numpy(dtype=float)
+    params["n_customers"] = counts.astype(int)
+
+    creators = counts.index[(counts >= MIN_CUSTOMERS).to_numpy()]
+    started = time.time()
+
+    for start in range(0, len(creators), batch_size):
+        if budget_seconds is not None and time.time() - started > budget_seconds:
+            break
+        batch = creators[start:start + batch_size]
+        subset = customers[customers["user_id"].isin(batch)]
+        index = pd.Categorical(subset["user_id"], categories=batch).codes
+
+        # BG/NBD auf allen Fans
+        idx, (x, t_x, T), weights = _compress(subset, index, ["x", "t_x", "T"])
+        bounds = _log_bounds(BGNBD_PARAMS)
+        objective = _negative_loglik(_bgnbd_loglik, idx, weights, len(batch), (x, t_x, T), bounds)
+        theta = batched_nelder_mead(objective, np.log(params.loc[batch, BGNBD_PARAMS].to_numpy(dtype=float)), max_iter,
+                                    bounds=bounds)
+        params.loc[batch, BGNBD_PARAMS] = np.exp(theta)
+
+        # Gamma-Gamma nur auf Fans mit Umsatz (Anzahl Käufe, Ø Warenkorb)
+        spenders = (subset["monetary"] > 0).to_numpy()
+        if spenders.any():
+            idx, (n, m), weights = _compress(subset[spenders], index[spenders], ["purchases", "monetary"])
+            bounds = _log_bounds(GG_PARAMS)
+            objective = _negative_loglik(_gg_loglik, idx, weights, len(batch), (n, m), bounds)
+            theta = batched_nelder_mead(objective, np.log(params.loc[batch, GG_PARAMS].to_numpy(dtype=float)), max_iter,
+                                        bounds=bounds)
+            fitted = np.exp(theta)
+            # q <= 1 hat keinen endlichen Erwartungswert -> Default behalten
+            ok = fitted[:, 1] > 1
+            params.loc[batch[ok], GG_PARAMS] = fitted[ok]
+
+    return params
+
+def _expected_purchases(r, alpha, a, b, x, t_x, T, t):
+    """
+    BG/NBD: P(alive) und erwartete Käufe in den nächsten t Wochen (vektorisiert).
+
+    Für große a (FIXED_P_MIN_A) wird der Grenzfall mit fester Dropout-Rate p = a/(a+b) benutzt:
+    E = P(alive) / p * (1 - ((alpha+T) / (alpha+T+p*t))^(r+x)). Nicht endliche Werte bleiben
+    erhalten (der Aufrufer fällt dann auf Default-Parameter zurück).
+
+    Returns:
+        tuple: (p_alive, expected) als ndarrays
+    """
+    with np.errstate(all="ignore"):
+        # P(alive) = 1 / (1 + [x>0] * a/(b+x-1) * ((alpha+T)/(alpha+t_x))^(r+x))
+        log_odds = np.log(a) - np.log(np.maximum(b + x - 1, 1e-12)) + (r + x) * (np.log(alpha + T) - np.log(alpha + t_x))
+        p_alive = np.where(x > 0, 1.0 / (1.0 + np.exp(np.clip(log_odds, -700, 700))), 1.0)
+
+        # Erwartete Käufe im Horizont (Euler-Transformation hält die 2F1-Reihe stabil)
+        fixed_p = a >= FIXED_P_MIN_A
+        a_series = np.where(fixed_p, 2.0, np.where(np.abs(a - 1) < 1e-6, 1 + 1e-6, a))
+        z = t / (alpha + T + t)
+        tail = np.exp((a_series - 1) * np.log1p(-z)) * hyp2f1(a_series + b - 1 - r, a_series - 1, a_series + b + x - 1, z)
+        series = (a_series + b + x - 1) / (a_series - 1) * (1 - tail)
+
+        dropout = a / (a + b)
+        limit = -np.expm1((r + x) * (np.log(alpha + T) - np.log(alpha + T + dropout * t))) / dropout
+
+        expected = np.where(fixed_p, limit, series) * p_alive
+    # Rundungsfehler der Reihe können minimal negativ werden
+    return p_alive, np.where(expected < 0, 0.0, expected)
+
+def score_customers(customers, params, horizon_days=HORIZON_DAYS):
+    """
+    Churn-Wahrscheinlichkeit, erwartete Käufe und CLV für alle Fans (ein Durchlauf).
+
+    Returns:
+        DataFrame: KEY_COLUMNS + lifetime_spend, p_alive, churn_prob, expected_purchases,
+                   expected_spend, clv, value_at_risk
+    """
+    columns = KEY_COLUMNS + ["lifetime_spend", "p_alive", "churn_prob", "expected_purchases",
+                             "expected_spend", "clv", "value_at_risk"]
+    customers = customers[customers["user_id"].isin(params.index).to_numpy()]
+    if customers.empty:
+        return pd.DataFrame(columns=columns)
+
+    p = params.reindex(customers["user_id"])
+    r, alpha, a, b = (p[col].to_numpy(dtype=float) for col in BGNBD_PARAMS)
+    shape, q, gamma = (p[col].to_numpy(dtype=float) for col in GG_PARAMS)
+    x, t_x, T = (customers[col].to_numpy(dtype=float) for col in ["x", "t_x", "T"])
+    n, m = customers["purchases"].to_numpy(dtype=float), customers["monetary"].to_numpy(dtype=float)
+    t = horizon_days / TIME_UNIT_DAYS
+
+    p_alive, expected = _expected_purchases(r, alpha, a, b, x, t_x, T, t)
+    invalid = ~(np.isfinite(p_alive) & np.isfinite(expected))
+    if invalid.any():
+        # Nicht auswertbare Parameter nicht als 0 Käufe ausgeben, sondern mit den Defaults rechnen
+        creators = sorted(set(customers["user_id"].to_numpy()[invalid].astype(str)))
+        print(f"CLV: {invalid.sum()} Fans von {len(creators)} Creator(n) mit Default-BG/NBD-Parametern "
+              f"bewertet (nicht endliche Werte): {', '.join(creators[:10])}")
+        defaults = [np.full(invalid.sum(), DEFAULT_BGNBD[col]) for col in BGNBD_PARAMS]
+        p_alive[invalid], expected[invalid] = _expected_purchases(*defaults, x[invalid], t_x[invalid], T[invalid], t)
+
+    with np.errstate(all="ignore"):
+        # Gamma-Gamma: bedingter Erwartungswert des Warenkorbs
+        expected_spend = np.where(n > 0, (gamma + m * n) * shape / (shape * n + q - 1), gamma * shape / (q - 1))
+
+    scored = customers[KEY_COLUMNS + ["lifetime_spend"]].reset_index(drop=True)
+    scored["p_alive"] = p_alive
+    scored["churn_prob"] = 1 - p_alive
+    scored["expected_purchases"] = expected
+    scored["expected_spend"] = expected_spend
+    scored["clv"] = expected * expected_spend
+    scored["value_at_risk"] = scored["churn_prob"] * scored["lifetime_spend"]
+    return scored[columns]
+
+def at_risk_fans(scored, top=20, min_churn=AT_RISK_CHURN):
+    """Ranking der wertvollsten Fans mit hoher Churn-Wahrscheinlichkeit."""
+    risky = scored[scored["churn_prob"] >= min_churn]
+    return risky.sort_values("value_at_risk", ascending=False).head(top)
+
+def params_to_records(params):
+    """Upsert-Payload für clv_params."""
+    records = params.reset_index()
+    records["n_customers"] = records["n_customers"].astype(int)
+    return records.to_dict("records")
+
+def params_from_records(records):
+    """Parameter-Frame aus gespeicherten clv_params-Zeilen."""
+    columns = BGNBD_PARAMS + GG_PARAMS
+    frame = pd.DataFrame(records or [], columns=["user_id"] + columns + ["n_customers"])
+    frame[columns] = frame[columns].astype(float)
+    return frame.set_index("user_id")
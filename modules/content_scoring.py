@@ -0,0 +1,97 @@
+"""
+CONTENT SCORING ENGINE
+Conversion-, Engagement- und Composite-Scores für alle Vault-Assets in einem vektorisierten Durchlauf
+"""
+
+import pandas as pd
+import numpy as np
+
+ASSET_COLUMNS = ["id", "user_id", "asset_name", "media_type", "platform", "total_revenue", "ppv_opens",
+                 "likes", "comments", "is_premium"]
+SCORE_COLUMNS = ["conversion_rate", "conversion_score", "engagement_score", "revenue_percentile",
+                 "composite_score", "rank", "tier"]
+
+# Gewichte des Composite-Scores (Summe = 1)
+SCORE_WEIGHTS = {
+    "conversion_score": 0.6,
+    "engagement_score": 0.25,
+    "revenue_percentile": 0.15
+}
+
+# Conversion Rate x 10 (max 100) - gleiche Skala wie CONTENT_BURNOUT in den Alert-Regeln
+CONVERSION_FACTOR = 10
+
+# Composite-Score -> Empfehlung
+TIER_THRESHOLDS = [("CASH_COW", 80), ("SOLID", 50), ("UNDERPERFORMER", 20)]
+DEFAULT_TIER = "BURNOUT"
+TIERS = [tier for tier, _ in TIER_THRESHOLDS] + [DEFAULT_TIER]
+
+def prepare_assets(rows):
+    """Baut den Asset-Frame mit festen Spalten/Typen aus vault_assets-Zeilen."""
+    assets = pd.DataFrame(rows or [], columns=ASSET_COLUMNS)
+    for col in ["total_revenue", "ppv_opens", "likes", "comments"]:
+        assets[col] = pd.to_numeric(assets[col], errors="coerce").fillna(0.0)
+    return assets
+
+def score_assets(assets):
+    """
+    Scored alle Assets (ein oder viele Creator) und rankt sie pro Creator.
+
+    Nur Assets mit Umsatz oder PPV-Opens werden gerankt (wie top_performing_content).
+
+    Returns:
+        DataFrame: ASSET_COLUMNS + SCORE_COLUMNS, sortiert nach user_id, rank
+    """
+    active = assets[(assets["total_revenue"] > 0) | (assets["ppv_opens"] > 0)].copy()
+    if active.empty:
+        return pd.DataFrame(columns=ASSET_COLUMNS + SCORE_COLUMNS)
+
+    opens = active["ppv_opens"].to_numpy(dtype=float)
+    revenue = active["total_revenue"].to_numpy(dtype=float)
+    interactions = active["likes"].to_numpy(dtype=float) + active["comments"].to_numpy(dtype=float)
+    has_opens = opens > 0
+
+    conversion = np.divide(revenue, opens, out=np.zeros(len(active)), where=has_opens)
+    engagement = np.divide(interactions, opens, out=np.zeros(len(active)), where=has_opens) * 100
+
+    active["conversion_rate"] = conversion
+    active["conversion_score"] = np.minimum(conversion * CONVERSION_FACTOR, 100)
+    active["engagement_score"] = np.minimum(engagement, 100)
+    active["revenue_percentile"] = active.groupby("user_id")["total_revenue"].rank(pct=True).to_numpy() * 100
+    active["composite_score"] = sum(active[col] * weight for col, weight in SCORE_WEIGHTS.items()).round(1)
+
+    active["rank"] = active.groupby("user_id")["composite_score"].rank(method="first", ascending=False).astype(int)
+    score = active["composite_score"].to_numpy()
+    active["tier"] = np.select([score >= limit for _, limit in TIER_THRESHOLDS],
+                               [tier for tier, _ in TIER_THRESHOLDS], default=DEFAULT_TIER)
+
+    return active.sort_values(["user_id", "rank"]).reset_index(drop=True)[ASSET_COLUMNS + SCORE_COLUMNS]
+
+def tier_counts(scored):
+    """Anzahl Assets pro Empfehlungs-Tier."""
+    return scored["tier"].value_counts().reindex(TIERS, fill_value=0)
+
+def with_rank_changes(scored, previous):
+    """
+    Ergänzt die Rang-Veränderung gegenüber einem früheren Snapshot.
+
+    Args:
+        scored: Ergebnis von score_assets()
+        previous: Snapshot-Zeilen mit asset_id, rank
+
+    Returns:
+        DataFrame: scored + previous_rank, rank_change (positiv = aufgestiegen, NaN = neu)
+    """
+    before = pd.DataFrame(previous or [], columns=["asset_id", "rank"])\
+        .rename(columns={"asset_id": "id", "rank": "previous_rank"})
+    merged = scored.merge(before, on="id", how="left")
+    merged["rank_change"] = merged["previous_rank"] - merged["rank"]
+    return merged
+
+def snapshot_records(scored, snapshot_date):
+    """Upsert-Payload für vault_rank_snapshots."""
+    records = scored[["user_id", "id", "rank", "composite_score", "conversion_rate", "engagement_score",
+                      "total_revenue"]].rename(columns={"id": "asset_id"})
+    records = records.round({"conversion_rate": 4, "engagement_score": 2, "total_revenue": 2})
+    records["snapshot_date"] = str(pd.Timestamp(snapshot_date).date())
+    return records.to_dict("records")
@@ -0,0 +1,205 @@
+"""
+REACH / REVENUE CORRELATION ENGINE
+Lagged Cross-Correlation und Rolling-Korrelation zwischen Follower-Wachstum und Umsatz pro Plattform-Paar
+"""
+
+import warnings
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Max. Vorlauf der Reichweite vor dem Umsatz (Tage)
+MAX_LAG_DAYS = 14
+ROLLING_WINDOW_DAYS = 30
+# Mindestanzahl überlappender Tage pro Lag
+MIN_OVERLAP_DAYS = 14
+
+# Aggregat über alle Plattformen
+ALL_PLATFORMS = "all"
+
+PAIR_COLUMNS = ["reach_platform", "revenue_platform", "best_lag", "correlation", "lag0_correlation", "days"]
+
+def daily_follower_deltas(reach):
+    """
+    Tägliche Follower-Veränderung pro Plattform (Summe über alle Handles).
+
+    Pro Handle zählt der letzte Snapshot des Tages; Tage ohne Snapshot
+    werden fortgeschrieben (Delta 0), der Sprung landet auf dem Sync-Tag.
+
+    Args:
+        reach: DataFrame mit created_at (UTC), followers, platform, handle
+
+    Returns:
+        DataFrame: Index Datum, Spalten Plattformen + ALL_PLATFORMS
+    """
+    data = reach.dropna(subset=["created_at", "followers"])
+    if data.empty:
+        return pd.DataFrame()
+
+    data = data.assign(
+        date=data["created_at"].dt.tz_convert(None).dt.normalize(),
+        platform=data["platform"].fillna("unknown"),
+        handle=data["handle"].fillna("")
+    ).sort_values("created_at")
+
+    levels = data.pivot_table(index="date", columns=["platform", "handle"], values="followers", aggfunc="last")
+    levels = levels.asfreq("D").ffill()
+    deltas = levels.diff().iloc[1:].fillna(0.0)
+
+    daily = deltas.T.groupby(level="platform").sum().T
+    daily[ALL_PLATFORMS] = daily.sum(axis=1)
+    return daily
+
+def daily_revenue(revenue):
+    """
+    Täglicher Netto-Umsatz pro Plattform (Tage ohne Umsatz = 0).
+
+    Returns:
+        DataFrame: Index Datum, Spalten Plattformen + ALL_PLATFORMS
+    """
+    data = revenue.dropna(subset=["created_at"])
+    if data.empty:
+        return pd.DataFrame()
+
+    data = data.assign(
+        date=data["created_at"].dt.tz_convert(None).dt.normalize(),
+        platform=data["platform"].fillna("unknown")
+    )
+    daily = data.pivot_table(index="date", columns="platform", values="amount_net", aggfunc="sum").asfreq("D").fillna(0.0)
+    daily[ALL_PLATFORMS] = daily.sum(axis=1)
+    return daily
+
+def align_daily(deltas, revenue):
+    """Beide Frames auf den gemeinsamen Tageszeitraum bringen."""
+    if deltas.empty or revenue.empty:
+        return deltas.iloc[0:0], revenue.iloc[0:0]
+
+    start = max(deltas.index.min(), revenue.index.min())
+    end = min(deltas.index.max(), revenue.index.max())
+    if start > end:
+        return deltas.iloc[0:0], revenue.iloc[0:0]
+
+    index = pd.date_range(start, end, freq="D")
+    return deltas.reindex(index).fillna(0.0), revenue.reindex(index).fillna(0.0)
+
+def _standardize(matrix):
+    """Zeilenweise z-Standardisierung (konstante Zeilen -> NaN)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        std = matrix.std(axis=1, keepdims=True)
+        return (matrix - matrix.mean(axis=1, keepdims=True)) / np.where(std > 0, std, np.nan)
+
+def lagged_correlations(X, Y, max_lag=MAX_LAG_DAYS, min_overlap=MIN_OVERLAP_DAYS):
+    """
+    Pearson-Korrelation aller Paare (X-Zeile, Y-Zeile) für Lags 0..max_lag.
+
+    Lag k bedeutet: X am Tag t gegen Y am Tag t+k (X läuft Y um k Tage voraus).
+
+    Args:
+        X: Matrix [Serien, Tage] (z.B. Follower-Deltas)
+        Y: Matrix [Serien, Tage] (z.B. Umsatz)
+
+    Returns:
+        ndarray: [X-Serien, Y-Serien, Lags] (NaN bei zu kurzer Überlappung)
+    """
+    n_days = X.shape[1]
+    result = np.full((X.shape[0], Y.shape[0], max_lag + 1), np.nan)
+    for lag in range(max_lag + 1):
+        overlap = n_days - lag
+        if overlap < min_overlap:
+            break
+        xs = _standardize(X[:, :overlap])
+        ys = _standardize(Y[:, lag:])
+        result[:, :, lag] = xs @ ys.T / overlap
+    return result
+
+def rolling_correlation(x, y, window=ROLLING_WINDOW_DAYS):
+    """
+    Rolling Pearson-Korrelation zweier gleich langer Serien.
+
+    Returns:
+        ndarray: Länge len(x) - window + 1 (NaN bei konstantem Fenster)
+    """
+    if len(x) < window:
+        return np.empty(0)
+
+    xw = sliding_window_view(np.asarray(x, dtype=float), window)
+    yw = sliding_window_view(np.asarray(y, dtype=float), window)
+    xc = xw - xw.mean(axis=1, keepdims=True)
+    yc = yw - yw.mean(axis=1, keepdims=True)
+    denom = np.sqrt((xc ** 2).sum(axis=1) * (yc ** 2).sum(axis=1))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.where(denom > 0, (xc * yc).sum(axis=1) / denom, np.nan)
+
+def reach_revenue_correlation(reach, revenue, max_lag=MAX_LAG_DAYS, window=ROLLING_WINDOW_DAYS):
+    """
+    Führt Follower-Wachstum und Umsatz zusammen und misst, ob Reichweite den Umsatz anführt.
+
+    Args:
+        reach: stats_history-Frame (created_at, followers, platform, handle)
+        revenue: revenue_history-Frame (created_at, amount_net, platform)
+        max_lag: Max. Vorlauf in Tagen
+        window: Fenster der Rolling-Korrelation in Tagen
+
+    Returns:
+        dict:
+            pairs: DataFrame PAIR_COLUMNS, sortiert nach |correlation|
+            lags: DataFrame reach_platform, revenue_platform, lag, correlation
+            rolling: DataFrame date, reach_platform, revenue_platform, correlation (je Paar beim besten Lag)
+    """
+    deltas, sales = align_daily(daily_follower_deltas(reach), daily_revenue(revenue))
+    empty = {
+        "pairs": pd.DataFrame(columns=PAIR_COLUMNS),
+        "lags": pd.DataFrame(columns=["reach_platform", "revenue_platform", "lag", "correlation"]),
+        "rolling": pd.DataFrame(columns=["date", "reach_platform", "revenue_platform", "correlation"])
+    }
+    if len(deltas) < MIN_OVERLAP_DAYS:
+        return empty
+
+    X = deltas.to_numpy(dtype=float).T
+    Y = sales.to_numpy(dtype=float).T
+    corr = lagged_correlations(X, Y, max_lag=max_lag)
+
+    reach_names = np.asarray(deltas.columns)
+    revenue_names = np.asarray(sales.columns)
+    i, j, k = np.indices(corr.shape)
+    lags = pd.DataFrame({
+        "reach_platform": reach_names[i.ravel()],
+        "revenue_platform": revenue_names[j.ravel()],
+        "lag": k.ravel(),
+        "correlation": corr.ravel()
+    }).dropna(subset=["correlation"])
+    if lags.empty:
+        return empty
+
+    # Bester Lag = stärkste (absolute) Korrelation pro Paar
+    best = lags.loc[lags["correlation"].abs().groupby([lags["reach_platform"], lags["revenue_platform"]]).idxmax()]
+    lag0 = lags[lags["lag"] == 0].set_index(["reach_platform", "revenue_platform"])["correlation"]
+    pairs = best.rename(columns={"lag": "best_lag"}).reset_index(drop=True)
+    pairs["lag0_correlation"] = lag0.reindex(pd.MultiIndex.from_frame(pairs[["reach_platform", "revenue_platform"]])).to_numpy()
+    pairs["days"] = len(deltas) - pairs["best_lag"]
+    pairs = pairs.reindex(pairs["correlation"].abs().sort_values(ascending=False).index)[PAIR_COLUMNS]
+
+    rolling = []
+    reach_pos = {name: n for n, name in enumerate(reach_names)}
+    revenue_pos = {name: n for n, name in enumerate(revenue_names)}
+    for row in pairs.itertuples():
+        lag = int(row.best_lag)
+        x = X[reach_pos[row.reach_platform], :X.shape[1] - lag]
+        y = Y[revenue_pos[row.revenue_platform], lag:]
+        values = rolling_correlation(x, y, window)
+        if values.size:
+            rolling.append(pd.DataFrame({
+                "date": sales.index[lag + window - 1:],
+                "reach_platform": row.reach_platform,
+                "revenue_platform": row.revenue_platform,
+                "correlation": values
+            }))
+
+    return {
+        "pairs": pairs.reset_index(drop=True),
+        "lags": lags.reset_index(drop=True),
+        "rolling": pd.concat(rolling, ignore_index=True) if rolling else empty["rolling"]
+    }
@@ -2,6 +2,91 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client
 
+# Pipeline-Grid Konfiguration
+PIPELINE_COLUMNS = ["brand", "status", "amount", "currency", "deadline"]
+PIPELINE_CURRENCIES = ["USD", "EUR", "GBP"]
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£"}
+PIPELINE_STATUSES = ["Negotiating", "Active", "Closed"]
+PIPELINE_PAGE_SIZES = [25, 50, 100, 250]
+PIPELINE_SORT_COLUMNS = {
+    "Erstellt": "created_at",
+    "Value": "amount",
+    "Brand": "brand",
+    "Status": "status",
+    "Deadline": "deadline"
+}
+
+def format_deal_value(amount, currency="USD"):
+    """Formatiert einen numerischen Deal-Wert für die Anzeige (z.B. "$123.45")."""
+    if amount is None or pd.isna(amount):
+        return ""
+    symbol = CURRENCY_SYMBOLS.get(currency, f"{currency} ")
+    return f"{symbol}{float(amount):.2f}"
+
+def _deal_changed(original, deal_data):
+    """Vergleicht einen geladenen Deal mit den Editor-Werten."""
+    for col in PIPELINE_COLUMNS:
+        old, new = original.get(col), deal_data.get(col)
+        if col == "amount":
+            old = None if old is None else round(float(old), 2)
+            if old != new:
+                return True
+        elif str(old or "") != str(new or ""):
+            return True
+    return False
+
+def _row_key(deal_id):
+    """Normalisiert Deal-IDs aus dem Editor (int/float/str) für Lookups."""
+    if deal_id is None or (isinstance(deal_id, float) and pd.isna(deal_id)):
+        return None
+    if isinstance(deal_id, float) and deal_id.is_integer():
+        deal_id = int(deal_id)
+    return str(deal_id)
+
+def fetch_deals_page(supabase, user_email, statuses=None, min_value=None, max_value=None,
+                     sort_by="created_at", descending=True, page=1, page_size=50):
+    """
+    Lädt genau eine Seite der Deal-Pipeline.
+    
+    Filter, Sortierung und Pagination laufen in der Datenbank, damit auch
+    bei 10k+ Deals nur eine Seite übertragen und serialisiert wird.
+    
+    Erwartet das aktuelle Schema (status, deadline): das frühere Mapping der
+    Alt-Spalten stage/date im Client entfällt, weil serverseitig nach den
+    Spaltennamen gefiltert wird. Alte Tabellen benennt Migration 009 um.
+    
+    Args:
+        supabase: Supabase Client
+        user_email: User Email
+        statuses: Liste erlaubter Stati (None = alle)
+        min_value: Untergrenze für amount (None = keine)
+        max_value: Obergrenze für amount (None = keine)
+        sort_by: Spalte für die Sortierung
+        descending: Absteigend sortieren
+        page: Seitennummer (1-basiert)
+        page_size: Deals pro Seite
+    
+    Returns:
+        tuple: (rows, total_count)
+    """
+    query = supabase.table("deals")\
+        .select("id, brand, status, amount, currency, deadline, created_at", count="exact")\
+        .eq("user_id", user_email)
+    
+    if statuses:
+        query = query.in_("status", statuses)
+    if min_value is not None:
+        query = query.gte("amount", min_value)
+    if max_value is not None:
+        query = query.lte("amount", max_value)
+    
+    start = (page - 1) * page_size
+    res = query.order(sort_by, desc=descending)\
+        .range(start, start + page_size - 1)\
+        .execute()
+    
+    return (res.data or [], res.count or 0)
+
 def sync_customers_to_crm(supabase, user_email):
     """
     Synchronisiert Kunden aus OnlyFans/Fansly in CRM.
@@ -46,6 +131,8 @@ def sync_customers_to_crm(supabase, user_email):
                             "brand": f"{customer_name} ({platform})",
                             "status": "Active" if total_value >= 100 else "Negotiating",
                             "value": f"${total_value:.2f}",
+                            "amount": round(float(total_value), 2),
+                            "currency": "USD",
                             "deadline": "",
                             "user_id": user_email
                         }
@@ -78,6 +165,8 @@ def sync_customers_to_crm(supabase, user_email):
                                 "brand": f"{customer_name} (OnlyFans)",
                                 "status": "Active" if total_spent >= 100 else "Negotiating",
                                 "value": f"${total_spent:.2f}",
+                                "amount": round(total_spent, 2),
+                                "currency": "USD",
                                 "deadline": "",
                                 "user_id": user_email
                             }
@@ -115,60 +204,129 @@ def render_crm(supabase):
     
     st.markdown("---")
     
-    # Deals aus DB laden
+    # Pipeline-Filter (werden serverseitig angewendet)
+    st.subheader("Active Pipeline")
+    
+    col_status, col_min, col_max = st.columns([2, 1, 1])
+    with col_status:
+        statuses = st.multiselect("Status", PIPELINE_STATUSES, default=[], key="crm_filter_status",
+                                  help="Leer = alle Stati")
+    with col_min:
+        min_value = st.number_input("Min. Value ($)", min_value=0.0, value=0.0, step=50.0, key="crm_filter_min")
+    with col_max:
+        max_value = st.number_input("Max. Value ($)", min_value=0.0, value=0.0, step=50.0, key="crm_filter_max",
+                                    help="0 = kein Limit")
+    
+    col_sort, col_dir, col_size = st.columns([2, 1, 1])
+    with col_sort:
+        sort_label = st.selectbox("Sortierung", list(PIPELINE_SORT_COLUMNS.keys()), key="crm_sort")
+    with col_dir:
+        descending = st.toggle("Absteigend", value=True, key="crm_sort_desc")
+    with col_size:
+        page_size = st.selectbox("Deals pro Seite", PIPELINE_PAGE_SIZES, index=1, key="crm_page_size")
+    
+    filters = {
+        "statuses": statuses or None,
+        "min_value": min_value if min_value > 0 else None,
+        "max_value": max_value if max_value > 0 else None,
+        "sort_by": PIPELINE_SORT_COLUMNS[sort_label],
+        "descending": descending
+    }
+    
+    # Filter-Änderung -> zurück auf Seite 1
+    filter_signature = (tuple(statuses), min_value, max_value, sort_label, descending, page_size)
+    if st.session_state.get("crm_filter_signature") != filter_signature:
+        st.session_state.crm_filter_signature = filter_signature
+        st.session_state.crm_page = 1
+        # Neuer Editor-Key: Edits der alten Ergebnisliste nicht auf die neuen Zeilen anwenden
+        st.session_state.crm_editor_version = st.session_state.get("crm_editor_version", 0) + 1
+    page = st.session_state.get("crm_page", 1)
+    
+    # Deals aus DB laden (nur die aktuelle Seite)
     try:
-        res = supabase.table("deals").select("*").eq("user_id", user_email).execute()
+        rows, total_count = fetch_deals_page(supabase, user_email, page=page, page_size=page_size, **filters)
+        
+        total_pages = max(1, -(-total_count // page_size))
+        if page > total_pages:
+            # Seite existiert nach Löschungen/Filter nicht mehr
+            page = total_pages
+            st.session_state.crm_page = page
+            rows, total_count = fetch_deals_page(supabase, user_email, page=page, page_size=page_size, **filters)
         
-        if not res.data:
-            st.info("No deals found. Click 'AUTO-SYNC CUSTOMERS' to import from your revenue data!")
-            # Create an empty DataFrame with flexible columns
-            df_deals = pd.DataFrame(columns=["brand", "status", "value", "deadline"])
+        if not rows:
+            if total_count == 0 and not any(filters[k] for k in ("statuses", "min_value", "max_value")):
+                st.info("No deals found. Click 'AUTO-SYNC CUSTOMERS' to import from your revenue data!")
+            else:
+                st.info("Keine Deals für diese Filter.")
+            df_deals = pd.DataFrame(columns=["id"] + PIPELINE_COLUMNS)
+            df_deals["amount"] = df_deals["amount"].astype(float)
         else:
-            df_deals = pd.DataFrame(res.data)
-            
-            # Spalten-Mapping: Unterstütze beide Schemas
-            if 'stage' in df_deals.columns and 'status' not in df_deals.columns:
-                df_deals.rename(columns={'stage': 'status'}, inplace=True)
-            if 'date' in df_deals.columns and 'deadline' not in df_deals.columns:
-                df_deals.rename(columns={'date': 'deadline'}, inplace=True)
-            
-            # Stelle sicher dass alle erforderlichen Spalten existieren
-            required_cols = ["brand", "status", "value", "deadline"]
-            for col in required_cols:
-                if col not in df_deals.columns:
-                    df_deals[col] = ""
+            df_deals = pd.DataFrame(rows)
+            df_deals["amount"] = pd.to_numeric(df_deals["amount"], errors="coerce")
+            df_deals["currency"] = df_deals["currency"].fillna("USD")
         
-        # UI
-        st.subheader("Active Pipeline")
-        st.caption(f"📊 {len(df_deals)} deals in pipeline")
+        st.caption(f"📊 {total_count:,} deals in pipeline · Seite {page}/{total_pages}")
         
         edited_df = st.data_editor(
-            df_deals[["brand", "status", "value", "deadline"]], 
+            df_deals[["id"] + PIPELINE_COLUMNS],
             use_container_width=True,
-            hide_index=True, 
-            num_rows="dynamic"
+            hide_index=True,
+            num_rows="dynamic",
+            column_config={
+                "id": None,
+                "status": st.column_config.SelectboxColumn("status", options=PIPELINE_STATUSES),
+                "amount": st.column_config.NumberColumn("amount", min_value=0.0, format="%.2f"),
+                "currency": st.column_config.SelectboxColumn("currency", options=PIPELINE_CURRENCIES, default="USD")
+            },
+            key=f"crm_editor_{st.session_state.crm_editor_version}_{page}"
         )
         
+        # Pagination
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ ZURÜCK", disabled=page <= 1, use_container_width=True, key="crm_prev"):
+                st.session_state.crm_page = page - 1
+                st.rerun()
+        with col_info:
+            first = (page - 1) * page_size + 1 if total_count else 0
+            last = min(page * page_size, total_count)
+            st.markdown(f"<p style='text-align: center;'>{first:,}–{last:,} von {total_count:,}</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("WEITER ▶", disabled=page >= total_pages, use_container_width=True, key="crm_next"):
+                st.session_state.crm_page = page + 1
+                st.rerun()
+        
         if st.button("SAVE CHANGES"):
-            # Logik zum Updaten/Einfügen in Supabase
-            for index, row in edited_df.iterrows():
+            # Nur geänderte Zeilen der aktuellen Seite schreiben
+            originals = {_row_key(r.get("id")): r for r in rows}
+            
+            for _, row in edited_df.iterrows():
                 # Skip leere Zeilen
                 if not row.get("brand"):
                     continue
                     
+                amount = row.get("amount")
+                amount = None if amount is None or pd.isna(amount) else round(float(amount), 2)
+                currency = row.get("currency") or "USD"
+                
                 deal_data = {
                     "user_id": user_email,
                     "brand": str(row.get("brand", "")),
-                    "status": str(row.get("status", "Negotiating")),
-                    "value": str(row.get("value", "")),
-                    "deadline": str(row.get("deadline", ""))
+                    "status": str(row.get("status") or "Negotiating"),
+                    "amount": amount,
+                    "currency": currency,
+                    "value": format_deal_value(amount, currency),
+                    "deadline": str(row.get("deadline") or "")
                 }
                 
-                # Prüfe ob Deal bereits existiert (hat ID)
-                if index < len(res.data) and "id" in res.data[index]:
-                    # Update existierender Deal
-                    deal_id = res.data[index]["id"]
-                    supabase.table("deals").update(deal_data).eq("id", deal_id).execute()
+                deal_key = _row_key(row.get("id"))
+                original = originals.get(deal_key)
+                
+                if original is not None:
+                    # Unveränderte Deals überspringen
+                    if not _deal_changed(original, deal_data):
+                        continue
+                    supabase.table("deals").update(deal_data).eq("id", original["id"]).execute()
                 else:
                     # Neuer Deal
                     supabase.table("deals").insert(deal_data).execute()
@@ -176,18 +334,18 @@ def render_crm(supabase):
                 # Automatischer Finance-Sync für geschlossene Deals
                 if row.get("status") == "Closed":
                     # Prüfen, ob bereits eine Transaktion für diesen Deal existiert
-                    check = supabase.table("transactions").select("id").eq("description", f"Deal: {row['brand']}").execute()
+                    check = supabase.table("transactions")\
+                        .select("id")\
+                        .eq("user_id", user_email)\
+                        .eq("description", f"Deal: {row['brand']}")\
+                        .execute()
                     
                     if not check.data:
-                        # Wert als Float konvertieren (entfernt $ und Kommas)
-                        try:
-                            value_str = str(row.get("value", "0"))
-                            amount = float(value_str.replace("$", "").replace("€", "").replace(".", "").replace(",", ".").strip())
-                        except:
-                            amount = 0
+                        amount = deal_data["amount"] or 0
                         
                         if amount > 0:
                             supabase.table("transactions").insert({
+                                "user_id": user_email,
                                 "type": "Income",
                                 "amount": amount,
                                 "category": "Brand Deal",
@@ -211,10 +369,14 @@ def render_crm(supabase):
             brand TEXT,
             status TEXT DEFAULT 'Negotiating',
             value TEXT,
+            amount NUMERIC(12,2),
+            currency TEXT DEFAULT 'USD',
             deadline TEXT,
             created_at TIMESTAMP DEFAULT NOW()
         );
         
         ALTER TABLE deals DISABLE ROW LEVEL SECURITY;
         ```
+        
+        Bestehende Tabellen: `migrations/009_crm_pipeline_grid.sql` und `migrations/010_deal_amounts.sql` ausführen.
         """)
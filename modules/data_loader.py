@@ -0,0 +1,100 @@
+"""
+DATA LOADER
+Gemeinsame Lade- und Cache-Helfer für Supabase-Tabellen
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# PostgREST liefert standardmäßig max. 1000 Zeilen pro Request
+DEFAULT_PAGE_SIZE = 1000
+
+# Max. parallele Requests pro Seitenaufbau (Supabase-Calls sind I/O-bound)
+MAX_PARALLEL_QUERIES = 6
+
+def table_version(supabase, table, user_id, order_col="id"):
+    """
+    Liefert einen günstigen Versions-Schlüssel für die Daten eines Users.
+    
+    Kombiniert Zeilenanzahl und neuesten Wert von order_col. Ändert sich bei
+    jedem Insert/Delete und eignet sich damit als Cache-Key für st.cache_data.
+    
+    Args:
+        supabase: Supabase Client
+        table: Tabellenname
+        user_id: User Email
+        order_col: Monoton steigende Spalte (id, created_at, updated_at)
+    
+    Returns:
+        str: z.B. "1532:98812"
+    """
+    res = supabase.table(table)\
+        .select(order_col, count="exact")\
+        .eq("user_id", user_id)\
+        .order(order_col, desc=True)\
+        .limit(1)\
+        .execute()
+    
+    latest = res.data[0].get(order_col) if res.data else None
+    return f"{res.count or 0}:{latest}"
+
+def fetch_all_rows(supabase, table, columns, user_id, filters=None, order_col="id", page_size=DEFAULT_PAGE_SIZE,
+                   since=None, since_col="created_at"):
+    """
+    Lädt alle Zeilen eines Users seitenweise (umgeht das 1000-Zeilen-Limit).
+    
+    Args:
+        supabase: Supabase Client
+        table: Tabellenname
+        columns: Select-Projektion, z.B. "created_at, amount_net"
+        user_id: User Email, Liste von Emails (Shard) oder None (alle User)
+        filters: Optionale Gleichheits-Filter {spalte: wert}
+        order_col: Eindeutige Sortierung für die Pagination (auch "a,b,c")
+        page_size: Zeilen pro Request
+        since: Optional nur Zeilen mit since_col >= since (ISO-String)
+        since_col: Zeitspalte für since
+    
+    Returns:
+        list: Alle Zeilen als dicts
+    """
+    rows = []
+    start = 0
+    
+    while True:
+        query = supabase.table(table).select(columns)
+        if isinstance(user_id, (list, tuple)):
+            query = query.in_("user_id", list(user_id))
+        elif user_id is not None:
+            query = query.eq("user_id", user_id)
+        if since is not None:
+            query = query.gte(since_col, since)
+        for col, value in (filters or {}).items():
+            query = query.eq(col, value)
+        
+        res = query.order(order_col).range(start, start + page_size - 1).execute()
+        batch = res.data or []
+        rows.extend(batch)
+        
+        if len(batch) < page_size:
+            return rows
+        start += page_size
+
+def fetch_concurrently(tasks, max_workers=MAX_PARALLEL_QUERIES):
+    """
+    Führt unabhängige Lade-Funktionen parallel aus.
+    
+    Die Ladezeit ist damit durch die langsamste Einzel-Query begrenzt statt
+    durch die Summe aller Queries. Die Tasks dürfen keine st.*-Aufrufe enthalten.
+    
+    Args:
+        tasks: {name: Funktion ohne Argumente}
+        max_workers: Max. parallele Threads
+    
+    Returns:
+        dict: {name: Ergebnis}; der erste Fehler wird erneut geworfen
+    """
+    if not tasks:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        futures = {name: pool.submit(task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
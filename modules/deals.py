@@ -1,23 +1,66 @@
 import streamlit as st
 import pandas as pd
+from modules.crm import CURRENCY_SYMBOLS
 
-def render_deals():
+def fetch_pipeline_stats(supabase, user_email):
+    """
+    Holt alle Deal-KPIs in einer Abfrage über die RPC deal_pipeline_stats.
+    
+    Returns:
+        dict mit deal_count, closed_this_month, status_counts und currency_stats
+        (pipeline_value, closed_value, avg_deal_size pro Währung)
+    """
+    res = supabase.rpc('deal_pipeline_stats', {'p_user_id': user_email}).execute()
+    
+    if res.data and len(res.data) > 0:
+        return res.data[0]
+    return {
+        "deal_count": 0,
+        "closed_this_month": 0,
+        "status_counts": {},
+        "currency_stats": {}
+    }
+
+def format_currency_totals(currency_stats, field):
+    """Beträge pro Währung nebeneinander (z.B. "$1,200.00 · €300.00"), größter zuerst."""
+    totals = sorted(((float(values.get(field) or 0), currency) for currency, values in currency_stats.items()),
+                    reverse=True)
+    if not totals:
+        return "$0.00"
+    return " · ".join(f"{CURRENCY_SYMBOLS.get(currency, f'{currency} ')}{amount:,.2f}" for amount, currency in totals)
+
+def render_deals(supabase):
     st.title("DEALS")
     
+    user_email = st.session_state.get('user_email', 'unknown')
+    
+    try:
+        stats = fetch_pipeline_stats(supabase, user_email)
+    except Exception as e:
+        st.error(f"Deals Error: {e}")
+        st.info("💡 Stelle sicher, dass Migration 010 ausgeführt wurde: `migrations/010_deal_amounts.sql`")
+        return
+    
+    currency_stats = stats.get('currency_stats') or {}
+    
     col1, col2, col3 = st.columns(3)
-    col1.metric("Pipeline Value", "24.500 €")
-    col2.metric("Signed This Month", "3")
-    col3.metric("Avg. Deal Size", "4.100 €")
+    col1.metric("Pipeline Value", format_currency_totals(currency_stats, "pipeline_value"))
+    col2.metric("Signed This Month", f"{int(stats.get('closed_this_month') or 0)}")
+    col3.metric("Avg. Deal Size", format_currency_totals(currency_stats, "avg_deal_size"))
 
-    st.subheader("Active Negotiations")
-    # Status-basiertes Board
-    deals = pd.DataFrame([
-        {"Brand": "Samsung", "Stage": "Drafting", "Value": "8.000 €", "Date": "2026-02-15"},
-        {"Brand": "Lululemon", "Stage": "Sent", "Value": "3.500 €", "Date": "2026-01-20"},
-        {"Brand": "Tesla", "Stage": "Negotiating", "Value": "12.000 €", "Date": "2026-03-01"}
-    ])
-    
-    st.data_editor(deals, width="stretch", num_rows="dynamic")
+    st.subheader("Pipeline by Status")
+    status_counts = stats.get('status_counts') or {}
+    
+    if status_counts:
+        df_status = pd.DataFrame(
+            sorted(status_counts.items(), key=lambda item: item[1], reverse=True),
+            columns=["Status", "Deals"]
+        )
+        st.dataframe(df_status, width="stretch", hide_index=True)
+        st.caption(f"📊 {int(stats.get('deal_count') or 0):,} deals · "
+                   f"{format_currency_totals(currency_stats, 'closed_value')} closed")
+    else:
+        st.info("Noch keine Deals. Lege Deals im CRM an oder nutze den Auto-Sync.")
     
     if st.button("CREATE NEW DEAL"):
         st.toast("Deal Template created.")
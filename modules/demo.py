@@ -2,33 +2,58 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from modules.synthetic import SCALES, generate_creator, scale_plan
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_demo_creator(scale, seed):
+    """Ein synthetischer Creator in der Größe der gewählten Skalierung (gecacht pro Seed)."""
+    _, rows = scale_plan(scale)
+    end = pd.Timestamp.now(tz="UTC").normalize()
+    return generate_creator(np.random.default_rng(seed), "demo@example.com", rows, end - pd.Timedelta(days=365), end)
 
 def render_demo():
     st.title("DEMO")
     st.info("Hier können neue Features getestet werden, ohne die Live-Daten zu beeinflussen.")
-    
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.subheader("UI Components")
-        st.slider("Metric Simulation", 0, 100, 50)
+        scale = st.select_slider("Datensatz-Skalierung", options=list(SCALES), value="10k")
+        seed = st.number_input("Seed", min_value=0, value=42, step=1)
         st.multiselect("Feature Test", ["AI Logic", "Direct API", "Custom CSS"], ["AI Logic"])
         st.button("Trigger Test Notification")
 
+    data = load_demo_creator(scale, int(seed))
+    stats = data["stats_history"]
+    revenue = data["revenue_history"]
+
     with col2:
-        st.subheader("Live Chart Simulation")
-        chart_data = pd.DataFrame(
-            np.random.randn(20, 3),
-            columns=['Followers', 'Reach', 'Engagement']
-        )
-        st.line_chart(chart_data)
+        st.subheader("Synthetische Follower-Kurven")
+        fig = px.line(stats, x="created_at", y="followers", color="platform")
+        fig.update_layout(template="plotly_dark", height=300, margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.divider()
+    st.subheader("Fan-Spending (Heavy Tail)")
+    spend = revenue.groupby("source")["amount_net"].sum().sort_values(ascending=False)
+    top_share = spend.head(max(1, len(spend) // 10)).sum() / spend.sum() if spend.sum() else 0
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Fans", f"{len(spend):,}")
+    c2.metric("Umsatz", f"${spend.sum():,.2f}")
+    c3.metric("Top-10% Anteil", f"{top_share:.0%}")
+    st.bar_chart(spend.head(50).reset_index(drop=True))
 
     st.divider()
     st.subheader("API JSON Preview")
+    creators, rows = scale_plan(scale)
     demo_json = {
-        "status": "connected",
-        "api_endpoint": "https://api.creator.tech/v1/test",
+        "status": "synthetic",
+        "scale": scale,
+        "creators": creators,
+        "rows_per_creator": rows,
         "mock_data": True,
-        "latency": "45ms"
+        "generator": "scripts/generate_synthetic_data.py"
     }
     st.json(demo_json)
@@ -0,0 +1,160 @@
+"""
+CHART DOWNSAMPLING
+LTTB für Linien und Zeit-Buckets für Balken, damit Chart-Payloads unabhängig von der Historie begrenzt bleiben
+"""
+
+import pandas as pd
+import numpy as np
+
+# Chart-Breite in Pixeln und Punkte pro Pixel (mehr ist im Browser nicht sichtbar)
+CHART_WIDTH_PX = 1200
+POINTS_PER_PX = 1
+MIN_POINTS_PER_SERIES = 50
+
+# Max. Balken pro Serie im sichtbaren Zeitraum
+MAX_BARS = 120
+
+# Auflösungen der Vor-Aggregate (fein -> grob) mit ungefährer Bucket-Länge
+RESOLUTIONS = {
+    "h": pd.Timedelta(hours=1),
+    "D": pd.Timedelta(days=1),
+    "W": pd.Timedelta(days=7),
+    "MS": pd.Timedelta(days=30)
+}
+
+# Sichtbarer Zeitraum -> Tage (None = gesamte Historie)
+VISIBLE_RANGES = {
+    "30D": 30,
+    "90D": 90,
+    "1Y": 365,
+    "ALL": None
+}
+
+def point_budget(n_series, width_px=CHART_WIDTH_PX):
+    """Max. Punkte pro Linie, damit alle Serien zusammen die Pixelbreite nicht überschreiten."""
+    total = int(width_px * POINTS_PER_PX)
+    return max(MIN_POINTS_PER_SERIES, total // max(1, n_series))
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: wählt die Punkte, die die Kurvenform am besten erhalten.
+
+    Args:
+        x: Sortierte x-Werte (numerisch)
+        y: y-Werte
+        threshold: Anzahl Zielpunkte
+
+    Returns:
+        ndarray: Indizes der ausgewählten Punkte (inkl. erstem und letztem)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket-Grenzen für die inneren Punkte (erster/letzter bleiben fix)
+    edges = np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    # Mittelwerte je Bucket über kumulierte Summen (für das "nächste" Bucket-Dreieck)
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    count = next_end - next_start
+    avg_x = (cx[next_end] - cx[next_start]) / count
+    avg_y = (cy[next_end] - cy[next_start]) / count
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def downsample_lines(frame, time_col, value_col, by=None, width_px=CHART_WIDTH_PX):
+    """
+    LTTB pro Serie; das Punkte-Budget wird auf alle Serien verteilt.
+
+    Args:
+        frame: Langformat-DataFrame
+        time_col: Zeitspalte (datetime)
+        value_col: Messwert
+        by: Spalten, die eine Serie identifizieren (None = eine Serie)
+        width_px: Chart-Breite in Pixeln
+
+    Returns:
+        DataFrame: Teilmenge von frame, sortiert nach by + time_col
+    """
+    keys = list(by or [])
+    data = frame.dropna(subset=[time_col, value_col]).sort_values(keys + [time_col], kind="mergesort")
+    if data.empty:
+        return data
+
+    groups = data.groupby(keys, sort=False).indices if keys else {None: np.arange(len(data))}
+    threshold = point_budget(len(groups), width_px)
+
+    x = pd.to_datetime(data[time_col], utc=True).dt.tz_localize(None).to_numpy().astype("int64").astype(float)
+    y = pd.to_numeric(data[value_col], errors="coerce").to_numpy(dtype=float)
+    keep = [positions[lttb(x[positions], y[positions], threshold)] for positions in groups.values()]
+    return data.iloc[np.concatenate(keep)]
+
+def choose_resolution(start, end, max_buckets=MAX_BARS):
+    """Feinste Auflösung, bei der der Zeitraum in max_buckets Buckets passt."""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for freq, length in RESOLUTIONS.items():
+        if span / length <= max_buckets:
+            return freq
+    return list(RESOLUTIONS)[-1]
+
+def bucket_aggregate(frame, time_col, value_col, freq, by=None, agg="sum"):
+    """
+    Aggregiert Einzelwerte in Zeit-Buckets.
+
+    Returns:
+        DataFrame: by + time_col (Bucket-Start) + value_col
+    """
+    keys = list(by or [])
+    if frame.empty:
+        return pd.DataFrame(columns=keys + [time_col, value_col])
+
+    grouped = frame.groupby(keys + [pd.Grouper(key=time_col, freq=freq)])[value_col].agg(agg)
+    return grouped.reset_index()
+
+def build_pyramid(frame, time_col, value_col, by=None, agg="sum"):
+    """
+    Vor-Aggregate in allen RESOLUTIONS (einmal pro Daten-Version berechnen und cachen).
+
+    Returns:
+        dict: {freq: DataFrame aus bucket_aggregate()}
+    """
+    return {freq: bucket_aggregate(frame, time_col, value_col, freq, by=by, agg=agg) for freq in RESOLUTIONS}
+
+def visible_window(frame, time_col, days, now=None):
+    """Zeilen im sichtbaren Zeitraum (days=None -> alles) plus (start, end)."""
+    if frame.empty:
+        return frame, None, None
+
+    times = frame[time_col]
+    end = times.max() if now is None else pd.Timestamp(now)
+    start = times.min() if days is None else end - pd.Timedelta(days=days)
+    return frame[times >= start], start, end
+
+def select_bars(pyramid, time_col, start, end, max_buckets=MAX_BARS):
+    """
+    Passendes Vor-Aggregat für den sichtbaren Zeitraum.
+
+    Returns:
+        tuple: (DataFrame im Zeitraum, freq)
+    """
+    freq = choose_resolution(start, end, max_buckets)
+    level = pyramid[freq]
+    if level.empty:
+        return level, freq
+    # Buckets, die in den Zeitraum hineinragen
+    return level[level[time_col] >= pd.Timestamp(start) - RESOLUTIONS[freq]], freq
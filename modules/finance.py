@@ -1,7 +1,97 @@
+import threading
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from collections import OrderedDict
 from datetime import datetime
+from modules.data_loader import table_version, fetch_all_rows
+from modules.finance_engine import build_ledger, compute_rollups, summarize, daily_revenue_by_platform
+from modules.forecasting import fit_forecasts, update_forecasts, project, HORIZONS
+
+# Transaction Log zeigt nur die neuesten Buchungen (Rest via Export/Rollups)
+TRANSACTION_LOG_LIMIT = 500
+
+# Max. gespeicherte Forecast-Modelle (LRU, wie max_entries von load_finance_data)
+FORECAST_STORE_MAX_ENTRIES = 64
+_forecast_lock = threading.Lock()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_finance_data(_supabase, user_email, data_version):
+    """
+    Lädt Ledger und Rollups eines Users (gecacht pro Daten-Version).
+    
+    data_version ändert sich bei jedem Insert/Update/Delete in revenue_history oder
+    transactions - solange sie gleich bleibt, wird nichts neu geladen.
+    
+    Returns:
+        tuple: (ledger DataFrame, rollups dict)
+    """
+    revenue_rows = fetch_all_rows(_supabase, "revenue_history", "id, created_at, amount_net, source, platform", user_email)
+    
+    # Expenses aus transactions table (falls vorhanden), nur für diesen User
+    try:
+        expense_rows = fetch_all_rows(
+            _supabase, "transactions", "id, date, amount, category, description", user_email,
+            filters={"type": "Expense"}
+        )
+    except Exception:
+        expense_rows = []
+    
+    ledger = build_ledger(revenue_rows, expense_rows)
+    return ledger, compute_rollups(ledger)
+
+@st.cache_resource
+def _forecast_store():
+    """Prozessweiter LRU-Speicher der gefitteten Forecast-Modelle pro User."""
+    return OrderedDict()
+
+def get_revenue_forecast(user_email, data_version, ledger):
+    """
+    30/60/90-Tage-Projektion der Netto-Einnahmen pro Plattform.
+    
+    Das gefittete Modell bleibt gespeichert, bis neue Daten ankommen; dann wird
+    es inkrementell fortgeschrieben statt komplett neu gefittet.
+    
+    Returns:
+        DataFrame: platform, forecast_N, lower_N, upper_N (80%-Intervall)
+    """
+    store = _forecast_store()
+    with _forecast_lock:
+        entry = store.get(user_email)
+        if entry and entry["version"] == data_version:
+            store.move_to_end(user_email)
+            return entry["projection"]
+    
+    daily = daily_revenue_by_platform(ledger, user_email)
+    today = pd.Timestamp.now().normalize()
+    
+    if entry and entry["model"] is not None:
+        model = update_forecasts(entry["model"], daily, end=today)
+    else:
+        model = fit_forecasts(daily, end=today)
+    
+    projection = project(model, interval=0.8)
+    with _forecast_lock:
+        store[user_email] = {"version": data_version, "model": model, "projection": projection}
+        store.move_to_end(user_email)
+        # Am längsten ungenutzte Modelle verwerfen (werden bei Bedarf neu gefittet)
+        while len(store) > FORECAST_STORE_MAX_ENTRIES:
+            store.popitem(last=False)
+    return projection
+
+def get_finance_version(supabase, user_email):
+    """
+    Versions-Schlüssel über revenue_history und transactions eines Users.
+    
+    Anzahl + neuester updated_at (Migration 022): erkennt neben Inserts/Deletes auch
+    geänderte Beträge und gelöschte und neu angelegte Buchungen.
+    """
+    rev_version = table_version(supabase, "revenue_history", user_email, order_col="updated_at")
+    try:
+        exp_version = table_version(supabase, "transactions", user_email, order_col="updated_at")
+    except Exception:
+        exp_version = "n/a"
+    return f"{rev_version}|{exp_version}"
 
 def render_finance(supabase):
     st.title("FINANCE")
@@ -14,57 +104,61 @@ def render_finance(supabase):
     col_refresh, col_spacer = st.columns([1, 3])
     with col_refresh:
         if st.button("🔄 REFRESH DATA", use_container_width=True):
+            load_finance_data.clear()
             st.rerun()
     
-    # Daten aus revenue_history laden und zu transactions konvertieren
+    # Ledger + Rollups (gecacht bis neue Daten ankommen)
     try:
-        rev_res = supabase.table("revenue_history")\
-            .select("*")\
-            .eq("user_id", user_email)\
-            .execute()
+        data_version = get_finance_version(supabase, user_email)
+        ledger, rollups = load_finance_data(supabase, user_email, data_version)
         
-        if rev_res.data and len(rev_res.data) > 0:
-            # Konvertiere revenue_history zu transaction format
-            transactions = []
-            for item in rev_res.data:
-                transactions.append({
-                    "date": item.get('created_at', datetime.now().isoformat())[:10],
-                    "type": "Income",
-                    "amount": float(item.get('amount_net', 0)),
-                    "category": item.get('source', 'unknown').title(),
-                    "description": f"{item.get('platform', 'unknown').title()} - {item.get('source', 'revenue')}"
-                })
-            
-            df = pd.DataFrame(transactions)
-            df["amount"] = df["amount"].astype(float)
-            df['date'] = pd.to_datetime(df['date']).dt.date
-            
-            # Forecast-Berechnung
-            today = datetime.now().date()
-            
-            actual_revenue = df[(df['type'] == 'Income') & (df['date'] <= today)]['amount'].sum()
-            forecast_revenue = df[(df['type'] == 'Income') & (df['date'] > today)]['amount'].sum()
+        if not ledger.empty:
+            kpis = summarize(rollups, as_of=datetime.now())
+            forecast = get_revenue_forecast(user_email, data_version, ledger)
             
-            # Expenses aus transactions table (falls vorhanden)
-            try:
-                exp_res = supabase.table("transactions")\
-                    .select("amount")\
-                    .eq("type", "Expense")\
-                    .execute()
-                burn_rate = sum(float(e.get('amount', 0)) for e in exp_res.data) if exp_res.data else 0
-            except:
-                burn_rate = 0
+            forecast_30 = forecast["forecast_30"].sum() if not forecast.empty else 0.0
+            lower_30 = forecast["lower_30"].sum() if not forecast.empty else 0.0
+            upper_30 = forecast["upper_30"].sum() if not forecast.empty else 0.0
 
             col1, col2, col3 = st.columns(3)
-            col1.metric("Current Cash", f"${actual_revenue:,.2f}")
-            col2.metric("Pipeline Forecast", f"${forecast_revenue:,.2f}", delta="+ Deals")
-            col3.metric("Burn Rate", f"${burn_rate:,.2f}", delta_color="inverse")
+            col1.metric("Current Cash", f"${kpis['actual_revenue']:,.2f}")
+            col2.metric("Pipeline Forecast", f"${forecast_30:,.2f}", delta=f"30d · ${lower_30:,.0f}–${upper_30:,.0f}", delta_color="off")
+            col3.metric("Burn Rate", f"${kpis['total_expenses']:,.2f}", delta_color="inverse")
+            
+            # Forecast-Details pro Plattform
+            if not forecast.empty:
+                with st.expander("📈 REVENUE FORECAST (30/60/90 TAGE)"):
+                    df_forecast = pd.DataFrame({"Platform": forecast["platform"].str.upper()})
+                    for h in HORIZONS:
+                        df_forecast[f"{h} Tage"] = forecast[f"forecast_{h}"].map(lambda x: f"${x:,.2f}")
+                        df_forecast[f"{h}T Intervall"] = [
+                            f"${lo:,.0f}–${hi:,.0f}" for lo, hi in zip(forecast[f"lower_{h}"], forecast[f"upper_{h}"])
+                        ]
+                    st.dataframe(df_forecast, use_container_width=True, hide_index=True)
+                    st.caption("Holt-Winters (gedämpfter Trend, Wochen-Saisonalität) auf täglichen Netto-Einnahmen · 80%-Intervall")
 
-            # Visualisierung des Cashflow-Verlaufs
+            # Visualisierung des Cashflow-Verlaufs (aggregiert statt Einzelbuchungen)
             st.subheader("Cashflow Projection")
-            fig = px.line(df.sort_values("date"), x="date", y="amount", color="type", template="plotly_white")
+            granularity = st.radio(
+                "Granularität",
+                list(rollups.keys()),
+                index=2,
+                horizontal=True,
+                format_func=str.title,
+                key="finance_granularity"
+            )
+            df_chart = rollups[granularity].reset_index().melt(
+                id_vars="date",
+                value_vars=["income", "expense", "profit"],
+                var_name="type",
+                value_name="amount"
+            )
+            
+            fig = px.line(
+                df_chart, x="date", y="amount", color="type", template="plotly_white",
+                color_discrete_map={"income": "#000000", "expense": "#F44336", "profit": "#888888"}
+            )
             fig.update_traces(
-                line_color="#000000", 
                 fillcolor="rgba(0,0,0,0.02)",
                 line_width=1.5
             )
@@ -82,8 +176,12 @@ def render_finance(supabase):
             st.subheader("Transaction Log (Auto-Synced)")
             st.caption("💡 Data is automatically synced from Revenue History. To add transactions, use the Revenue Vault module.")
             
-            # Sortiere nach Datum (neueste zuerst)
-            df_display = df.sort_values('date', ascending=False)
+            # Ledger ist bereits nach Datum sortiert (neueste zuerst)
+            df_display = ledger.head(TRANSACTION_LOG_LIMIT).copy()
+            df_display['date'] = df_display['date'].dt.date
+            
+            if len(ledger) > TRANSACTION_LOG_LIMIT:
+                st.caption(f"Zeige die neuesten {TRANSACTION_LOG_LIMIT:,} von {len(ledger):,} Buchungen.")
             
             st.dataframe(
                 df_display,
@@ -0,0 +1,126 @@
+"""
+FINANCE ENGINE
+Vektorisierter Ledger-Aufbau und Income/Expense/Profit-Rollups
+"""
+
+import pandas as pd
+import numpy as np
+
+LEDGER_COLUMNS = ["date", "type", "amount", "category", "platform", "description"]
+
+# Rollup-Granularitäten (Name -> pandas Frequenz)
+ROLLUP_FREQUENCIES = {
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "MS"
+}
+
+def _to_day(values):
+    """Parst Zeitstempel/Datumstexte spaltenweise auf Tagesgenauigkeit (ohne Zeitzone)."""
+    parsed = pd.to_datetime(values, utc=True, errors="coerce", format="mixed")
+    return parsed.dt.tz_convert(None).dt.normalize()
+
+def build_ledger(revenue_rows, expense_rows=None):
+    """
+    Baut das Finance-Ledger aus revenue_history (Income) und transactions (Expense).
+    
+    Alle Umwandlungen laufen spaltenweise, es wird nie über Zeilen iteriert.
+    
+    Args:
+        revenue_rows: Zeilen mit created_at, amount_net, source, platform
+        expense_rows: Zeilen mit date, amount, category, description
+    
+    Returns:
+        DataFrame mit LEDGER_COLUMNS, neueste Buchung zuerst
+    """
+    rev = pd.DataFrame(revenue_rows or [], columns=["created_at", "amount_net", "source", "platform"])
+    source = rev["source"].fillna("unknown").astype(str)
+    platform = rev["platform"].fillna("unknown").astype(str)
+    
+    income = pd.DataFrame({
+        "date": _to_day(rev["created_at"]),
+        "type": "Income",
+        "amount": pd.to_numeric(rev["amount_net"], errors="coerce").fillna(0.0),
+        "category": source.str.title(),
+        "platform": platform,
+        "description": platform.str.title() + " - " + source
+    })
+    
+    exp = pd.DataFrame(expense_rows or [], columns=["date", "amount", "category", "description"])
+    expenses = pd.DataFrame({
+        "date": _to_day(exp["date"]),
+        "type": "Expense",
+        "amount": pd.to_numeric(exp["amount"], errors="coerce").fillna(0.0),
+        "category": exp["category"].fillna("Other").astype(str),
+        "platform": None,
+        "description": exp["description"].fillna("").astype(str)
+    })
+    
+    ledger = pd.concat([income, expenses], ignore_index=True)
+    # Buchungen ohne lesbares Datum zählen zum heutigen Tag
+    ledger["date"] = ledger["date"].fillna(pd.Timestamp.now().normalize())
+    
+    return ledger.sort_values("date", ascending=False, ignore_index=True)[LEDGER_COLUMNS]
+
+def compute_rollups(ledger):
+    """
+    Aggregiert das Ledger zu täglichen, wöchentlichen und monatlichen Rollups.
+    
+    Args:
+        ledger: Ergebnis von build_ledger()
+    
+    Returns:
+        dict: {"daily"|"weekly"|"monthly": DataFrame[income, expense, profit]} mit DatetimeIndex
+    """
+    is_income = (ledger["type"] == "Income").to_numpy()
+    amounts = ledger["amount"].to_numpy(dtype=float)
+    
+    signed = pd.DataFrame({
+        "date": ledger["date"],
+        "income": np.where(is_income, amounts, 0.0),
+        "expense": np.where(is_income, 0.0, amounts)
+    })
+    
+    daily = signed.groupby("date")[["income", "expense"]].sum().sort_index()
+    if not daily.empty:
+        # Lückenlose Tagesreihe für Charts & Forecasts
+        daily = daily.asfreq("D", fill_value=0.0)
+    daily.index.name = "date"
+    
+    rollups = {}
+    for name, freq in ROLLUP_FREQUENCIES.items():
+        frame = daily if name == "daily" else daily.resample(freq).sum()
+        frame = frame.copy()
+        frame["profit"] = frame["income"] - frame["expense"]
+        rollups[name] = frame
+    
+    return rollups
+
+def daily_revenue_by_platform(ledger, user_id):
+    """
+    Tägliche Netto-Einnahmen pro Plattform im Format der Forecasting-Engine.
+    
+    Returns:
+        DataFrame: user_id, platform, date, amount
+    """
+    income = ledger[ledger["type"] == "Income"]
+    daily = income.groupby(["platform", "date"], as_index=False)["amount"].sum()
+    daily.insert(0, "user_id", user_id)
+    return daily
+
+def summarize(rollups, as_of=None):
+    """
+    Berechnet die Finance-KPIs aus den Tages-Rollups.
+    
+    Returns:
+        dict: actual_revenue (bis heute), total_expenses, net_profit
+    """
+    daily = rollups["daily"]
+    as_of = pd.Timestamp(as_of or pd.Timestamp.now()).normalize()
+    
+    past = daily.index <= as_of
+    return {
+        "actual_revenue": float(daily.loc[past, "income"].sum()),
+        "total_expenses": float(daily["expense"].sum()),
+        "net_profit": float(daily["profit"].sum())
+    }
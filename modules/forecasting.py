@@ -0,0 +1,318 @@
+"""
+REVENUE FORECASTING ENGINE
+Gedämpftes Holt-Winters (additiv, Wochen-Saisonalität) in NumPy, gebatcht über alle Serien
+"""
+
+import pandas as pd
+import numpy as np
+
+SEASON_LENGTH = 7
+HORIZONS = (30, 60, 90)
+
+# Parameter-Grid (alpha, beta, gamma, phi) - wird für alle Serien gleichzeitig ausgewertet
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+BETAS = (0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.3)
+PHI = 0.98
+PARAM_GRID = np.array([(a, b, g, PHI) for a in ALPHAS for b in BETAS for g in GAMMAS])
+
+# Nach so vielen neuen Tagen wird das Parameter-Grid neu durchsucht
+REFIT_AFTER_DAYS = 28
+
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600}
+
+KEY_COLUMNS = ["user_id", "platform"]
+EPOCH = pd.Timestamp("1970-01-01")
+
+def _phase(date):
+    """Wochentags-Phase eines Datums (unabhängig vom Start der Serie)."""
+    return (pd.Timestamp(date) - EPOCH).days % SEASON_LENGTH
+
+def build_daily_matrix(frame, end=None):
+    """
+    Wandelt Umsatzzeilen in eine Matrix Serien x Tage um.
+
+    Args:
+        frame: DataFrame mit user_id, platform, date (Tag), amount
+        end: Letzter Tag der Matrix (default: letzter Tag in frame)
+
+    Returns:
+        tuple: (keys MultiIndex, dates DatetimeIndex, Y ndarray [Serien, Tage])
+               Y ist NaN vor dem ersten Umsatz einer Serie, danach 0 an Tagen ohne Umsatz.
+    """
+    if frame is None or frame.empty:
+        return pd.MultiIndex.from_arrays([[], []], names=KEY_COLUMNS), pd.DatetimeIndex([]), np.empty((0, 0))
+
+    days = pd.to_datetime(frame["date"]).dt.normalize()
+    end = pd.Timestamp(end).normalize() if end is not None else days.max()
+
+    # Zukünftig datierte Buchungen gehören nicht zur Historie
+    in_range = (days <= end).to_numpy()
+    if not in_range.any():
+        return pd.MultiIndex.from_arrays([[], []], names=KEY_COLUMNS), pd.DatetimeIndex([]), np.empty((0, 0))
+
+    grouped = frame[in_range].assign(date=days[in_range]).groupby(KEY_COLUMNS + ["date"])["amount"].sum()
+    dates = pd.date_range(days[in_range].min(), end, freq="D")
+
+    wide = grouped.unstack("date").reindex(columns=dates)
+    Y = wide.to_numpy(dtype=float)
+
+    started = np.maximum.accumulate(~np.isnan(Y), axis=1)
+    Y = np.where(started & np.isnan(Y), 0.0, Y)
+
+    return wide.index, dates, Y
+
+def _initial_state(Y):
+    """Startlevel = Mittel der ersten Woche jeder Serie, Trend und Saison = 0."""
+    n_series, n_days = Y.shape
+    first = (~np.isnan(Y)).argmax(axis=1)
+
+    window = np.minimum(first[:, None] + np.arange(SEASON_LENGTH), n_days - 1)
+    first_week = Y[np.arange(n_series)[:, None], window]
+    level = np.nan_to_num(np.nanmean(first_week, axis=1))
+    return level, np.zeros(n_series), np.zeros((n_series, SEASON_LENGTH))
+
+def _run_recursion(Y, row_index, params, level, trend, season, phase0):
+    """
+    Holt-Winters-Rekursion über alle Zeilen gleichzeitig (eine Schleife über die Zeit).
+
+    Args:
+        Y: Beobachtungen [Serien, Tage]
+        row_index: Serie je Zustands-Zeile (erlaubt mehrere Parameter pro Serie)
+        params: [Zeilen, 4] alpha, beta, gamma, phi
+        level, trend: [Zeilen]
+        season: [Zeilen, SEASON_LENGTH], indiziert über die Wochentags-Phase
+        phase0: Phase der ersten Spalte von Y
+
+    Returns:
+        tuple: (level, trend, season, sse, n_obs)
+    """
+    alpha, beta, gamma, phi = params.T
+    season = season.copy()
+    sse = np.zeros(len(row_index))
+    n_obs = np.zeros(len(row_index))
+
+    for t in range(Y.shape[1]):
+        y = Y[row_index, t]
+        observed = ~np.isnan(y)
+        phase = (phase0 + t) % SEASON_LENGTH
+
+        s = season[:, phase]
+        damped = phi * trend
+        error = np.where(observed, y - (level + damped + s), 0.0)
+        sse += error * error
+        n_obs += observed
+
+        y = np.where(observed, y, 0.0)
+        new_level = np.where(observed, alpha * (y - s) + (1 - alpha) * (level + damped), level)
+        trend = np.where(observed, beta * (new_level - level) + (1 - beta) * damped, trend)
+        season[:, phase] = np.where(observed, gamma * (y - new_level) + (1 - gamma) * s, s)
+        level = new_level
+
+    return level, trend, season, sse, n_obs
+
+def fit_forecasts(frame, end=None):
+    """
+    Fittet alle Serien (user_id, platform) in einem gebatchten Durchlauf.
+
+    Jede Parameter-Kombination aus PARAM_GRID läuft parallel als eigene Zeile;
+    pro Serie gewinnt die Kombination mit dem kleinsten One-Step-Fehler.
+
+    Args:
+        frame: DataFrame mit user_id, platform, date, amount
+        end: Stichtag (default: letzter Tag in frame)
+
+    Returns:
+        dict: Modell (siehe project()) oder None ohne Daten
+    """
+    keys, dates, Y = build_daily_matrix(frame, end=end)
+    if len(keys) == 0:
+        return None
+
+    n_series, n_grid = len(keys), len(PARAM_GRID)
+    row_index = np.repeat(np.arange(n_series), n_grid)
+    params = np.tile(PARAM_GRID, (n_series, 1))
+
+    level0, trend0, season0 = _initial_state(Y)
+    level, trend, season, sse, n_obs = _run_recursion(
+        Y, row_index, params, level0[row_index], trend0[row_index], season0[row_index], _phase(dates[0])
+    )
+
+    mse = (sse / np.maximum(n_obs, 1)).reshape(n_series, n_grid)
+    best = np.arange(n_series) * n_grid + mse.argmin(axis=1)
+
+    return {
+        "keys": keys,
+        "params": params[best],
+        "level": level[best],
+        "trend": trend[best],
+        "season": season[best],
+        "sigma": np.sqrt(mse.min(axis=1)),
+        "n_obs": n_obs[best],
+        "history_total": np.nansum(Y, axis=1),
+        "days_since_fit": np.zeros(n_series),
+        "last_date": dates[-1]
+    }
+
+def _select(model, mask):
+    """Teilmenge eines Modells (Serien-Maske)."""
+    selected = {name: value[mask] for name, value in model.items() if isinstance(value, np.ndarray)}
+    selected["keys"] = model["keys"][mask]
+    selected["last_date"] = model["last_date"]
+    return selected
+
+def _concat(models):
+    """Fügt mehrere Modelle mit gleichem Stichtag zusammen."""
+    models = [m for m in models if m is not None and len(m["keys"]) > 0]
+    if not models:
+        return None
+
+    combined = {name: np.concatenate([m[name] for m in models])
+                for name, value in models[0].items() if isinstance(value, np.ndarray)}
+    combined["keys"] = models[0]["keys"].append([m["keys"] for m in models[1:]]) if len(models) > 1 else models[0]["keys"]
+    combined["last_date"] = max(m["last_date"] for m in models)
+    return combined
+
+def update_forecasts(model, frame, end=None):
+    """
+    Aktualisiert ein Modell inkrementell mit neuen Tagen.
+
+    Bekannte Serien laufen nur über die Tage nach model["last_date"] mit den
+    gespeicherten Parametern. Neu gefittet werden nur Serien, die neu sind,
+    deren Historie sich rückwirkend geändert hat (z.B. CSV-Import) oder deren
+    letzte Parametersuche länger als REFIT_AFTER_DAYS zurückliegt.
+
+    Args:
+        model: Ergebnis von fit_forecasts()/update_forecasts()
+        frame: Komplette Umsatzzeilen (user_id, platform, date, amount)
+        end: Stichtag
+
+    Returns:
+        dict: Aktualisiertes Modell
+    """
+    if model is None or len(model["keys"]) == 0:
+        return fit_forecasts(frame, end=end)
+
+    keys, dates, Y = build_daily_matrix(frame, end=end)
+    if len(keys) == 0:
+        return None
+
+    last_date = model["last_date"]
+    position = model["keys"].get_indexer(keys)
+    known = position >= 0
+
+    history = dates <= last_date
+    new_days = int((~history).sum())
+
+    # Rückwirkende Änderungen erkennen (Summe der bekannten Historie weicht ab)
+    old_total = np.where(known, model["history_total"][np.maximum(position, 0)], np.nan)
+    unchanged = known & np.isclose(np.nansum(Y[:, history], axis=1), old_total, rtol=1e-6, atol=0.01)
+    stale = model["days_since_fit"][np.maximum(position, 0)] + new_days > REFIT_AFTER_DAYS
+    incremental = unchanged & ~stale
+
+    updated = None
+    if incremental.any():
+        base = _select(model, position[incremental])
+        base["keys"] = keys[incremental]
+
+        if new_days > 0:
+            Y_new = Y[incremental][:, ~history]
+            level, trend, season, sse, n_obs = _run_recursion(
+                Y_new, np.arange(len(Y_new)), base["params"], base["level"], base["trend"], base["season"],
+                _phase(dates[~history][0])
+            )
+            total_n = base["n_obs"] + n_obs
+            base.update({
+                "level": level,
+                "trend": trend,
+                "season": season,
+                "sigma": np.sqrt((base["sigma"] ** 2 * base["n_obs"] + sse) / np.maximum(total_n, 1)),
+                "n_obs": total_n,
+                "history_total": np.nansum(Y[incremental], axis=1),
+                "days_since_fit": base["days_since_fit"] + new_days
+            })
+        base["last_date"] = dates[-1]
+        updated = base
+
+    refit = None
+    if (~incremental).any():
+        refit_keys = keys[~incremental]
+        subset = frame.set_index(KEY_COLUMNS).index.isin(refit_keys)
+        refit = fit_forecasts(frame[subset], end=dates[-1])
+
+    return _concat([updated, refit])
+
+def project(model, horizons=HORIZONS, interval=0.8):
+    """
+    Projiziert den Umsatz-Total für die nächsten N Tage je Serie.
+
+    Das Intervall nutzt die Fehlerfortpflanzung des Level/Trend-Updates
+    (c_j = alpha * (1 + j * beta)) über die Summe der Horizont-Tage.
+
+    Args:
+        model: Ergebnis von fit_forecasts()/update_forecasts()
+        horizons: Horizonte in Tagen
+        interval: Konfidenz (0.8, 0.9, 0.95)
+
+    Returns:
+        DataFrame: user_id, platform, forecast_N, lower_N, upper_N je Horizont
+    """
+    if model is None or len(model["keys"]) == 0:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+
+    max_h = max(horizons)
+    steps = np.arange(1, max_h + 1)
+    alpha, beta, _, phi = model["params"].T
+
+    # Gedämpfter Trend: sum_{i=1..h} phi^i
+    damping = np.cumsum(phi[:, None] ** steps[None, :], axis=1)
+    phases = (_phase(model["last_date"]) + steps) % SEASON_LENGTH
+    path = model["level"][:, None] + damping * model["trend"][:, None] + model["season"][:, phases]
+    cumulative = np.cumsum(path, axis=1)
+
+    # Varianz der Summe über h Tage
+    c = alpha[:, None] * (1 + steps[None, :-1] * beta[:, None])
+    weights = 1 + np.concatenate([np.zeros((len(alpha), 1)), np.cumsum(c, axis=1)], axis=1)
+    spread = Z_SCORES.get(interval, 1.2816) * model["sigma"][:, None] * np.sqrt(np.cumsum(weights ** 2, axis=1))
+
+    result = model["keys"].to_frame(index=False)
+    for h in horizons:
+        total = cumulative[:, h - 1]
+        result[f"forecast_{h}"] = np.maximum(total, 0.0)
+        result[f"lower_{h}"] = np.maximum(total - spread[:, h - 1], 0.0)
+        result[f"upper_{h}"] = np.maximum(total + spread[:, h - 1], 0.0)
+    return result
+
+def model_to_records(model):
+    """Serialisiert ein Modell für die Tabelle revenue_forecasts (ohne Projektionen)."""
+    if model is None:
+        return []
+    records = model["keys"].to_frame(index=False)
+    records["alpha"], records["beta"], records["gamma"], records["phi"] = model["params"].T
+    records["level"] = model["level"]
+    records["trend"] = model["trend"]
+    records["season"] = model["season"].tolist()
+    records["sigma"] = model["sigma"]
+    records["n_obs"] = model["n_obs"].astype(int)
+    records["history_total"] = model["history_total"]
+    records["days_since_fit"] = model["days_since_fit"].astype(int)
+    records["last_date"] = model["last_date"].strftime("%Y-%m-%d")
+    return records.to_dict("records")
+
+def model_from_records(records):
+    """Lädt ein Modell aus revenue_forecasts-Zeilen (Gegenstück zu model_to_records)."""
+    if not records:
+        return None
+    df = pd.DataFrame(records)
+    return {
+        "keys": pd.MultiIndex.from_frame(df[KEY_COLUMNS]),
+        "params": df[["alpha", "beta", "gamma", "phi"]].to_numpy(dtype=float),
+        "level": df["level"].to_numpy(dtype=float),
+        "trend": df["trend"].to_numpy(dtype=float),
+        "season": np.array(df["season"].tolist(), dtype=float).reshape(len(df), SEASON_LENGTH),
+        "sigma": df["sigma"].to_numpy(dtype=float),
+        "n_obs": df["n_obs"].to_numpy(dtype=float),
+        "history_total": df["history_total"].to_numpy(dtype=float),
+        "days_since_fit": df["days_since_fit"].to_numpy(dtype=float),
+        "last_date": pd.Timestamp(df["last_date"].max())
+    }
@@ -0,0 +1,252 @@
+"""
+PIPELINE METRICS
+Counter, Gauges und Histogramme für Syncs, Imports, Emails und Alerts im Prometheus-Textformat
+"""
+
+import os
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Präfix aller Metriken
+NAMESPACE = "content_core"
+
+# Standard-Buckets in Sekunden (API-Calls bis Batch-Jobs)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Textfile-Export (z.B. node_exporter textfile collector oder Tests) und HTTP-Port
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Basis: Name, Hilfe-Text, Label-Namen und Werte pro Label-Kombination."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        missing = set(self.labelnames) - set(labels)
+        if missing:
+            raise ValueError(f"{self.name}: Labels fehlen: {sorted(missing)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """Monoton steigender Zähler."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Momentwert (z.B. Queue-Tiefe)."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Verteilung mit kumulativen Buckets, Summe und Anzahl."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Misst die Dauer des Blocks in Sekunden (auch bei Exceptions)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self, key, state):
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(bound))])} {count}"
+            for bound, count in zip(self.buckets, state["counts"])
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+class Registry:
+    """Alle Metriken eines Prozesses (App oder Script)."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus Text Exposition Format (Version 0.0.4)."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# --- PIPELINE-METRIKEN ---
+SYNC_DURATION = REGISTRY.histogram("sync_duration_seconds", "Dauer eines Plattform-Syncs", ["platform", "status"])
+UPSTREAM_RESPONSES = REGISTRY.counter("upstream_responses_total", "Antworten externer APIs nach Status-Code", ["service", "status_code"])
+IMPORT_ROWS = REGISTRY.counter("import_rows_total", "Importierte Zeilen", ["source"])
+IMPORT_DURATION = REGISTRY.histogram("import_duration_seconds", "Dauer eines Imports", ["source"])
+IMPORT_THROUGHPUT = REGISTRY.gauge("import_rows_per_second", "Durchsatz des letzten Imports", ["source"])
+EMAILS = REGISTRY.counter("emails_total", "Versendete Emails nach Typ und Ergebnis", ["type", "status"])
+EMAIL_QUEUE_DEPTH = REGISTRY.gauge("email_queue_depth", "Noch zu versendende Emails", ["queue"])
+ALERT_EVALUATION = REGISTRY.histogram("alert_evaluation_seconds", "Dauer der Regel-Auswertung", ["scope"])
+ALERTS_FOUND = REGISTRY.counter("alerts_found_total", "Gefundene Alerts", ["scope"])
+PIPELINE_ERRORS = REGISTRY.counter("pipeline_errors_total", "Abgefangene Fehler in Hintergrund-Pipelines", ["pipeline"])
+
+def track_sync(platform=None):
+    """
+    Decorator: misst die Sync-Dauer; status = ok bei truthy Rückgabewert.
+
+    Args:
+        platform: Fester Plattform-Name (None = erstes Argument der Funktion)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            label = platform or (args[0] if args else kwargs.get("platform", "unknown"))
+            started = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                SYNC_DURATION.observe(time.perf_counter() - started, platform=label, status="ok" if result else "error")
+        return wrapper
+    return decorator
+
+def record_upstream(service, response):
+    """Zählt den Status-Code einer requests-Antwort."""
+    UPSTREAM_RESPONSES.inc(service=service, status_code=getattr(response, "status_code", "none"))
+
+def record_import(source, rows, seconds):
+    """Zeilen, Dauer und Durchsatz eines Imports."""
+    IMPORT_ROWS.inc(rows, source=source)
+    IMPORT_DURATION.observe(seconds, source=source)
+    IMPORT_THROUGHPUT.set(round(rows / seconds, 2) if seconds > 0 else 0, source=source)
+
+def write_textfile(path):
+    """Schreibt alle Metriken atomar in eine Datei (tmp + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+    return path
+
+def export(path=None):
+    """Script-Ende: Metriken nach path bzw. METRICS_FILE schreiben (falls gesetzt)."""
+    path = path or METRICS_FILE
+    if path:
+        write_textfile(path)
+        print(f"Metrics: {len(REGISTRY.metrics)} Metriken nach {path} geschrieben")
+    return path
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes nicht ins stdout loggen
+        pass
+
+def start_http_server(port=None, addr="0.0.0.0"):
+    """
+    Startet einen /metrics-Endpunkt in einem Daemon-Thread.
+
+    Args:
+        port: Port (None = METRICS_PORT, nicht gesetzt -> kein Server)
+
+    Returns:
+        ThreadingHTTPServer oder None
+    """
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    server = ThreadingHTTPServer((addr, int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
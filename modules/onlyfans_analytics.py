@@ -7,7 +7,15 @@ import streamlit as st
 import pandas as pd
 import requests
 from datetime import datetime
+from modules.data_loader import fetch_all_rows, table_version
+from modules.sections import render_sections
+from modules import sync_log, sync_history
+from modules.rfm import prepare_customers, compute_breakpoints, score_customers, \
+    breakpoints_to_records, breakpoints_from_records, to_records, TIERS
 
+RFM_SOURCE_COLUMNS = "id, user_id, customer_username, total_spent, purchase_count, last_purchase_date, r_score, f_score, m_score, rfm_segment"
+
+@sync_log.logged_sync("onlyfans")
 def trigger_of_sync(account_credentials, sync_type="full"):
     """
     Triggert externen Worker-Service für OnlyFans-Sync.
@@ -33,8 +41,10 @@ def trigger_of_sync(account_credentials, sync_type="full"):
         }
         
         res = requests.post(sync_url, json=payload, timeout=30)
+        sync_log.record_response(res)
         return res.status_code == 200
     except Exception as e:
+        sync_log.record_error(e)
         st.error(f"Worker Connection Error: {e}")
         return False
 
@@ -75,7 +85,7 @@ def display_sync_panel(supabase):
                         "status": "pending"
                     }).execute()
                     
-                    if trigger_of_sync(credentials, "full"):
+                    if trigger_of_sync(credentials, "full", trigger="of_panel"):
                         st.success("✅ Sync-Prozess gestartet. Daten erscheinen in Kürze.")
                     else:
                         st.error("❌ Verbindung fehlgeschlagen. Prüfe Credentials oder Worker-Service.")
@@ -86,29 +96,81 @@ def display_sync_panel(supabase):
             if st.button("CUSTOMERS ONLY", use_container_width=True):
                 st.info("Synchronisiert nur Kunden-Daten (schneller)")
     
-    # Sync History
+    # Sync History (sync_runs, paginiert)
     st.markdown("---")
-    st.markdown("### 📜 SYNC HISTORY")
+    sync_history.render_sync_history(supabase, st.session_state.get('user_email', 'unknown'), platforms=["onlyfans"],
+                                 key="of_sync_history")
+
+def refresh_rfm_scores(supabase, user_email):
+    """
+    Scored neue/geänderte Fans inkrementell mit den gespeicherten Quintil-Grenzen.
     
-    user_email = st.session_state.get('user_email', 'unknown')
-    sync_history = supabase.table("of_sync_log")\
-        .select("*")\
+    Ohne gespeicherte Grenzen (erster Lauf) werden alle Fans gescored. Der Nightly-Job
+    (scripts/rfm_scores.py) berechnet die Grenzen neu.
+    
+    Returns:
+        int: Anzahl aktualisierter Fans
+    """
+    stored = supabase.table("rfm_breakpoints")\
+        .select("user_id, recency, frequency, monetary")\
         .eq("user_id", user_email)\
-        .order("started_at", desc=True)\
-        .limit(10)\
         .execute()
     
-    if sync_history.data:
-        df_sync = pd.DataFrame(sync_history.data)
-        df_sync['started_at'] = pd.to_datetime(df_sync['started_at']).dt.strftime('%Y-%m-%d %H:%M')
-        
-        st.dataframe(
-            df_sync[['started_at', 'sync_type', 'status', 'items_synced']],
-            use_container_width=True,
-            hide_index=True
-        )
+    if stored.data:
+        rows = fetch_all_rows(supabase, "of_customers_rfm_stale", RFM_SOURCE_COLUMNS, user_email)
+        if not rows:
+            return 0
+        customers = prepare_customers(rows)
+        breakpoints = breakpoints_from_records(stored.data)
     else:
-        st.info("Noch keine Syncs durchgeführt")
+        rows = fetch_all_rows(supabase, "of_customers", RFM_SOURCE_COLUMNS, user_email)
+        if not rows:
+            return 0
+        customers = prepare_customers(rows)
+        breakpoints = compute_breakpoints(customers)
+        supabase.table("rfm_breakpoints")\
+            .upsert(breakpoints_to_records(breakpoints, customers), on_conflict="user_id")\
+            .execute()
+    
+    # Auch unveränderte Scores schreiben, damit rfm_updated_at die Fans als aktuell markiert
+    records = to_records(score_customers(customers, breakpoints))
+    for start in range(0, len(records), 500):
+        supabase.table("of_customers")\
+            .upsert(records[start:start + 500], on_conflict="user_id,customer_username")\
+            .execute()
+    return len(records)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def refresh_rfm_for_version(_supabase, user_email, customers_version):
+    """
+    Re-Scoring nur, wenn sich die Kauf-Daten seit dem letzten Lauf geändert haben.
+    
+    customers_version (Anzahl + neuester updated_at aus of_customers) ändert sich bei
+    neuen Fans und neuen Käufen, nicht aber durch das Schreiben der Scores selbst.
+    """
+    return refresh_rfm_scores(_supabase, user_email)
+
+def fetch_tier_summary(supabase, user_email):
+    """
+    Exakte Tier- und Segment-Zählungen aus customer_tier_summary (Migration 015).
+    
+    Returns:
+        tuple: (tiers DataFrame, segments DataFrame) mit label, customers, revenue
+    """
+    res = supabase.table("customer_tier_summary")\
+        .select("dimension, label, customers, revenue")\
+        .eq("user_id", user_email)\
+        .gt("customers", 0)\
+        .execute()
+    
+    summary = pd.DataFrame(res.data or [], columns=["dimension", "label", "customers", "revenue"])
+    summary["customers"] = pd.to_numeric(summary["customers"]).fillna(0).astype(int)
+    summary["revenue"] = pd.to_numeric(summary["revenue"]).fillna(0.0)
+    
+    tiers = summary[summary["dimension"] == "tier"].set_index("label")\
+        .reindex(TIERS).fillna({"customers": 0, "revenue": 0.0})
+    segments = summary[summary["dimension"] == "segment"].sort_values("customers", ascending=False)
+    return tiers, segments
 
 def display_whale_watcher(supabase):
     """Rendert Whale Watcher (Top Spender Analytics)."""
@@ -116,22 +178,32 @@ def display_whale_watcher(supabase):
     
     user_email = st.session_state.get('user_email', 'unknown')
     
+    try:
+        refresh_rfm_for_version(supabase, user_email,
+                                table_version(supabase, "of_customers", user_email, order_col="updated_at"))
+        tiers, segments = fetch_tier_summary(supabase, user_email)
+    except Exception as e:
+        st.error(f"RFM Error: {e}")
+        st.info("💡 Stelle sicher, dass Migration 015 ausgeführt wurde: `migrations/015_customer_rfm.sql`")
+        return
+    
     # Top Spender aus View
     whales = supabase.table("whale_watcher")\
         .select("*")\
         .eq("user_id", user_email)\
+        .order("total_spent", desc=True)\
         .limit(20)\
         .execute()
     
     if whales.data and len(whales.data) > 0:
         df_whales = pd.DataFrame(whales.data)
         
-        # KPIs
+        # KPIs (exakt über alle Fans aus der Summary)
         col1, col2, col3, col4 = st.columns(4)
         
-        total_whale_revenue = df_whales['total_spent'].sum()
-        whale_count = len(df_whales[df_whales['customer_tier'] == 'WHALE'])
-        avg_whale_spend = df_whales[df_whales['customer_tier'] == 'WHALE']['total_spent'].mean() if whale_count > 0 else 0
+        whale_count = int(tiers.loc['WHALE', 'customers'])
+        total_whale_revenue = float(tiers.loc['WHALE', 'revenue'])
+        avg_whale_spend = total_whale_revenue / whale_count if whale_count > 0 else 0
         top_whale = df_whales.iloc[0]
         
         col1.metric("TOTAL WHALE REVENUE", f"${total_whale_revenue:,.2f}")
@@ -143,21 +215,27 @@ def display_whale_watcher(supabase):
         st.markdown("---")
         st.markdown("### 🏆 CUSTOMER TIERS")
         
-        tier_counts = df_whales['customer_tier'].value_counts()
         tier_cols = st.columns(4)
-        
-        tiers = ['WHALE', 'DOLPHIN', 'FISH', 'MINNOW']
         tier_emojis = {'WHALE': '🐋', 'DOLPHIN': '🐬', 'FISH': '🐟', 'MINNOW': '🐠'}
         
-        for i, tier in enumerate(tiers):
-            count = tier_counts.get(tier, 0)
-            tier_cols[i].metric(f"{tier_emojis[tier]} {tier}", f"{count}")
+        for i, tier in enumerate(TIERS):
+            tier_cols[i].metric(f"{tier_emojis[tier]} {tier}", f"{int(tiers.loc[tier, 'customers']):,}")
+        
+        # RFM-Segmente
+        if not segments.empty:
+            st.markdown("### 🎯 RFM-SEGMENTE")
+            st.dataframe(
+                segments[['label', 'customers', 'revenue']].rename(columns={'label': 'segment'}),
+                use_container_width=True,
+                hide_index=True
+            )
         
         # Top Spender Table
         st.markdown("---")
         st.markdown("### 📊 TOP 20 SPENDER")
         
-        display_cols = ['customer_username', 'customer_tier', 'total_spent', 'purchase_count', 'subscription_status']
+        display_cols = ['customer_username', 'customer_tier', 'rfm_segment', 'r_score', 'f_score', 'm_score',
+                        'total_spent', 'purchase_count', 'subscription_status']
         available_cols = [col for col in display_cols if col in df_whales.columns]
         
         st.dataframe(
@@ -200,11 +278,8 @@ def render_onlyfans_analytics(supabase):
         st.warning("⚠️ Adult Content ist deaktiviert. Aktiviere es in den System Settings.")
         return
     
-    # Tabs
-    tab1, tab2 = st.tabs(["🐋 WHALE WATCHER", "🔄 SYNC CONTROL"])
-    
-    with tab1:
-        display_whale_watcher(supabase)
-    
-    with tab2:
-        display_sync_panel(supabase)
+    # Sections (nur die sichtbare lädt Daten)
+    render_sections("onlyfans", {
+        "🐋 WHALE WATCHER": lambda: display_whale_watcher(supabase),
+        "🔄 SYNC CONTROL": lambda: display_sync_panel(supabase)
+    })
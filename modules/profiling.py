@@ -0,0 +1,164 @@
+"""
+PAGE PROFILING
+Opt-in CPU-Profiling des kompletten Script-Runs (cProfile oder pyinstrument), aktiviert per Admin-Query-Param
+"""
+
+import io
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+import pandas as pd
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+# ?profile=cprofile | pyinstrument aktiviert, ?profile=off deaktiviert (pro Session)
+PROFILE_PARAM = "profile"
+PROFILERS = ["cprofile", "pyinstrument"]
+DISABLE_VALUES = ["0", "off", "false"]
+
+TOP_FUNCTIONS = 30
+
+# Nur ein Profiler gleichzeitig pro Prozess (cProfile/sys.monitoring ist nicht pro Thread)
+_PROFILER_LOCK = threading.Lock()
+
+def update_mode(allowed):
+    """
+    Übernimmt den Query-Param in die Session.
+
+    Args:
+        allowed: Darf der User profilen (Admin)?
+
+    Returns:
+        str | None: Aktiver Modus
+    """
+    value = st.query_params.get(PROFILE_PARAM)
+    if not allowed:
+        st.session_state.profile_mode = None
+        return None
+    if value is not None:
+        value = value.lower()
+        if value in DISABLE_VALUES:
+            st.session_state.profile_mode = None
+        elif value in PROFILERS:
+            st.session_state.profile_mode = value
+        elif value in ["1", "true", "on"]:
+            st.session_state.profile_mode = "cprofile"
+    return st.session_state.get("profile_mode")
+
+def _cprofile_result(profiler, label):
+    """Top-Funktionen nach kumulativer Zeit + .prof-Datei (pstats/snakeviz)."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (cc, nc, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{function} ({filename.rsplit('/', 1)[-1]}:{line})",
+            "calls": nc,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2)
+        })
+    top = pd.DataFrame(rows).sort_values("cumtime_ms", ascending=False).head(TOP_FUNCTIONS) if rows else pd.DataFrame()
+
+    return {
+        "top": top,
+        "text": None,
+        "file": marshal.dumps(stats.stats),
+        "file_name": f"profile_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+        "mime": "application/octet-stream"
+    }
+
+def _pyinstrument_result(profiler, label):
+    """Call-Tree als Text + interaktiver HTML-Report."""
+    return {
+        "top": None,
+        "text": profiler.output_text(unicode=True, color=False, show_all=False),
+        "file": profiler.output_html().encode("utf-8"),
+        "file_name": f"profile_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
+        "mime": "text/html"
+    }
+
+@contextmanager
+def profile_run(mode, label="page"):
+    """
+    Profiliert den umschlossenen Block, wenn ein Modus aktiv ist.
+
+    Das Ergebnis landet in st.session_state.profile_result und wird von
+    render_profile_panel() angezeigt. st.rerun()/st.stop() im Block werden
+    durchgereicht, der Profiler wird trotzdem sauber beendet.
+
+    Args:
+        mode: "cprofile", "pyinstrument" oder None (kein Profiling)
+        label: Name der Seite für Anzeige/Dateiname
+    """
+    if mode not in PROFILERS or (mode == "pyinstrument" and not PYINSTRUMENT_AVAILABLE):
+        yield
+        return
+    if not _PROFILER_LOCK.acquire(blocking=False):
+        st.session_state.profile_result = {"label": label, "mode": mode, "busy": True}
+        yield
+        return
+
+    try:
+        if mode == "pyinstrument":
+            profiler = PyinstrumentProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            if mode == "pyinstrument":
+                profiler.stop()
+                result = _pyinstrument_result(profiler, label)
+            else:
+                profiler.disable()
+                result = _cprofile_result(profiler, label)
+            result.update({"label": label, "mode": mode, "wall_ms": round(wall_ms, 1), "busy": False})
+            st.session_state.profile_result = result
+    finally:
+        _PROFILER_LOCK.release()
+
+def render_profile_panel(mode):
+    """Admin-Panel mit dem Profil des letzten Runs (im Sidebar-Kontext aufrufen)."""
+    result = st.session_state.get("profile_result")
+    with st.expander("⏱️ CPU PROFILE", expanded=bool(mode)):
+        if not mode:
+            st.caption(f"Aus. Aktivieren mit `?{PROFILE_PARAM}=cprofile`"
+                       + (f" oder `?{PROFILE_PARAM}=pyinstrument`" if PYINSTRUMENT_AVAILABLE else "")
+                       + f", beenden mit `?{PROFILE_PARAM}=off`.")
+            return
+        if mode == "pyinstrument" and not PYINSTRUMENT_AVAILABLE:
+            st.warning("pyinstrument ist nicht installiert – nutze `?profile=cprofile`.")
+            return
+        if not result:
+            st.caption("Noch kein Run profiliert.")
+            return
+        if result.get("busy"):
+            st.info("Ein anderer Run wird gerade profiliert – dieser Run lief ohne Profiler.")
+            return
+
+        st.metric(f"{result['label']} ({result['mode']})", f"{result['wall_ms']:.0f} ms")
+        if result["top"] is not None and not result["top"].empty:
+            st.dataframe(result["top"], hide_index=True, use_container_width=True)
+        if result["text"]:
+            st.code(result["text"], language=None)
+
+        st.download_button(
+            "DOWNLOAD PROFILE",
+            data=io.BytesIO(result["file"]),
+            file_name=result["file_name"],
+            mime=result["mime"],
+            use_container_width=True,
+            key="profile_download"
+        )
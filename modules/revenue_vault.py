@@ -3,9 +3,35 @@ REVENUE & VAULT ANALYTICS MODULE
 Tracking für Umsatz und Medien-Performance
 """
 
+import time
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+from modules.data_loader import table_version, fetch_all_rows, fetch_concurrently
+from modules.sections import select_section
+from modules import metrics
+from modules.content_scoring import ASSET_COLUMNS, TIERS, prepare_assets, score_assets, tier_counts, with_rank_changes
+from modules.clv import ACTIVITY_COLUMNS, AT_RISK_CHURN, prepare_customers, fit_params, score_customers, at_risk_fans, \
+    params_from_records
+
+REVENUE_COLUMNS = ["id", "created_at", "platform", "source", "amount_net", "amount_gross"]
+WHALE_COLUMNS = ["customer", "platform", "lifetime_spend", "purchase_count", "spend_30d", "last_seen"]
+TOP_WHALES = 10
+TOP_VAULT_ASSETS = 20
+
+# Sections der Seite -> benötigte Datenquellen (nur die sichtbare Section wird geladen)
+REVENUE_SECTIONS = {
+    "📊 OVERVIEW": ("revenue", "assets"),
+    "🐋 WHALES": ("revenue", "whales"),
+    "🔥 CONTENT SCORING": ("assets", "snapshot")
+}
+
+VAULT_PAGE_SIZES = [10, 25, 50, 100]
+VAULT_TIER_LABELS = {
+    "CASH_COW": "🐄 CASH-COW",
+    "SOLID": "✅ SOLID",
+    "UNDERPERFORMER": "⚠️ UNDERPERFORMER",
+    "BURNOUT": "🗑️ BURNOUT"
+}
 
 def process_of_csv(uploaded_file, user_email):
     """
@@ -18,6 +44,7 @@ def process_of_csv(uploaded_file, user_email):
     Returns:
         int: Anzahl importierter Einträge
     """
+    started = time.perf_counter()
     try:
         df = pd.read_csv(uploaded_file)
         
@@ -44,12 +71,109 @@ def process_of_csv(uploaded_file, user_email):
             from app import init_supabase
             supabase = init_supabase()
             supabase.table("revenue_history").insert(entries).execute()
+            metrics.record_import("onlyfans_csv", len(entries), time.perf_counter() - started)
             return len(entries)
     except Exception as e:
+        metrics.PIPELINE_ERRORS.inc(pipeline="import")
         st.error(f"CSV Processing Error: {e}")
         st.info("💡 Stelle sicher, dass die CSV die Spalten 'Amount', 'Type', 'Date' enthält.")
     return 0
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_revenue_vault_frames(_supabase, user_email, parts, revenue_version, vault_version, today):
+    """
+    Lädt die Daten der Revenue-&-Vault-Seite in einem parallelen Durchlauf.
+    
+    Jede Tabelle wird genau einmal mit der benötigten Projektion gelesen; die
+    Sections bekommen die gemeinsamen Frames übergeben.
+    
+    Args:
+        parts: Benötigte Quellen (revenue, assets, snapshot, whales), siehe REVENUE_SECTIONS
+        revenue_version: Versions-Key von revenue_history (Cache-Invalidierung)
+        vault_version: Versions-Key von vault_assets
+        today: Tagesdatum (Rang-Snapshot & nightly aktualisierte Rollups)
+    
+    Returns:
+        dict: revenue, assets, scored, snapshot_date, whales (soweit in parts angefordert)
+    """
+    def previous_snapshot():
+        # Letzter Snapshot vor heute (Nightly-Job scripts/vault_rank_snapshots.py)
+        latest = _supabase.table("vault_rank_snapshots")\
+            .select("snapshot_date")\
+            .eq("user_id", user_email)\
+            .lt("snapshot_date", today)\
+            .order("snapshot_date", desc=True)\
+            .limit(1)\
+            .execute()
+        if not latest.data:
+            return None, []
+        
+        snapshot_date = latest.data[0]["snapshot_date"]
+        return snapshot_date, fetch_all_rows(_supabase, "vault_rank_snapshots", "asset_id, rank", user_email,
+                                             filters={"snapshot_date": snapshot_date}, order_col="asset_id")
+    
+    def top_whales():
+        # Top Spender nach Lifetime-Spend (Rollup customer_activity, Migration 013)
+        return _supabase.table("customer_activity")\
+            .select(", ".join(WHALE_COLUMNS))\
+            .eq("user_id", user_email)\
+            .order("lifetime_spend", desc=True)\
+            .limit(TOP_WHALES)\
+            .execute().data
+    
+    tasks = {
+        "revenue": lambda: fetch_all_rows(_supabase, "revenue_history", ", ".join(REVENUE_COLUMNS), user_email),
+        "assets": lambda: fetch_all_rows(_supabase, "vault_assets", ", ".join(ASSET_COLUMNS), user_email),
+        "snapshot": previous_snapshot,
+        "whales": top_whales
+    }
+    data = fetch_concurrently({name: task for name, task in tasks.items() if name in parts})
+    frames = {}
+    
+    if "revenue" in data:
+        revenue = pd.DataFrame(data["revenue"], columns=REVENUE_COLUMNS)
+        for col in ["amount_net", "amount_gross"]:
+            revenue[col] = pd.to_numeric(revenue[col], errors="coerce").fillna(0.0)
+        frames["revenue"] = revenue
+    
+    if "assets" in data:
+        frames["assets"] = prepare_assets(data["assets"])
+    
+    if "snapshot" in data:
+        frames["snapshot_date"], previous = data["snapshot"]
+        frames["scored"] = with_rank_changes(score_assets(frames["assets"]), previous)
+    
+    if "whales" in data:
+        frames["whales"] = pd.DataFrame(data["whales"] or [], columns=WHALE_COLUMNS)
+    
+    return frames
+
+def load_revenue_vault(supabase, user_email, parts):
+    """
+    Versions-Checks und Fansly-Verbindung parallel, danach die (gecachten) Frames der Section.
+    
+    Args:
+        parts: Benötigte Quellen der sichtbaren Section (REVENUE_SECTIONS)
+    
+    Returns:
+        dict: Ergebnis von load_revenue_vault_frames() + revenue_version, has_fansly_token
+    """
+    checks = fetch_concurrently({
+        "revenue_version": lambda: table_version(supabase, "revenue_history", user_email),
+        "vault_version": lambda: table_version(supabase, "vault_assets", user_email, order_col="updated_at"),
+        "fansly": lambda: supabase.table("api_connections")\
+            .select("platform")\
+            .eq("user_id", user_email)\
+            .eq("platform", "fansly")\
+            .eq("is_active", True)\
+            .execute().data
+    })
+    
+    today = str(pd.Timestamp.now(tz="UTC").date())
+    frames = load_revenue_vault_frames(supabase, user_email, tuple(parts), checks["revenue_version"],
+                                       checks["vault_version"], today)
+    return dict(frames, revenue_version=checks["revenue_version"], has_fansly_token=bool(checks["fansly"]))
+
 def render_revenue_vault(supabase):
     """
     Rendert Revenue-Tracking und Vault-Analytics Dashboard.
@@ -64,6 +188,17 @@ def render_revenue_vault(supabase):
     
     user_email = st.session_state.get('user_email', 'unknown')
     
+    # Nur die sichtbare Section lädt ihre Daten (parallel, ein Durchlauf)
+    section = select_section("revenue_vault", list(REVENUE_SECTIONS.keys()))
+    
+    try:
+        page = load_revenue_vault(supabase, user_email, REVENUE_SECTIONS[section])
+    except Exception as e:
+        page = None
+        st.error(f"ANALYTICS ERROR: {e}")
+        st.info("💡 Make sure you've run the migrations: migrations/004_revenue_vault_schema.sql, "
+                "013_customer_activity.sql, 017_vault_rank_snapshots.sql")
+    
     # Sidebar: Quick Log
     with st.sidebar:
         st.markdown("---")
@@ -91,32 +226,22 @@ def render_revenue_vault(supabase):
         st.markdown("#### 🔞 Fansly API Sync")
         
         # Check if Fansly token exists
-        try:
-            fansly_conn = supabase.table("api_connections")\
-                .select("api_token")\
-                .eq("user_id", user_email)\
-                .eq("platform", "fansly")\
-                .eq("is_active", True)\
-                .execute()
-            
-            has_fansly_token = fansly_conn.data and len(fansly_conn.data) > 0
-            
-            if has_fansly_token:
-                if st.button("🔄 SYNC FANSLY NOW", use_container_width=True):
-                    with st.spinner("Syncing Fansly revenue..."):
-                        # Import sync function from app
-                        from app import sync_fansly_api
-                        if sync_fansly_api(user_email):
-                            st.success("✅ Fansly revenue synced!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Sync failed. Check API token.")
-            else:
-                st.info("💡 Connect Fansly in API Connections")
-                if st.button("GO TO API CONNECTIONS", use_container_width=True):
-                    st.switch_page("pages/api_connections.py")
-        except:
+        if page is None:
             st.caption("Fansly sync unavailable")
+        elif page["has_fansly_token"]:
+            if st.button("🔄 SYNC FANSLY NOW", use_container_width=True):
+                with st.spinner("Syncing Fansly revenue..."):
+                    # Import sync function from app
+                    from app import sync_fansly_api
+                    if sync_fansly_api(user_email, trigger="revenue"):
+                        st.success("✅ Fansly revenue synced!")
+                        st.rerun()
+                    else:
+                        st.error("❌ Sync failed. Check API token.")
+        else:
+            st.info("💡 Connect Fansly in API Connections")
+            if st.button("GO TO API CONNECTIONS", use_container_width=True):
+                st.switch_page("pages/api_connections.py")
         
         st.markdown("---")
         st.markdown("### 💵 QUICK LOG REVENUE")
@@ -155,23 +280,42 @@ def render_revenue_vault(supabase):
                 st.warning("Amount must be > 0")
     
     # Main Dashboard
+    if page is None:
+        return
+    
+    try:
+        if section == "📊 OVERVIEW":
+            display_revenue_overview(supabase, user_email, page["revenue"], page["assets"])
+        elif section == "🐋 WHALES":
+            whale_watcher(page["revenue"])
+            whale_retention_check(supabase, page["whales"], page["revenue_version"])
+        else:
+            display_vault_scoring(page["scored"], page["snapshot_date"])
+        
+    except Exception as e:
+        st.error(f"ANALYTICS ERROR: {e}")
+        st.info("💡 Make sure you've run the migration: migrations/004_revenue_vault_schema.sql")
+
+def display_revenue_overview(supabase, user_email, df_rev, assets):
+    """
+    Revenue-KPIs, Platform Breakdown, letzte Transaktionen und Vault-Performance.
+    
+    Args:
+        supabase: Supabase Client (Asset hinzufügen)
+        user_email: User Email
+        df_rev: revenue_history-Frame aus load_revenue_vault()
+        assets: vault_assets-Frame aus load_revenue_vault()
+    """
     try:
         # Revenue Metriken
         st.markdown("### 📊 REVENUE OVERVIEW")
         
-        rev_res = supabase.table("revenue_history")\
-            .select("*")\
-            .eq("user_id", user_email)\
-            .execute()
-        
-        if rev_res.data and len(rev_res.data) > 0:
-            df_rev = pd.DataFrame(rev_res.data)
-            
+        if not df_rev.empty:
             # KPIs
             col1, col2, col3, col4 = st.columns(4)
             
             total_net = df_rev['amount_net'].sum()
-            total_gross = df_rev['amount_gross'].sum() if 'amount_gross' in df_rev.columns else 0
+            total_gross = df_rev['amount_gross'].sum()
             total_fees = total_gross - total_net
             transaction_count = len(df_rev)
             
@@ -226,15 +370,9 @@ def render_revenue_vault(supabase):
         st.markdown("---")
         st.markdown("### 🖼️ VAULT PERFORMANCE (TOP ASSETS)")
         
-        vault_res = supabase.table("vault_assets")\
-            .select("*")\
-            .eq("user_id", user_email)\
-            .order("total_revenue", desc=True)\
-            .limit(20)\
-            .execute()
+        df_vault = assets.sort_values('total_revenue', ascending=False).head(TOP_VAULT_ASSETS)
         
-        if vault_res.data and len(vault_res.data) > 0:
-            df_vault = pd.DataFrame(vault_res.data)
+        if not df_vault.empty:
             
             # Top Performers
             col1, col2 = st.columns(2)
@@ -316,41 +454,23 @@ def render_revenue_vault(supabase):
                 else:
                     st.warning("Asset name required")
         
-        # Whale Watcher
-        st.markdown("---")
-        whale_watcher(supabase)
-        
-        # Content Cash-Cow Scoring
-        display_vault_scoring(supabase)
-        
-        # Whale Retention Watch
-        whale_retention_check(supabase)
-        
     except Exception as e:
-        st.error(f"ANALYTICS ERROR: {e}")
-        st.info("💡 Make sure you've run the migration: migrations/004_revenue_vault_schema.sql")
+        st.error(f"Revenue Overview Error: {e}")
 
-def whale_watcher(supabase):
+def whale_watcher(df):
     """
     Zeigt Top Spender basierend auf Revenue History.
     
     Aggregiert Umsatz nach Source-Feld (z.B. PPV, Tips, Subscription).
     Nützlich für schnelle Übersicht ohne dedizierte Customer-Tabelle.
+    
+    Args:
+        df: revenue_history-Frame aus load_revenue_vault()
     """
     st.subheader("🐋 WHALE WATCHER (TOP SPENDER)")
     
-    user_email = st.session_state.get('user_email', 'unknown')
-    
     try:
-        # Aggregiere Umsatz pro Source
-        res = supabase.table("revenue_history")\
-            .select("source, amount_net, platform")\
-            .eq("user_id", user_email)\
-            .execute()
-        
-        if res.data and len(res.data) > 0:
-            df = pd.DataFrame(res.data)
-            
+        if not df.empty:
             # Top Spender nach Source
             top_spenders = df.groupby('source')['amount_net'].sum().sort_values(ascending=False).head(5)
             
@@ -382,86 +502,121 @@ def whale_watcher(supabase):
     except Exception as e:
         st.error(f"Whale Watcher Error: {e}")
 
-def display_vault_scoring(supabase):
+def display_vault_scoring(scored, snapshot_date):
     """
     Content Cash-Cow Scoring System.
     
-    Analysiert Top-Performing-Content und gibt strategische Empfehlungen
-    basierend auf Conversion-Rate und Revenue-Effizienz.
+    Scored alle Assets vektorisiert (Conversion, Engagement, Revenue-Perzentil),
+    zeigt das Ranking seitenweise und gibt strategische Empfehlungen pro Tier.
+    
+    Args:
+        scored: Gescorte Assets inkl. rank_change aus load_revenue_vault()
+        snapshot_date: Datum des Vergleichs-Snapshots oder None
     """
     st.divider()
     st.subheader("🔥 CONTENT CASH-COW SCORING")
     
-    user_email = st.session_state.get('user_email', 'unknown')
-    
     try:
-        # Top-Performing-Content aus View abrufen
-        res = supabase.table("top_performing_content")\
-            .select("*")\
-            .eq("user_id", user_email)\
-            .limit(10)\
-            .execute()
-        
-        if res.data and len(res.data) > 0:
-            st.info("💡 **Scoring-Logik:** Conversion Rate × 10 (max 100). Höherer Score = bessere Performance.")
+        if not scored.empty:
+            st.info("💡 **Scoring-Logik:** 60% Conversion (Rate × 10, max 100) + 25% Engagement + 15% Revenue-Perzentil.")
+            
+            # Tier-Übersicht über alle Assets
+            counts = tier_counts(scored)
+            tier_cols = st.columns(len(TIERS))
+            for i, tier in enumerate(TIERS):
+                tier_cols[i].metric(VAULT_TIER_LABELS[tier], f"{int(counts[tier]):,}")
+            
+            col_filter, col_size = st.columns([3, 1])
+            with col_filter:
+                tier_filter = st.multiselect("Tier", TIERS, default=TIERS, format_func=VAULT_TIER_LABELS.get,
+                                             key="vault_tier_filter")
+            with col_size:
+                page_size = st.selectbox("Assets pro Seite", VAULT_PAGE_SIZES, key="vault_page_size")
+            
+            # Filter-Änderung -> zurück auf Seite 1
+            filter_signature = (tuple(tier_filter), page_size)
+            if st.session_state.get("vault_filter_signature") != filter_signature:
+                st.session_state.vault_filter_signature = filter_signature
+                st.session_state.vault_page = 1
+            
+            filtered = scored[scored['tier'].isin(tier_filter)]
+            total_pages = max(1, -(-len(filtered) // page_size))
+            page = min(st.session_state.get("vault_page", 1), total_pages)
+            page_df = filtered.iloc[(page - 1) * page_size:page * page_size]
+            
+            if snapshot_date:
+                st.caption(f"📊 {len(filtered):,} Assets · Seite {page}/{total_pages} · Δ Rank vs. {snapshot_date}")
+            else:
+                st.caption(f"📊 {len(filtered):,} Assets · Seite {page}/{total_pages}")
             
-            for item in res.data:
-                # Score berechnen (normiert auf 100)
-                conversion_rate = float(item.get('conversion_rate', 0))
-                score = min(int(conversion_rate * 10), 100)
-                
-                # Rank und Asset-Name
-                rank = int(item.get('efficiency_rank', 0))
-                asset_name = item.get('asset_name', 'Unknown')
+            st.dataframe(
+                page_df[['rank', 'rank_change', 'asset_name', 'tier', 'composite_score', 'conversion_rate',
+                         'engagement_score', 'total_revenue', 'ppv_opens', 'likes', 'platform']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "rank": st.column_config.NumberColumn("Rank", format="#%d"),
+                    "rank_change": st.column_config.NumberColumn("Δ Rank", format="%+d"),
+                    "tier": st.column_config.TextColumn("Tier"),
+                    "composite_score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%.1f"),
+                    "conversion_rate": st.column_config.NumberColumn("Efficiency", format="$%.2f/View"),
+                    "engagement_score": st.column_config.NumberColumn("Engagement", format="%.1f"),
+                    "total_revenue": st.column_config.NumberColumn("Revenue", format="$%.2f")
+                }
+            )
+            
+            # Pagination
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("◀ ZURÜCK", disabled=page <= 1, use_container_width=True, key="vault_prev"):
+                    st.session_state.vault_page = page - 1
+                    st.rerun()
+            with col_info:
+                first = (page - 1) * page_size + 1 if len(filtered) else 0
+                last = min(page * page_size, len(filtered))
+                st.markdown(f"<p style='text-align: center;'>{first:,}–{last:,} von {len(filtered):,}</p>", unsafe_allow_html=True)
+            with col_next:
+                if st.button("WEITER ▶", disabled=page >= total_pages, use_container_width=True, key="vault_next"):
+                    st.session_state.vault_page = page + 1
+                    st.rerun()
+            
+            # Strategische Empfehlung für ein Asset der aktuellen Seite
+            if not page_df.empty:
+                st.markdown("**🎯 STRATEGISCHE EMPFEHLUNG:**")
+                asset_labels = {row.id: f"#{row.rank} - {row.asset_name}" for row in page_df.itertuples()}
+                selected = st.selectbox("Asset", list(asset_labels.keys()), format_func=asset_labels.get,
+                                        key=f"vault_asset_select_{page}")
+                tier = page_df.loc[page_df['id'] == selected, 'tier'].iloc[0]
                 
-                with st.expander(f"🏆 RANK #{rank} - {asset_name}"):
-                    col1, col2, col3 = st.columns(3)
-                    
-                    # Metriken
-                    col1.metric("Score", f"{score}/100")
-                    col2.metric("Revenue", f"${float(item.get('total_revenue', 0)):,.2f}")
-                    col3.metric("Efficiency", f"${conversion_rate:.2f}/View")
-                    
-                    # Zusätzliche Metriken
-                    st.markdown("---")
-                    col4, col5, col6 = st.columns(3)
-                    col4.metric("PPV Opens", f"{int(item.get('ppv_opens', 0)):,}")
-                    col5.metric("Likes", f"{int(item.get('likes', 0)):,}")
-                    col6.metric("Platform", item.get('platform', 'unknown').upper())
-                    
-                    # Strategische Empfehlungen
-                    st.markdown("---")
-                    st.markdown("**🎯 STRATEGISCHE EMPFEHLUNG:**")
-                    
-                    if score >= 80:
-                        st.success("""
-                        **CASH-COW DETECTED!** 🐄💰
-                        - Sofort als PPV-Wiederholung promoten
-                        - Cross-Platform auf Fansly/OnlyFans teilen
-                        - Ähnlichen Content produzieren
-                        - In Premium-Bundles packen
-                        """)
-                    elif score >= 50:
-                        st.info("""
-                        **SOLID PERFORMER** ✅
-                        - Für Standard-PPV geeignet
-                        - Gelegentlich re-promoten
-                        - Als Filler-Content nutzen
-                        """)
-                    elif score >= 20:
-                        st.warning("""
-                        **UNDERPERFORMER** ⚠️
-                        - Nur als Free-Teaser nutzen
-                        - Nicht mehr für Paid-Promotion
-                        - Analyse: Warum niedrige Performance?
-                        """)
-                    else:
-                        st.error("""
-                        **CONTENT-BURNOUT** 🗑️
-                        - NICHT mehr für Paid-Promotion nutzen
-                        - Eventuell komplett archivieren
-                        - Learnings für zukünftigen Content
-                        """)
+                if tier == "CASH_COW":
+                    st.success("""
+                    **CASH-COW DETECTED!** 🐄💰
+                    - Sofort als PPV-Wiederholung promoten
+                    - Cross-Platform auf Fansly/OnlyFans teilen
+                    - Ähnlichen Content produzieren
+                    - In Premium-Bundles packen
+                    """)
+                elif tier == "SOLID":
+                    st.info("""
+                    **SOLID PERFORMER** ✅
+                    - Für Standard-PPV geeignet
+                    - Gelegentlich re-promoten
+                    - Als Filler-Content nutzen
+                    """)
+                elif tier == "UNDERPERFORMER":
+                    st.warning("""
+                    **UNDERPERFORMER** ⚠️
+                    - Nur als Free-Teaser nutzen
+                    - Nicht mehr für Paid-Promotion
+                    - Analyse: Warum niedrige Performance?
+                    """)
+                else:
+                    st.error("""
+                    **CONTENT-BURNOUT** 🗑️
+                    - NICHT mehr für Paid-Promotion nutzen
+                    - Eventuell komplett archivieren
+                    - Learnings für zukünftigen Content
+                    """)
             
         else:
             st.info("💡 Noch nicht genügend Daten für das Scoring vorhanden.")
@@ -474,14 +629,70 @@ def display_vault_scoring(supabase):
             
     except Exception as e:
         st.error(f"Content Scoring Error: {e}")
-        st.info("💡 Stelle sicher, dass Migration 007 ausgeführt wurde: `migrations/007_content_scoring.sql`")
+        st.info("💡 Stelle sicher, dass Migration 017 ausgeführt wurde: `migrations/017_vault_rank_snapshots.sql`")
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_clv_scores(_supabase, user_email, data_version):
+    """
+    CLV- und Churn-Scores aller Fans eines Creators (gecacht bis neue Umsätze eingehen).
+    
+    Nutzt die nightly gefitteten Parameter (clv_params); ohne gespeicherte Parameter
+    wird für diesen Creator direkt gefittet.
+    
+    Returns:
+        DataFrame: Ergebnis von modules.clv.score_customers()
+    """
+    rows = fetch_all_rows(_supabase, "customer_activity", ", ".join(ACTIVITY_COLUMNS), user_email,
+                          order_col="platform,customer")
+    customers = prepare_customers(rows)
+    
+    stored = _supabase.table("clv_params")\
+        .select("*")\
+        .eq("user_id", user_email)\
+        .execute()
+    params = params_from_records(stored.data) if stored.data else fit_params(customers)
+    return score_customers(customers, params)
+
+def display_at_risk_fans(supabase, user_email, revenue_version):
+    """Ranking der wertvollsten Fans mit hoher Churn-Wahrscheinlichkeit (BG/NBD + Gamma-Gamma)."""
+    scored = load_clv_scores(supabase, user_email, revenue_version)
+    if scored.empty:
+        return
+    
+    at_risk = at_risk_fans(scored)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("PREDICTED CLV (90D)", f"${scored['clv'].sum():,.2f}")
+    col2.metric("FANS AT RISK", f"{int((scored['churn_prob'] >= AT_RISK_CHURN).sum()):,}")
+    col3.metric("VALUE AT RISK", f"${at_risk['value_at_risk'].sum():,.2f}")
+    
+    if at_risk.empty:
+        st.success("✅ Keine wertvollen Fans mit hohem Churn-Risiko!")
+        return
+    
+    st.markdown("**🚨 At-Risk High-Value Fans:**")
+    df_display = at_risk.copy()
+    df_display['churn_prob'] = df_display['churn_prob'].apply(lambda x: f"{x:.0%}")
+    for col in ['lifetime_spend', 'clv', 'value_at_risk']:
+        df_display[col] = df_display[col].apply(lambda x: f"${x:,.2f}")
+    
+    st.dataframe(
+        df_display[['customer', 'platform', 'lifetime_spend', 'churn_prob', 'clv', 'value_at_risk']],
+        use_container_width=True,
+        hide_index=True
+    )
 
-def whale_retention_check(supabase):
+def whale_retention_check(supabase, df_whales, revenue_version):
     """
     Whale Retention Watch - Überwacht Top-Spender-Aktivität.
     
-    Zeigt die letzten Transaktionen der Top-Spender und warnt bei Inaktivität.
+    Zeigt die Top-Spender mit letzter Aktivität (customer_activity) und warnt bei Inaktivität.
     Hilft bei proaktiver Retention-Strategie.
+    
+    Args:
+        supabase: Supabase Client (CLV-Scores)
+        df_whales: Top-Spender aus load_revenue_vault()
+        revenue_version: Versions-Key von revenue_history
     """
     st.divider()
     st.subheader("🐋 WHALE RETENTION WATCH")
@@ -489,25 +700,18 @@ def whale_retention_check(supabase):
     user_email = st.session_state.get('user_email', 'unknown')
     
     try:
-        # Top Spender nach Gesamtumsatz
-        whales = supabase.table("revenue_history")\
-            .select("source, amount_net, created_at, platform")\
-            .eq("user_id", user_email)\
-            .order("amount_net", desc=True)\
-            .limit(10)\
-            .execute()
-        
-        if whales.data and len(whales.data) > 0:
-            df_whales = pd.DataFrame(whales.data)
+        if not df_whales.empty:
+            df_whales = df_whales.copy()
             
             # Datum formatieren
-            df_whales['created_at'] = pd.to_datetime(df_whales['created_at'])
-            df_whales['days_ago'] = (datetime.now() - df_whales['created_at']).dt.days
+            df_whales['last_seen'] = pd.to_datetime(df_whales['last_seen'], utc=True)
+            df_whales['days_ago'] = (pd.Timestamp.now(tz="UTC") - df_whales['last_seen']).dt.days
             
             # Formatierung für Display
             df_display = df_whales.copy()
-            df_display['created_at'] = df_display['created_at'].dt.strftime('%Y-%m-%d %H:%M')
-            df_display['amount_net'] = df_display['amount_net'].apply(lambda x: f"${x:,.2f}")
+            df_display['last_seen'] = df_display['last_seen'].dt.strftime('%Y-%m-%d %H:%M')
+            for col in ['lifetime_spend', 'spend_30d']:
+                df_display[col] = pd.to_numeric(df_display[col], errors="coerce").fillna(0).apply(lambda x: f"${x:,.2f}")
             
             # Inaktivitäts-Warnung
             inactive_whales = df_whales[df_whales['days_ago'] > 5]
@@ -519,13 +723,16 @@ def whale_retention_check(supabase):
                 st.success("✅ Alle Top-Spender sind aktiv!")
             
             # Tabelle
-            st.markdown("**Top 10 Recent Whale Transactions:**")
+            st.markdown("**Top 10 Whales (Lifetime Spend):**")
             st.dataframe(
-                df_display[['source', 'amount_net', 'platform', 'created_at', 'days_ago']],
+                df_display[['customer', 'platform', 'lifetime_spend', 'purchase_count', 'spend_30d', 'last_seen', 'days_ago']],
                 use_container_width=True,
                 hide_index=True
             )
             
+            # Churn-Prognose & At-Risk-Ranking
+            display_at_risk_fans(supabase, user_email, revenue_version)
+            
             # Retention-Tipps
             with st.expander("📚 RETENTION-STRATEGIEN"):
                 st.markdown("""
@@ -555,3 +762,4 @@ def whale_retention_check(supabase):
             
     except Exception as e:
         st.error(f"Whale Retention Error: {e}")
+        st.info("💡 Stelle sicher, dass Migration 013 ausgeführt wurde: `migrations/013_customer_activity.sql`")
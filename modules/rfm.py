@@ -0,0 +1,163 @@
+"""
+RFM SEGMENTATION ENGINE
+Recency/Frequency/Monetary-Scores und Kunden-Tiers für alle Fans in einem vektorisierten Durchlauf
+"""
+
+import pandas as pd
+import numpy as np
+
+CUSTOMER_COLUMNS = ["user_id", "customer_username", "total_spent", "purchase_count", "last_purchase_date"]
+SCORE_COLUMNS = ["r_score", "f_score", "m_score", "rfm_segment"]
+METRICS = ["recency", "frequency", "monetary"]
+
+# Quintil-Grenzen -> Scores 1..5
+QUANTILES = (0.2, 0.4, 0.6, 0.8)
+
+# Tier-Grenzen (identisch mit der Generated Column of_customers.customer_tier, Migration 015)
+TIER_THRESHOLDS = [("WHALE", 1000), ("DOLPHIN", 500), ("FISH", 100)]
+DEFAULT_TIER = "MINNOW"
+TIERS = [tier for tier, _ in TIER_THRESHOLDS] + [DEFAULT_TIER]
+
+SEGMENTS = ["CHAMPIONS", "AT_RISK", "LOYAL", "NEW", "HIBERNATING", "NEEDS_ATTENTION"]
+
+# Fans ohne Kaufdatum gelten als maximal inaktiv
+NEVER_PURCHASED_DAYS = 9999
+
+def prepare_customers(rows, now=None):
+    """
+    Baut den Eingabe-Frame aus of_customers-Zeilen (ein oder viele Creator).
+
+    Returns:
+        DataFrame mit CUSTOMER_COLUMNS + recency, frequency, monetary
+    """
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    customers = pd.DataFrame(rows or [], columns=CUSTOMER_COLUMNS)
+
+    last_purchase = pd.to_datetime(customers["last_purchase_date"], utc=True, errors="coerce")
+    customers["recency"] = ((now - last_purchase).dt.total_seconds() / 86400).fillna(NEVER_PURCHASED_DAYS).clip(lower=0)
+    customers["frequency"] = pd.to_numeric(customers["purchase_count"], errors="coerce").fillna(0)
+    customers["monetary"] = pd.to_numeric(customers["total_spent"], errors="coerce").fillna(0.0)
+    return customers
+
+def compute_breakpoints(customers):
+    """
+    Quintil-Grenzen pro Creator.
+
+    Returns:
+        DataFrame: Index user_id, Spalten (metric, quantile)
+    """
+    if customers.empty:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([METRICS, QUANTILES]))
+    return customers.groupby("user_id")[METRICS].quantile(list(QUANTILES)).unstack()
+
+def assign_tiers(monetary):
+    """Tier aus dem Lifetime-Spend (gleiche Grenzen wie die Datenbank)."""
+    values = np.asarray(monetary, dtype=float)
+    return np.select([values >= limit for _, limit in TIER_THRESHOLDS], [tier for tier, _ in TIER_THRESHOLDS],
+                     default=DEFAULT_TIER)
+
+def assign_segments(r_score, f_score, m_score):
+    """RFM-Segment aus den drei Scores."""
+    r = np.asarray(r_score)
+    fm = (np.asarray(f_score) + np.asarray(m_score)) / 2
+    conditions = [
+        (r >= 4) & (fm >= 4),
+        (r <= 2) & (fm >= 4),
+        (r >= 3) & (fm >= 3),
+        r >= 4,
+        (r <= 2) & (fm <= 2)
+    ]
+    return np.select(conditions, SEGMENTS[:-1], default=SEGMENTS[-1])
+
+def score_customers(customers, breakpoints):
+    """
+    Scored alle Fans gegen die Grenzen ihres Creators (ein Broadcast-Vergleich pro Metrik).
+
+    Args:
+        customers: Ergebnis von prepare_customers()
+        breakpoints: Ergebnis von compute_breakpoints() (gespeichert oder frisch)
+
+    Returns:
+        DataFrame: user_id, customer_username, r_score, f_score, m_score, rfm_segment, customer_tier
+               (Fans ohne Grenzen ihres Creators werden ausgelassen)
+    """
+    columns = ["user_id", "customer_username"] + SCORE_COLUMNS + ["customer_tier"]
+    known = customers["user_id"].isin(breakpoints.index).to_numpy()
+    customers = customers[known]
+    if customers.empty:
+        return pd.DataFrame(columns=columns)
+
+    edges = breakpoints.reindex(customers["user_id"])
+    scores = {}
+    for metric in METRICS:
+        above = (customers[metric].to_numpy(dtype=float)[:, None] > edges[metric].to_numpy(dtype=float)).sum(axis=1)
+        # Kleine Recency (kürzlich gekauft) = hoher Score
+        scores[metric] = 5 - above if metric == "recency" else 1 + above
+
+    result = customers[["user_id", "customer_username"]].reset_index(drop=True)
+    result["r_score"] = scores["recency"]
+    result["f_score"] = scores["frequency"]
+    result["m_score"] = scores["monetary"]
+    result["rfm_segment"] = assign_segments(scores["recency"], scores["frequency"], scores["monetary"])
+    result["customer_tier"] = assign_tiers(customers["monetary"])
+    return result[columns]
+
+def changed_scores(scored, current_rows):
+    """
+    Nur Fans, deren Scores sich gegenüber den gespeicherten Werten geändert haben.
+
+    Args:
+        scored: Ergebnis von score_customers()
+        current_rows: of_customers-Zeilen mit user_id, customer_username + SCORE_COLUMNS
+
+    Returns:
+        DataFrame: Teilmenge von scored
+    """
+    key = ["user_id", "customer_username"]
+    current = pd.DataFrame(current_rows or [], columns=key + SCORE_COLUMNS)
+    merged = scored.merge(current, on=key, how="left", suffixes=("", "_old"))
+
+    changed = np.zeros(len(merged), dtype=bool)
+    for col in SCORE_COLUMNS:
+        old = merged[f"{col}_old"]
+        if col != "rfm_segment":
+            old = pd.to_numeric(old, errors="coerce")
+        changed |= (merged[col] != old).to_numpy() | old.isna().to_numpy()
+    return scored[changed]
+
+def tier_counts(scored):
+    """Exakte Tier-Verteilung aus gescorten Fans (Fallback ohne Summary-Tabelle)."""
+    return scored["customer_tier"].value_counts().reindex(TIERS, fill_value=0)
+
+def breakpoints_to_records(breakpoints, customers):
+    """Upsert-Payload für rfm_breakpoints."""
+    counts = customers.groupby("user_id").size()
+    return [
+        {
+            "user_id": user_id,
+            "recency": [float(v) for v in row["recency"]],
+            "frequency": [float(v) for v in row["frequency"]],
+            "monetary": [float(v) for v in row["monetary"]],
+            "customer_count": int(counts.get(user_id, 0))
+        }
+        for user_id, row in breakpoints.iterrows()
+    ]
+
+def breakpoints_from_records(records):
+    """Baut den Breakpoint-Frame aus gespeicherten rfm_breakpoints-Zeilen."""
+    if not records:
+        return compute_breakpoints(pd.DataFrame(columns=["user_id"] + METRICS))
+    data = {
+        (metric, q): [record[metric][i] for record in records]
+        for metric in METRICS for i, q in enumerate(QUANTILES)
+    }
+    return pd.DataFrame(data, index=pd.Index([record["user_id"] for record in records], name="user_id"))
+
+def to_records(scored, now=None):
+    """Upsert-Payload für of_customers (nur Score-Spalten; customer_tier ist generiert)."""
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    records = scored[["user_id", "customer_username"] + SCORE_COLUMNS].copy()
+    for col in ["r_score", "f_score", "m_score"]:
+        records[col] = records[col].astype(int)
+    records["rfm_updated_at"] = now.isoformat()
+    return records.to_dict("records")
@@ -0,0 +1,64 @@
+"""
+STATS ROLLUPS
+Lesezugriff auf die stündlichen, täglichen und wöchentlichen Buckets von stats_history (Migration 018)
+"""
+
+import pandas as pd
+from modules.data_loader import fetch_all_rows
+
+# Granularität -> Bucket-Länge (fein -> grob)
+GRANULARITIES = {
+    "hour": pd.Timedelta(hours=1),
+    "day": pd.Timedelta(days=1),
+    "week": pd.Timedelta(days=7)
+}
+
+# Max. Buckets pro Serie im sichtbaren Zeitraum; Stunden werden damit nur bis ~16 Tage gewählt,
+# Stunden-Buckets bleiben per prune_stats_rollups() für das Roh-Fenster (STATS_RAW_DAYS = 30) erhalten
+MAX_BUCKETS = 400
+
+METRICS = ["followers", "likes", "views"]
+ROLLUP_COLUMNS = ["platform", "handle", "bucket", "samples", "last_at"] + [
+    f"{metric}_{stat}" for metric in METRICS for stat in ["open", "min", "max", "last", "delta"]
+]
+
+def choose_granularity(days, max_buckets=MAX_BUCKETS):
+    """
+    Feinste Granularität, bei der der Zeitraum in max_buckets Buckets pro Serie passt.
+
+    Args:
+        days: Sichtbarer Zeitraum in Tagen (None = gesamte Historie)
+    """
+    if days is None:
+        return list(GRANULARITIES)[-1]
+    for granularity, length in GRANULARITIES.items():
+        if pd.Timedelta(days=days) / length <= max_buckets:
+            return granularity
+    return list(GRANULARITIES)[-1]
+
+def fetch_rollups(supabase, user_id, granularity, since=None):
+    """
+    Lädt die Buckets einer Granularität (Range-Scan über idx_stats_rollups_range).
+
+    Args:
+        supabase: Supabase Client
+        user_id: User Email
+        granularity: hour, day oder week
+        since: Optional nur Buckets ab diesem Zeitpunkt (ISO-String)
+
+    Returns:
+        DataFrame: ROLLUP_COLUMNS, bucket/last_at als UTC-Timestamps
+    """
+    rows = fetch_all_rows(supabase, "stats_rollups", ", ".join(ROLLUP_COLUMNS), user_id,
+                          filters={"granularity": granularity}, order_col="platform,handle,bucket",
+                          since=since, since_col="bucket")
+    return prepare_rollups(rows)
+
+def prepare_rollups(rows):
+    """Baut den Rollup-Frame mit festen Spalten/Typen."""
+    rollups = pd.DataFrame(rows or [], columns=ROLLUP_COLUMNS)
+    for col in ["bucket", "last_at"]:
+        rollups[col] = pd.to_datetime(rollups[col], utc=True)
+    for col in ["samples"] + ROLLUP_COLUMNS[5:]:
+        rollups[col] = pd.to_numeric(rollups[col], errors="coerce")
+    return rollups
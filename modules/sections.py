@@ -0,0 +1,46 @@
+"""
+SECTION ROUTER
+Lazy Sections für mehrteilige Seiten: nur die sichtbare Section lädt Daten und rendert
+"""
+
+import streamlit as st
+
+def select_section(key, labels, label="SECTION"):
+    """
+    Horizontaler Umschalter für die aktive Section einer Seite.
+
+    Im Gegensatz zu st.tabs (alle Tab-Bodies laufen bei jedem Rerun) wird nur
+    die ausgewählte Section ausgeführt. Die Auswahl bleibt über Reruns in
+    st.session_state["<key>_section"] erhalten.
+
+    Args:
+        key: Eindeutiger Seiten-Key, z.B. "revenue_vault"
+        labels: Section-Namen in Anzeige-Reihenfolge
+        label: Widget-Label (ausgeblendet)
+
+    Returns:
+        str: Ausgewähltes Label
+    """
+    return st.radio(
+        label,
+        labels,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=f"{key}_section"
+    )
+
+def render_sections(key, sections, label="SECTION"):
+    """
+    Rendert nur die ausgewählte Section.
+
+    Args:
+        key: Eindeutiger Seiten-Key
+        sections: {label: Render-Funktion ohne Argumente} in Anzeige-Reihenfolge
+        label: Widget-Label (ausgeblendet)
+
+    Returns:
+        str: Ausgewähltes Label
+    """
+    selected = select_section(key, list(sections.keys()), label)
+    sections[selected]()
+    return selected
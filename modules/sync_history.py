@@ -0,0 +1,149 @@
+"""
+SYNC HISTORY
+Paginierte Anzeige von sync_runs inkl. Upstream-Health pro Plattform
+"""
+
+import streamlit as st
+import pandas as pd
+
+SYNC_HISTORY_PAGE_SIZES = [10, 25, 50, 100]
+SYNC_HISTORY_COLUMNS = "id, platform, handle, trigger, status, started_at, duration_ms, upstream_ms, http_status, rows_written, error_class"
+
+def fetch_sync_runs_page(supabase, user_email, platforms=None, status=None, page=1, page_size=25):
+    """
+    Lädt eine Seite der Sync-History (neueste zuerst).
+
+    Args:
+        platforms: Liste erlaubter Plattformen (None = alle)
+        status: "success" / "failed" (None = alle)
+        page: Seitennummer (1-basiert)
+        page_size: Einträge pro Seite
+
+    Returns:
+        tuple: (rows, total_count)
+    """
+    query = supabase.table("sync_runs")\
+        .select(SYNC_HISTORY_COLUMNS, count="exact")\
+        .eq("user_id", user_email)
+
+    if platforms:
+        query = query.in_("platform", platforms)
+    if status:
+        query = query.eq("status", status)
+
+    start = (page - 1) * page_size
+    res = query.order("started_at", desc=True)\
+        .order("id", desc=True)\
+        .range(start, start + page_size - 1)\
+        .execute()
+
+    return (res.data or [], res.count or 0)
+
+def load_upstream_health(supabase, user_email, platforms=None, days=14):
+    """Tageswerte aus sync_upstream_health (Migration 021) für die letzten days Tage."""
+    query = supabase.table("sync_upstream_health")\
+        .select("platform, day, runs, failures, avg_upstream_ms, p95_upstream_ms")\
+        .eq("user_id", user_email)\
+        .gte("day", (pd.Timestamp.now(tz="UTC").normalize() - pd.Timedelta(days=days)).isoformat())
+
+    if platforms:
+        query = query.in_("platform", platforms)
+    return pd.DataFrame(query.order("day").execute().data or [])
+
+def render_upstream_health(health):
+    """Fehlerquote und Latenz pro Plattform über den geladenen Zeitraum."""
+    if health.empty:
+        return
+    summary = health.groupby("platform").agg(
+        runs=("runs", "sum"),
+        failures=("failures", "sum"),
+        avg_upstream_ms=("avg_upstream_ms", "mean"),
+        p95_upstream_ms=("p95_upstream_ms", "max")
+    ).reset_index()
+    summary["failure_rate"] = summary["failures"] / summary["runs"]
+
+    st.dataframe(
+        summary,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "failure_rate": st.column_config.ProgressColumn("Fehlerquote", format="percent", min_value=0, max_value=1),
+            "avg_upstream_ms": st.column_config.NumberColumn("Ø Upstream ms", format="%d"),
+            "p95_upstream_ms": st.column_config.NumberColumn("p95 Upstream ms (max/Tag)", format="%d")
+        }
+    )
+
+def render_sync_history(supabase, user_email, platforms=None, key="sync_history"):
+    """
+    Paginierte Sync-History inkl. Upstream-Health.
+
+    Args:
+        platforms: Feste Plattform-Auswahl (None = Filter für alle Plattformen anzeigen)
+        key: Präfix für Widget- & Session-Keys (mehrere Instanzen pro Seite)
+    """
+    st.markdown("### 📜 SYNC HISTORY")
+
+    try:
+        col_platform, col_status, col_size = st.columns([2, 1, 1])
+        with col_platform:
+            if platforms is None:
+                selected = st.multiselect("Plattform", ["instagram", "tiktok", "onlyfans", "fansly", "youtube"],
+                                          default=[], key=f"{key}_platforms", help="Leer = alle Plattformen")
+            else:
+                selected = platforms
+        with col_status:
+            status = st.selectbox("Status", ["alle", "success", "failed"], key=f"{key}_status")
+        with col_size:
+            page_size = st.selectbox("Einträge pro Seite", SYNC_HISTORY_PAGE_SIZES, key=f"{key}_page_size")
+
+        # Filter-Änderung -> zurück auf Seite 1
+        filter_signature = (tuple(selected), status, page_size)
+        if st.session_state.get(f"{key}_signature") != filter_signature:
+            st.session_state[f"{key}_signature"] = filter_signature
+            st.session_state[f"{key}_page"] = 1
+        page = st.session_state.get(f"{key}_page", 1)
+
+        status_filter = None if status == "alle" else status
+        rows, total_count = fetch_sync_runs_page(supabase, user_email, selected or None, status_filter, page, page_size)
+        total_pages = max(1, -(-total_count // page_size))
+        if page > total_pages:
+            page = total_pages
+            st.session_state[f"{key}_page"] = page
+            rows, total_count = fetch_sync_runs_page(supabase, user_email, selected or None, status_filter, page, page_size)
+
+        if not rows:
+            st.info("Noch keine Syncs durchgeführt")
+            return
+
+        render_upstream_health(load_upstream_health(supabase, user_email, selected or None))
+
+        df_sync = pd.DataFrame(rows)
+        df_sync["started_at"] = pd.to_datetime(df_sync["started_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+        st.dataframe(
+            df_sync.drop(columns="id"),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "duration_ms": st.column_config.NumberColumn("Dauer ms", format="%d"),
+                "upstream_ms": st.column_config.NumberColumn("Upstream ms", format="%d"),
+                "rows_written": st.column_config.NumberColumn("Zeilen", format="%d")
+            }
+        )
+
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ ZURÜCK", disabled=page <= 1, use_container_width=True, key=f"{key}_prev"):
+                st.session_state[f"{key}_page"] = page - 1
+                st.rerun()
+        with col_info:
+            first = (page - 1) * page_size + 1
+            last = min(page * page_size, total_count)
+            st.markdown(f"<p style='text-align: center;'>{first:,}–{last:,} von {total_count:,}</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("WEITER ▶", disabled=page >= total_pages, use_container_width=True, key=f"{key}_next"):
+                st.session_state[f"{key}_page"] = page + 1
+                st.rerun()
+
+    except Exception as e:
+        st.error(f"Sync History Error: {e}")
+        st.info("💡 Stelle sicher, dass Migration 021 ausgeführt wurde.")
@@ -0,0 +1,205 @@
+"""
+SYNC LOG
+Einheitliches Log aller Plattform-Syncs (sync_runs), gebündelt und asynchron geschrieben
+
+Ohne Streamlit-Abhängigkeit (läuft auch in den Nightly-Scripts); die Anzeige liegt in modules/sync_history.py.
+"""
+
+import time
+import queue
+import atexit
+import functools
+import threading
+from datetime import datetime, timezone
+from modules import metrics
+
+# Writer: Batch-Größe, maximale Wartezeit bis zum Flush und Queue-Limit (danach wird verworfen)
+BATCH_SIZE = 50
+FLUSH_SECONDS = 2.0
+MAX_QUEUE = 5000
+CLOSE_TIMEOUT = 10
+
+MAX_ERROR_CHARS = 500
+
+_writer = None
+_writer_lock = threading.Lock()
+# Laufender Sync des aktuellen Threads (Streamlit: ein Script-Thread pro Session)
+_local = threading.local()
+
+class SyncLogWriter:
+    """Sammelt sync_runs-Einträge in einer Queue und schreibt sie gebündelt aus einem Daemon-Thread."""
+
+    def __init__(self, client, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue(maxsize=MAX_QUEUE)
+        self.thread = threading.Thread(target=self._loop, name="sync-log-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        """Nicht blockierend; bei voller Queue wird der Eintrag verworfen."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            print("Sync Log: Queue voll, Eintrag verworfen")
+            metrics.PIPELINE_ERRORS.inc(pipeline="sync_log")
+
+    def _loop(self):
+        while True:
+            batch = []
+            item = self.queue.get()
+            deadline = time.monotonic() + self.flush_seconds
+            # Bis Batch voll oder Zeit abgelaufen (None = Writer wird geschlossen)
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            if item is None:
+                return
+
+    def _write(self, batch):
+        try:
+            self.client.table("sync_runs").insert(batch).execute()
+        except Exception as e:
+            # Log darf keinen Sync beeinflussen
+            print(f"Sync Log Error ({len(batch)} Einträge): {e}")
+            metrics.PIPELINE_ERRORS.inc(pipeline="sync_log")
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Schreibt offene Einträge und beendet den Thread (Script-Ende)."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+def configure(client):
+    """
+    Startet den Writer einmal pro Prozess.
+
+    Args:
+        client: Supabase Client ohne Session-Bezug (der Writer läuft in einem eigenen Thread)
+
+    Returns:
+        SyncLogWriter
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SyncLogWriter(client)
+            atexit.register(_writer.close)
+        return _writer
+
+def flush():
+    """Offene Einträge schreiben und Writer beenden (am Ende von Scripts aufrufen)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer:
+        writer.close()
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def _session_user():
+    """Eingeloggter User der Streamlit-Session (Import erst hier, Scripts übergeben user_id)."""
+    import streamlit as st
+    return st.session_state.get("user_email", "unknown")
+
+def start_run(platform, handle=None, trigger="manual", user_id=None):
+    """Neuer Sync-Eintrag (noch nicht geschrieben; ohne user_id = User der Streamlit-Session)."""
+    return {
+        "user_id": user_id or _session_user(),
+        "platform": platform,
+        "handle": handle,
+        "trigger": trigger,
+        "status": "failed",
+        "started_at": _now(),
+        "upstream_ms": None,
+        "http_status": None,
+        "rows_written": 0,
+        "error_class": None,
+        "error_message": None
+    }
+
+def finish_run(run, success):
+    """Schließt den Eintrag ab und übergibt ihn dem Writer."""
+    finished_at = _now()
+    run["status"] = "success" if success else "failed"
+    if not success and not run["error_class"]:
+        run["error_class"] = "UpstreamRejected" if (run["http_status"] or 0) >= 400 else "SyncFailed"
+    record = dict(
+        run,
+        started_at=run["started_at"].isoformat(),
+        finished_at=finished_at.isoformat(),
+        duration_ms=int((finished_at - run["started_at"]).total_seconds() * 1000)
+    )
+    if _writer is None:
+        print(f"Sync Log: Writer nicht konfiguriert, {run['platform']}-Sync nicht geloggt")
+        return record
+    _writer.submit(record)
+    return record
+
+def current_run():
+    """Sync des aktuellen Threads (None außerhalb von logged_sync)."""
+    return getattr(_local, "run", None)
+
+def annotate(**fields):
+    """Setzt Felder des laufenden Syncs (z.B. handle, user_id)."""
+    run = current_run()
+    if run is not None:
+        run.update(fields)
+
+def record_upstream(upstream_ms, http_status=None):
+    """Latenz und Status des Upstream-Calls."""
+    annotate(upstream_ms=int(upstream_ms), http_status=http_status)
+
+def record_response(response):
+    """Latenz (bis zu den Response-Headern) und Status einer requests-Antwort."""
+    record_upstream(response.elapsed.total_seconds() * 1000, response.status_code)
+
+def record_rows(count):
+    """Geschriebene Zeilen aufaddieren."""
+    run = current_run()
+    if run is not None:
+        run["rows_written"] += count
+
+def record_error(error):
+    """Fehlerklasse und (gekürzte) Meldung einer abgefangenen Exception."""
+    annotate(error_class=type(error).__name__, error_message=str(error)[:MAX_ERROR_CHARS])
+
+def logged_sync(platform=None, handle_arg=None):
+    """
+    Decorator: loggt jeden Aufruf als sync_runs-Eintrag; status = success bei truthy Rückgabewert.
+
+    Die dekorierte Funktion bekommt zusätzlich die Keyword-Argumente trigger
+    (Quelle des Syncs, default "manual") und user_id (default: User der
+    Streamlit-Session), die nicht durchgereicht werden.
+
+    Args:
+        platform: Fester Plattform-Name (None = erstes Argument der Funktion)
+        handle_arg: Index des Arguments mit Handle/URL (None = per annotate() setzen)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, trigger="manual", user_id=None, **kwargs):
+            handle = args[handle_arg] if handle_arg is not None and len(args) > handle_arg else None
+            run = start_run(platform or args[0], handle, trigger, user_id)
+            _local.run = run
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception as e:
+                record_error(e)
+                raise
+            finally:
+                _local.run = None
+                finish_run(run, bool(result))
+        return wrapper
+    return decorator
@@ -0,0 +1,329 @@
+"""
+SYNTHETIC DATA GENERATOR
+Realistische Creator-Datensätze (Follower-Kurven, Whale-Spending, Vault, Deals, Content-Plan) für Benchmarks
+"""
+
+import os
+import sqlite3
+import pandas as pd
+import numpy as np
+
+# Skalierung -> (Creator, Zeilen gesamt über alle Tabellen)
+SCALES = {
+    "10k": (20, 10_000),
+    "100k": (100, 100_000),
+    "1m": (500, 1_000_000),
+    "10m": (2_000, 10_000_000)
+}
+
+# Anteil der Zeilen pro Tabelle (Summe = 1)
+TABLE_SHARES = {
+    "stats_history": 0.50,
+    "revenue_history": 0.40,
+    "vault_assets": 0.05,
+    "content_plan": 0.03,
+    "deals": 0.02
+}
+
+# Follower-Dynamik pro Plattform (Startgröße, Drift/Tag, Volatilität, Viral-Wahrscheinlichkeit pro Snapshot)
+PLATFORM_PROFILES = {
+    "instagram": {"base": 25_000, "drift": 0.0012, "volatility": 0.004, "viral": 0.002, "likes": 35, "views": 0},
+    "tiktok": {"base": 40_000, "drift": 0.0020, "volatility": 0.010, "viral": 0.006, "likes": 60, "views": 900},
+    "youtube": {"base": 12_000, "drift": 0.0008, "volatility": 0.003, "viral": 0.001, "likes": 20, "views": 400},
+    "fansly": {"base": 3_000, "drift": 0.0015, "volatility": 0.005, "viral": 0.001, "likes": 8, "views": 0}
+}
+
+# Fan-Spending: Pareto-Exponent (1.16 ~ 80/20-Regel) und Transaktionsmix
+PARETO_ALPHA = 1.16
+TRANSACTIONS_PER_FAN = 12
+TRANSACTION_TYPES = {"subscription": 0.45, "ppv": 0.30, "tips": 0.20, "message": 0.05}
+SUBSCRIPTION_PRICES = [4.99, 9.99, 14.99, 19.99]
+REVENUE_PLATFORMS = {"onlyfans": 0.75, "fansly": 0.25}
+FEE_PERCENTAGE = 20.0
+
+MEDIA_TYPES = {"image": 0.60, "video": 0.35, "audio": 0.05}
+DEAL_STATUSES = {"Negotiating": 0.35, "Active": 0.40, "Closed": 0.25}
+BRANDS = ["Gymshark", "HelloFresh", "NordVPN", "Manscaped", "Ridge", "Raycon", "Skillshare", "Audible", "Squarespace", "Athletic Greens"]
+PLAN_PLATFORMS = ["Instagram", "TikTok", "YouTube", "LinkedIn"]
+PLAN_TYPES = ["Reel", "Post", "Story", "Video", "Carousel"]
+
+# Creator pro Chunk (begrenzt den Speicher bei 10M Zeilen)
+CREATORS_PER_CHUNK = 50
+
+def scale_plan(scale):
+    """
+    Zeilen pro Tabelle und Creator für eine Skalierung.
+
+    Args:
+        scale: Schlüssel aus SCALES (z.B. "1m") oder Zeilenanzahl als int
+
+    Returns:
+        tuple: (Anzahl Creator, {Tabelle: Zeilen pro Creator})
+    """
+    if scale in SCALES:
+        creators, total = SCALES[scale]
+    else:
+        total = int(scale)
+        creators = max(1, min(5_000, total // 5_000))
+    per_creator = {table: max(1, int(total * share / creators)) for table, share in TABLE_SHARES.items()}
+    return creators, per_creator
+
+def _weighted_choice(rng, options, size):
+    """Zufallsauswahl aus {Wert: Wahrscheinlichkeit}."""
+    return rng.choice(list(options), size=size, p=list(options.values()))
+
+def _timestamps(rng, n, start, end):
+    """n sortierte, zufällige UTC-Zeitpunkte zwischen start und end."""
+    values = np.sort(rng.integers(start.value, end.value, size=n))
+    return pd.to_datetime(values, utc=True)
+
+def follower_curves(rng, user_id, n_rows, start, end):
+    """
+    Multi-Plattform Follower-Kurven: geometrischer Random Walk mit Drift und Viral-Sprüngen.
+
+    Args:
+        rng: numpy Generator
+        user_id: Creator Email
+        n_rows: Anzahl Snapshots (über alle Plattformen)
+        start, end: Zeitraum (UTC-Timestamps)
+
+    Returns:
+        DataFrame: stats_history-Zeilen
+    """
+    n_platforms = int(rng.integers(2, len(PLATFORM_PROFILES) + 1))
+    platforms = rng.choice(list(PLATFORM_PROFILES), size=n_platforms, replace=False)
+    slug = user_id.split("@")[0]
+    frames = []
+
+    for platform, n in zip(platforms, np.array_split(np.arange(n_rows), n_platforms)):
+        n = len(n)
+        if n == 0:
+            continue
+        profile = PLATFORM_PROFILES[platform]
+        created_at = _timestamps(rng, n, start, end)
+        days = np.diff(created_at.asi8, prepend=created_at.asi8[0]) / 86_400e9
+
+        steps = profile["drift"] * days + profile["volatility"] * np.sqrt(days) * rng.standard_normal(n)
+        jumps = np.where(rng.random(n) < profile["viral"], rng.exponential(0.08, n), 0.0)
+        base = profile["base"] * rng.lognormal(0.0, 1.0)
+        followers = np.round(base * np.exp(np.cumsum(steps + jumps))).astype(np.int64)
+        # Likes/Views wachsen kumulativ mit der Reichweite
+        engagement = np.linspace(1.0, 1.0 + rng.uniform(0.2, 0.8), n)
+
+        frames.append(pd.DataFrame({
+            "user_id": user_id,
+            "platform": platform,
+            "handle": f"{slug}_{platform}",
+            "followers": followers,
+            "total_likes": np.round(followers * profile["likes"] * engagement).astype(np.int64),
+            "video_views": np.round(followers * profile["views"] * engagement).astype(np.int64),
+            "net_growth": pd.Series(followers).diff().astype("Int64"),
+            "created_at": created_at
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+def fan_transactions(rng, user_id, n_rows, start, end):
+    """
+    Fan-Umsätze mit Heavy-Tail: wenige Whales tragen den Großteil des Umsatzes.
+
+    Fans werden Pareto-gewichtet gezogen (Whales kaufen öfter) und zahlen zusätzlich
+    höhere Beträge; source = Fan (wie customer_activity, Migration 013).
+
+    Returns:
+        DataFrame: revenue_history-Zeilen
+    """
+    n_fans = max(5, n_rows // TRANSACTIONS_PER_FAN)
+    weights = rng.pareto(PARETO_ALPHA, n_fans) + 1.0
+    fans = rng.choice(n_fans, size=n_rows, p=weights / weights.sum())
+
+    types = _weighted_choice(rng, TRANSACTION_TYPES, n_rows)
+    price = rng.choice(SUBSCRIPTION_PRICES)
+    spend = rng.lognormal(2.3, 0.9, n_rows) * weights[fans] ** 0.3
+    amount_net = np.round(np.where(types == "subscription", price, spend), 2)
+
+    return pd.DataFrame({
+        "user_id": user_id,
+        "platform": _weighted_choice(rng, REVENUE_PLATFORMS, n_rows),
+        "amount_gross": np.round(amount_net / (1 - FEE_PERCENTAGE / 100), 2),
+        "amount_net": amount_net,
+        "fee_percentage": FEE_PERCENTAGE,
+        "source": [f"fan_{fan:06d}" for fan in fans],
+        "description": types,
+        "currency": "USD",
+        "created_at": _timestamps(rng, n_rows, start, end)
+    })
+
+def vault_assets(rng, user_id, n_rows, start, end):
+    """PPV-Vault: Opens und Umsatz pro Asset stark schief verteilt."""
+    media = _weighted_choice(rng, MEDIA_TYPES, n_rows)
+    opens = rng.poisson(rng.lognormal(3.0, 1.2, n_rows))
+    price = np.round(rng.lognormal(2.3, 0.5, n_rows), 2)
+    likes = rng.poisson(opens * rng.uniform(1.0, 4.0, n_rows))
+    created_at = _timestamps(rng, n_rows, start, end)
+
+    return pd.DataFrame({
+        "user_id": user_id,
+        "asset_name": [f"{kind}_{i:05d}" for i, kind in enumerate(media)],
+        "media_type": media,
+        "file_size_mb": np.round(np.where(media == "video", rng.lognormal(4.0, 1.0, n_rows), rng.lognormal(1.0, 0.5, n_rows)), 2),
+        "total_revenue": np.round(opens * price, 2),
+        "ppv_opens": opens,
+        "likes": likes,
+        "comments": rng.poisson(likes * 0.05),
+        "platform": _weighted_choice(rng, REVENUE_PLATFORMS, n_rows),
+        "is_premium": price > 15,
+        "created_at": created_at,
+        "updated_at": created_at
+    })
+
+def brand_deals(rng, user_id, n_rows, start, end):
+    """Brand-Deals im CRM-Format (value als Anzeige-Text, amount numerisch)."""
+    amount = np.round(rng.lognormal(7.0, 1.0, n_rows), 2)
+    created_at = _timestamps(rng, n_rows, start, end)
+    deadline = created_at + pd.to_timedelta(rng.integers(7, 90, n_rows), unit="D")
+
+    return pd.DataFrame({
+        "user_id": user_id,
+        "brand": [f"{BRANDS[i % len(BRANDS)]} #{i // len(BRANDS) + 1}" for i in rng.permutation(n_rows)],
+        "status": _weighted_choice(rng, DEAL_STATUSES, n_rows),
+        "value": [f"${value:.2f}" for value in amount],
+        "amount": amount,
+        "currency": "USD",
+        "deadline": deadline.strftime("%Y-%m-%d"),
+        "created_at": created_at
+    })
+
+def content_posts(rng, n_rows, start, end):
+    """Geplante Posts (content_plan hat keine user_id-Spalte)."""
+    publish = _timestamps(rng, n_rows, start, end + pd.Timedelta(days=30))
+    types = rng.choice(PLAN_TYPES, size=n_rows)
+
+    return pd.DataFrame({
+        "publish_date": publish.strftime("%Y-%m-%d"),
+        "platform": rng.choice(PLAN_PLATFORMS, size=n_rows),
+        "c_type": types,
+        "title": [f"{kind} Idee {i + 1}" for i, kind in enumerate(types)],
+        "caption": None,
+        "asset_url": None
+    })
+
+def generate_creator(rng, user_id, rows, start, end):
+    """
+    Alle Tabellen für einen Creator.
+
+    Args:
+        rng: numpy Generator
+        user_id: Creator Email
+        rows: {Tabelle: Zeilen} (siehe scale_plan)
+        start, end: Zeitraum (UTC-Timestamps)
+
+    Returns:
+        dict: {Tabelle: DataFrame}
+    """
+    return {
+        "stats_history": follower_curves(rng, user_id, rows["stats_history"], start, end),
+        "revenue_history": fan_transactions(rng, user_id, rows["revenue_history"], start, end),
+        "vault_assets": vault_assets(rng, user_id, rows["vault_assets"], start, end),
+        "deals": brand_deals(rng, user_id, rows["deals"], start, end),
+        "content_plan": content_posts(rng, rows["content_plan"], start, end)
+    }
+
+def iter_dataset(scale="10k", seed=42, days=365, end=None, chunk_creators=CREATORS_PER_CHUNK):
+    """
+    Erzeugt den Datensatz chunkweise (konstanter Speicher auch bei 10M Zeilen).
+
+    Args:
+        scale: Schlüssel aus SCALES oder Zeilenanzahl
+        seed: Seed für reproduzierbare Daten
+        days: Länge der Historie in Tagen
+        end: Ende der Historie (Default: jetzt)
+        chunk_creators: Creator pro Chunk
+
+    Yields:
+        tuple: (Tabelle, DataFrame)
+    """
+    rng = np.random.default_rng(seed)
+    creators, rows = scale_plan(scale)
+    end = pd.Timestamp.now(tz="UTC") if end is None else pd.Timestamp(end)
+    start = end - pd.Timedelta(days=days)
+
+    for first in range(0, creators, chunk_creators):
+        chunk = {table: [] for table in TABLE_SHARES}
+        for n in range(first, min(first + chunk_creators, creators)):
+            for table, frame in generate_creator(rng, f"creator{n:05d}@example.com", rows, start, end).items():
+                chunk[table].append(frame)
+        for table, frames in chunk.items():
+            yield table, pd.concat(frames, ignore_index=True)
+
+def write_parquet(chunks, out_dir):
+    """
+    Schreibt die Chunks als Parquet-Parts (out_dir/<tabelle>/part-00000.parquet, benötigt pyarrow).
+
+    Returns:
+        dict: {Tabelle: Zeilen}
+    """
+    counts = {}
+    for table, frame in chunks:
+        folder = os.path.join(out_dir, table)
+        os.makedirs(folder, exist_ok=True)
+        part = len(os.listdir(folder))
+        frame.to_parquet(os.path.join(folder, f"part-{part:05d}.parquet"), index=False)
+        counts[table] = counts.get(table, 0) + len(frame)
+    return counts
+
+def write_sqlite(chunks, path):
+    """
+    Schreibt die Chunks in eine lokale SQLite-Datenbank (Tabellen wie in Supabase).
+
+    Returns:
+        dict: {Tabelle: Zeilen}
+    """
+    counts = {}
+    with sqlite3.connect(path) as conn:
+        for table, frame in chunks:
+            frame = frame.copy()
+            for col in frame.columns:
+                if isinstance(frame[col].dtype, pd.DatetimeTZDtype):
+                    frame[col] = frame[col].dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+            frame.to_sql(table, conn, if_exists="append", index=False, chunksize=10_000)
+            counts[table] = counts.get(table, 0) + len(frame)
+    return counts
+
+def _sql_literals(series):
+    """Spalte -> SQL-Literale (NULL, Zahlen, Booleans, gequotete Strings)."""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        text = series.dt.strftime("'%Y-%m-%d %H:%M:%S+00'")
+    elif pd.api.types.is_bool_dtype(series):
+        text = series.map({True: "TRUE", False: "FALSE"})
+    elif pd.api.types.is_numeric_dtype(series):
+        text = series.astype(str)
+    else:
+        text = "'" + series.astype(str).str.replace("'", "''", regex=False) + "'"
+    return text.where(series.notna(), "NULL")
+
+def write_sql(chunks, path, rows_per_insert=1_000):
+    """
+    Schreibt die Chunks als Multi-Row-INSERTs für den Supabase SQL Editor / psql.
+
+    Returns:
+        dict: {Tabelle: Zeilen}
+    """
+    counts = {}
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("-- Synthetische Daten (modules/synthetic.py)\nBEGIN;\n")
+        for table, frame in chunks:
+            literals = [_sql_literals(frame[col]) for col in frame.columns]
+            values = "(" + literals[0].str.cat(literals[1:], sep=", ") + ")"
+            header = f"INSERT INTO {table} ({', '.join(frame.columns)}) VALUES\n"
+            for first in range(0, len(values), rows_per_insert):
+                out.write(header + ",\n".join(values.iloc[first:first + rows_per_insert]) + ";\n")
+            counts[table] = counts.get(table, 0) + len(frame)
+        out.write("COMMIT;\n")
+    return counts
+
+WRITERS = {
+    "parquet": write_parquet,
+    "sqlite": write_sqlite,
+    "sql": write_sql
+}
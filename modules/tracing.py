@@ -0,0 +1,263 @@
+"""
+QUERY TRACING
+Wrapper um den Supabase Client: Tabelle, Operation, Filter, Zeilen, Bytes und Latenz pro Call, gruppiert pro Script-Run
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime, timezone
+import streamlit as st
+import pandas as pd
+
+# Gespeicherte Runs pro Session und Calls pro Run (begrenzt den Speicher)
+MAX_RUNS = 20
+MAX_CALLS_PER_RUN = 500
+
+# Ab so vielen gleichen Query-Formen mit unterschiedlichen Filterwerten -> N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+# Builder-Methoden nach Rolle (alles andere wird als Filter protokolliert)
+OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+MODIFIERS = {"order", "limit", "range", "single", "maybe_single"}
+
+MAX_VALUE_CHARS = 60
+
+TRACE_COLUMNS = ["seq", "table", "operation", "filters", "modifiers", "rows", "bytes", "ms", "error"]
+
+def _short(value):
+    """Filterwert für die Anzeige kürzen."""
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 1] + "…"
+
+class QueryTrace:
+    """Runs einer Session; Calls aus Worker-Threads (fetch_concurrently) werden per Lock angehängt."""
+
+    def __init__(self):
+        self.runs = deque(maxlen=MAX_RUNS)
+        self.lock = threading.Lock()
+
+    def _append_run(self, label=None):
+        number = self.runs[-1]["run"] + 1 if self.runs else 1
+        self.runs.append({
+            "run": number,
+            "label": label,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "calls": [],
+            "dropped": 0
+        })
+        return self.runs[-1]
+
+    def begin_run(self, label=None):
+        with self.lock:
+            self._append_run(label)
+
+    def current_run(self):
+        """Aktueller Run (legt beim ersten Call ohne begin_run einen an)."""
+        return self.runs[-1] if self.runs else self._append_run()
+
+    def record(self, call):
+        with self.lock:
+            run = self.current_run()
+            if len(run["calls"]) >= MAX_CALLS_PER_RUN:
+                run["dropped"] += 1
+                return
+            call["seq"] = len(run["calls"]) + 1
+            run["calls"].append(call)
+
+class TracedQuery:
+    """Hüllt einen Query-Builder; protokolliert die Aufrufkette und misst execute()."""
+
+    def __init__(self, builder, trace, table, operation=None, filters=None, modifiers=None):
+        self._builder = builder
+        self._trace = trace
+        self._table = table
+        self._operation = operation
+        self._filters = filters or []
+        self._modifiers = modifiers or []
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr) or name == "execute":
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            operation, filters, modifiers = self._operation, list(self._filters), list(self._modifiers)
+            if name in OPERATIONS:
+                operation = name
+            elif name in MODIFIERS:
+                modifiers.append(f"{name}({', '.join(_short(a) for a in args)})")
+            else:
+                filters.append((name, args[0] if args else None, _short(args[1]) if len(args) > 1 else None))
+            return TracedQuery(result, self._trace, self._table, operation, filters, modifiers)
+
+        return call
+
+    def execute(self):
+        started = time.perf_counter()
+        call = {
+            "table": self._table,
+            "operation": self._operation or "select",
+            "filters": [f"{name}({column}, {value})" for name, column, value in self._filters],
+            "filter_shape": [f"{name}({column})" for name, column, _ in self._filters],
+            "modifiers": self._modifiers,
+            "rows": 0,
+            "bytes": 0,
+            "ms": 0.0,
+            "error": None
+        }
+        try:
+            res = self._builder.execute()
+        except Exception as e:
+            call["error"] = _short(e)
+            raise
+        else:
+            data = getattr(res, "data", None)
+            call["rows"] = len(data) if isinstance(data, list) else int(data is not None)
+            call["bytes"] = len(json.dumps(data, default=str).encode("utf-8")) if data is not None else 0
+            return res
+        finally:
+            call["ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self._trace.record(call)
+
+class TracingClient:
+    """Supabase Client mit Tracing für table() und rpc(); alles andere wird durchgereicht."""
+
+    def __init__(self, client, trace):
+        self._client = client
+        self._trace = trace
+
+    def table(self, name):
+        return TracedQuery(self._client.table(name), self._trace, name)
+
+    def rpc(self, name, params=None):
+        return TracedQuery(self._client.rpc(name, params or {}), self._trace, f"rpc:{name}", operation="rpc",
+                           filters=[("param", key, _short(value)) for key, value in (params or {}).items()])
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def _existing_trace():
+    """Trace der Session, falls schon einer angelegt wurde (sonst None, z.B. ungetracte Sessions)."""
+    return st.session_state.get("query_trace")
+
+def session_trace():
+    """Trace der aktuellen Session (wird beim ersten Zugriff angelegt)."""
+    if "query_trace" not in st.session_state:
+        st.session_state.query_trace = QueryTrace()
+    return st.session_state.query_trace
+
+def traced_client(client):
+    """Hüllt einen Client für die aktuelle Session (None bleibt None, ohne Session ungetraced)."""
+    if client is None or isinstance(client, TracingClient):
+        return client
+    try:
+        trace = session_trace()
+    except Exception:
+        # Aufruf außerhalb eines Script-Runs (z.B. Hintergrund-Thread)
+        return client
+    return TracingClient(client, trace)
+
+def begin_run(label=None):
+    """Startet einen neuen Run (einmal pro Script-Durchlauf; Fragment-Reruns landen im letzten Run)."""
+    trace = _existing_trace()
+    if trace is not None:
+        trace.begin_run(label)
+
+def label_run(label):
+    """Benennt den aktuellen Run (z.B. nach der Navigation)."""
+    trace = _existing_trace()
+    if trace is None:
+        return
+    with trace.lock:
+        trace.current_run()["label"] = label
+
+def find_n_plus_one(calls, threshold=N_PLUS_ONE_THRESHOLD):
+    """
+    Gleiche Query-Form (Tabelle, Operation, Filter-Spalten) mit wechselnden Filterwerten.
+
+    Pagination (gleiche Filterwerte, anderer range) zählt nicht als N+1.
+
+    Returns:
+        list: dicts mit table, operation, shape, calls, distinct_values, total_ms
+    """
+    groups = {}
+    for call in calls:
+        key = (call["table"], call["operation"], tuple(call["filter_shape"]))
+        groups.setdefault(key, []).append(call)
+
+    findings = []
+    for (table, operation, shape), group in groups.items():
+        distinct = {tuple(call["filters"]) for call in group}
+        if shape and len(distinct) >= threshold:
+            findings.append({
+                "table": table,
+                "operation": operation,
+                "shape": ", ".join(shape),
+                "calls": len(group),
+                "distinct_values": len(distinct),
+                "total_ms": round(sum(call["ms"] for call in group), 2)
+            })
+    return sorted(findings, key=lambda f: f["total_ms"], reverse=True)
+
+def run_summary(run):
+    """Kennzahlen eines Runs."""
+    calls = run["calls"]
+    return {
+        "calls": len(calls) + run["dropped"],
+        "total_ms": round(sum(call["ms"] for call in calls), 2),
+        "bytes": sum(call["bytes"] for call in calls),
+        "errors": sum(1 for call in calls if call["error"])
+    }
+
+def export_json(trace):
+    """Alle Runs inkl. Summary und N+1-Befunde als JSON."""
+    with trace.lock:
+        runs = [dict(run, calls=list(run["calls"])) for run in trace.runs]
+    for run in runs:
+        run["summary"] = run_summary(run)
+        run["n_plus_one"] = find_n_plus_one(run["calls"])
+    return json.dumps({"exported_at": datetime.now(timezone.utc).isoformat(), "runs": runs}, indent=2, default=str)
+
+def render_trace_panel():
+    """Admin-Debug-Panel: Calls, Latenzen und N+1-Hinweise pro Run (im Sidebar-Kontext aufrufen)."""
+    trace = session_trace()
+    with st.expander("🔬 QUERY TRACE", expanded=False):
+        with trace.lock:
+            runs = list(trace.runs)
+        if not runs:
+            st.caption("Noch keine Runs aufgezeichnet.")
+            return
+
+        labels = {f"#{run['run']} {run['label'] or ''}".strip(): run for run in reversed(runs)}
+        run = labels[st.selectbox("RUN", list(labels), key="trace_run")]
+        summary = run_summary(run)
+
+        c1, c2 = st.columns(2)
+        c1.metric("CALLS", summary["calls"])
+        c2.metric("DB TIME", f"{summary['total_ms']:.0f} ms")
+        st.caption(f"{summary['bytes'] / 1024:,.1f} KB übertragen · {summary['errors']} Fehler"
+                   + (f" · {run['dropped']} Calls nicht gespeichert" if run["dropped"] else ""))
+
+        for finding in find_n_plus_one(run["calls"]):
+            st.warning(f"N+1: {finding['calls']}× {finding['operation']} {finding['table']} "
+                       f"[{finding['shape']}] · {finding['total_ms']:.0f} ms")
+
+        if run["calls"]:
+            calls = pd.DataFrame(run["calls"])[TRACE_COLUMNS]
+            calls["filters"] = calls["filters"].str.join(" · ")
+            calls["modifiers"] = calls["modifiers"].str.join(" · ")
+            st.dataframe(calls.sort_values("ms", ascending=False), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "EXPORT JSON",
+            data=export_json(trace),
+            file_name=f"query_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            use_container_width=True,
+            key="trace_export"
+        )
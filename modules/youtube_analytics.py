@@ -3,11 +3,13 @@ YOUTUBE ANALYTICS MODULE
 OAuth-basierte YouTube-Daten-Synchronisierung
 """
 
+import time
 import streamlit as st
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 import pandas as pd
 from datetime import datetime, timedelta
+from modules import metrics, sync_log
 
 # Client-Konfiguration aus den Secrets
 def get_client_config():
@@ -60,6 +62,8 @@ def get_youtube_analytics_service(credentials):
         st.error(f"YouTube Analytics Service Error: {e}")
         return None
 
+@metrics.track_sync("youtube")
+@sync_log.logged_sync("youtube")
 def sync_youtube_data(credentials, supabase):
     """
     Synchronisiert YouTube-Daten.
@@ -80,10 +84,12 @@ def sync_youtube_data(credentials, supabase):
             return False
         
         # Channel Info abrufen
+        started = time.perf_counter()
         channels_response = youtube.channels().list(
             part='snippet,statistics',
             mine=True
         ).execute()
+        sync_log.record_upstream((time.perf_counter() - started) * 1000, 200)
         
         if not channels_response.get('items'):
             st.error("Kein YouTube-Kanal gefunden")
@@ -113,11 +119,14 @@ def sync_youtube_data(credentials, supabase):
         }
         
         supabase.table("stats_history").insert(stats_payload).execute()
+        sync_log.annotate(handle=channel_title)
+        sync_log.record_rows(1)
         
         st.success(f"✅ YouTube Sync erfolgreich: {subscribers:,} Subscribers")
         return True
         
     except Exception as e:
+        sync_log.record_error(e)
         st.error(f"YouTube Sync Error: {e}")
         return False
 
@@ -199,7 +208,7 @@ def render_youtube_analytics(supabase):
         
         with col1:
             if st.button("SYNC NOW", use_container_width=True):
-                if sync_youtube_data(st.session_state.youtube_credentials, supabase):
+                if sync_youtube_data(st.session_state.youtube_credentials, supabase, trigger="youtube"):
                     st.rerun()
         
         with col2:
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import pandas as pd
+from supabase import create_client
+
+# Repo-Root für "modules" Import (Script läuft als scripts/alert_scan.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.data_loader import fetch_all_rows
+from modules.alert_rules import prepare_frames, evaluate_rules, frame_windows
+from modules.alert_jobs import shard_users, filter_suppressed, suppression_records, send_digest
+from modules import metrics
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+BREVO_API_KEY = os.environ.get("BREVO_API_KEY", "")
+
+# Sharding über die Workflow-Matrix (SHARD_INDEX von SHARD_COUNT)
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", "0"))
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "1"))
+
+# User pro Supabase-Abfrage (in_-Filter landet in der URL)
+USER_CHUNK_SIZE = 100
+UPSERT_BATCH_SIZE = 500
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def load_users():
+    """Alle registrierten Creator (profiles.email)."""
+    rows = fetch_all_rows(supabase, "profiles", "email", None, order_col="email")
+    return [row["email"] for row in rows]
+
+def load_frames(users, now):
+    """Lädt nur die Zeitfenster, die die Regeln tatsächlich brauchen."""
+    windows = frame_windows(now)
+    
+    revenue_rows = fetch_all_rows(supabase, "revenue_history", "id, user_id, source, platform, amount_net, created_at", users,
+                                  since=windows["revenue"])
+    vault_rows = fetch_all_rows(supabase, "vault_assets", "id, user_id, total_revenue, ppv_opens", users)
+    stats_rows = fetch_all_rows(supabase, "stats_history", "id, user_id, platform, handle, followers, net_growth, created_at", users,
+                                since=windows["stats"])
+    activity_rows = fetch_all_rows(supabase, "customer_activity", "user_id, platform, customer, last_seen", users,
+                                   order_col="user_id,platform,customer")
+    return prepare_frames(revenue_rows, vault_rows, stats_rows, activity_rows)
+
+def save_suppressions(records):
+    """Merkt versendete Alerts sofort (ein Abbruch später im Lauf darf sie nicht erneut versenden)."""
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        supabase.table("alert_suppressions")\
+            .upsert(records[start:start + UPSERT_BATCH_SIZE], on_conflict="user_id,alert_type,subject")\
+            .execute()
+
+def run_alert_scan():
+    started = time.time()
+    now = pd.Timestamp.now(tz="UTC")
+    
+    users = shard_users(load_users(), SHARD_INDEX, SHARD_COUNT)
+    if not users:
+        print(f"Shard {SHARD_INDEX}/{SHARD_COUNT}: keine User.")
+        return
+    
+    if not BREVO_API_KEY:
+        print("BREVO_API_KEY nicht gesetzt - Dry Run ohne Versand.")
+    
+    found = due_count = sent = 0
+    
+    for start in range(0, len(users), USER_CHUNK_SIZE):
+        chunk = users[start:start + USER_CHUNK_SIZE]
+        
+        # Ein vektorisierter Regel-Durchlauf für alle User des Chunks
+        frames = load_frames(chunk, now)
+        with metrics.ALERT_EVALUATION.time(scope="shard"):
+            alerts = evaluate_rules(frames, now=now)
+        metrics.ALERTS_FOUND.inc(len(alerts), scope="shard")
+        found += len(alerts)
+        if alerts.empty:
+            continue
+        
+        suppressions = fetch_all_rows(supabase, "alert_suppressions", "user_id, alert_type, subject, last_sent_at", chunk,
+                                      order_col="user_id,alert_type,subject")
+        due = filter_suppressed(alerts, suppressions, now=now)
+        due_count += len(due)
+        # Queue = fällige Digests; was am Ende übrig bleibt, ist nicht versendet (Fehler/Dry Run)
+        metrics.EMAIL_QUEUE_DEPTH.inc(due["user_id"].nunique(), queue="alert_digest")
+        
+        # Ein Digest pro User statt einer Email pro Alert
+        for user_email, user_alerts in due.groupby("user_id"):
+            if not BREVO_API_KEY:
+                print(f"[DRY RUN] {user_email}: {len(user_alerts)} Alert(s)")
+                continue
+            try:
+                if not send_digest(BREVO_API_KEY, user_email, user_alerts):
+                    print(f"Digest an {user_email} fehlgeschlagen")
+                    continue
+            except Exception as e:
+                print(f"Digest Error ({user_email}): {e}")
+                metrics.PIPELINE_ERRORS.inc(pipeline="alert_digest")
+                continue
+            
+            sent += 1
+            metrics.EMAIL_QUEUE_DEPTH.dec(queue="alert_digest")
+            try:
+                save_suppressions(suppression_records(user_alerts, now=now))
+            except Exception as e:
+                # Email ist raus; ohne Suppression kommt sie beim nächsten Lauf erneut
+                print(f"Suppression Error ({user_email}): {e}")
+                metrics.PIPELINE_ERRORS.inc(pipeline="alert_suppressions")
+    
+    print(f"Shard {SHARD_INDEX}/{SHARD_COUNT}: {len(users)} User | {found} Alerts | "
+          f"{due_count} fällig | {sent} Digests | {time.time() - started:.1f}s")
+
+if __name__ == "__main__":
+    try:
+        run_alert_scan()
+    finally:
+        metrics.export()
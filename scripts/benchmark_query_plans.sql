@@ -0,0 +1,151 @@
+-- Benchmark: Query-Pläne vor/nach Migration 020 (History Indizes & Partitionierung)
+-- Datum: 2026-10-19
+-- Beschreibung: Erzeugt je 10M synthetische Zeilen für stats_history und revenue_history im Schema
+--               "bench" und vergleicht die Pläne der häufigsten Abfragen:
+--               A) alte Indizes (Migration 003/004) auf ungeteilter Tabelle
+--               B) Composite-/Covering-Indizes auf monatlich partitionierter Tabelle (Migration 020)
+--
+-- Ausführen (NICHT gegen Produktion, braucht ca. 3 GB Platz):
+--   psql "$DATABASE_URL" -f scripts/benchmark_query_plans.sql > benchmark_plans.txt
+
+\timing on
+SET client_min_messages = warning;
+
+DROP SCHEMA IF EXISTS bench CASCADE;
+CREATE SCHEMA bench;
+SET search_path = bench, public;
+
+-- 1. SYNTHETISCHE DATEN (2.000 User, 3 Plattformen, 2 Jahre Historie)
+CREATE TABLE stats_flat (
+    id BIGSERIAL PRIMARY KEY,
+    user_id TEXT,
+    platform TEXT,
+    handle TEXT,
+    followers INTEGER,
+    net_growth INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO stats_flat (user_id, platform, handle, followers, net_growth, created_at)
+SELECT
+    'creator' || (g % 2000) || '@example.com',
+    -- Plattform hängt am Handle (wie in echten Daten), damit (platform, handle) existierende Serien trifft
+    (ARRAY['youtube', 'tiktok', 'instagram'])[1 + (g % 6000) % 3],
+    'handle_' || (g % 6000),
+    10000 + (g % 6000) * 3 + g / 6000,
+    (g * 7919) % 200 - 50,
+    NOW() - ((g * 104729) % (730 * 24 * 60)) * INTERVAL '1 minute'
+FROM generate_series(1, 10000000) g;
+
+CREATE TABLE revenue_flat (
+    id BIGSERIAL PRIMARY KEY,
+    user_id TEXT,
+    platform TEXT,
+    amount_gross DECIMAL(10, 2),
+    amount_net DECIMAL(10, 2),
+    source TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO revenue_flat (user_id, platform, amount_gross, amount_net, source, created_at)
+SELECT
+    'creator' || (g % 2000) || '@example.com',
+    (ARRAY['onlyfans', 'fansly', 'patreon'])[1 + (g / 2000) % 3],
+    ((g * 7919) % 50000) / 100.0,
+    ((g * 7919) % 50000) / 125.0,
+    (ARRAY['subscription', 'tip', 'ppv', 'message'])[1 + g % 4],
+    NOW() - ((g * 104729) % (730 * 24 * 60)) * INTERVAL '1 minute'
+FROM generate_series(1, 10000000) g;
+
+-- 2. VORHER: Indizes wie vor Migration 020
+CREATE INDEX ON stats_flat(net_growth DESC) WHERE net_growth IS NOT NULL;
+CREATE INDEX ON stats_flat(created_at);
+CREATE INDEX ON revenue_flat(user_id);
+CREATE INDEX ON revenue_flat(platform);
+CREATE INDEX ON revenue_flat(created_at DESC);
+VACUUM ANALYZE stats_flat;
+VACUUM ANALYZE revenue_flat;
+
+\echo '=== VORHER: stats_history user_id + ORDER BY created_at (letzte 90 Tage) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT created_at, followers, platform, handle FROM stats_flat
+WHERE user_id = 'creator42@example.com' AND created_at >= NOW() - INTERVAL '90 days'
+ORDER BY created_at;
+
+\echo '=== VORHER: calculate_growth (platform + handle, neuester Snapshot) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT followers FROM stats_flat
+WHERE platform = 'tiktok' AND handle = 'handle_43'
+ORDER BY created_at DESC LIMIT 1;
+
+\echo '=== VORHER: revenue_history user_id + ORDER BY created_at ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT created_at, amount_net, platform, source FROM revenue_flat
+WHERE user_id = 'creator42@example.com' AND created_at >= NOW() - INTERVAL '90 days'
+ORDER BY created_at DESC;
+
+\echo '=== VORHER: revenue_history Top-Transaktionen ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, amount_net, platform FROM revenue_flat
+WHERE user_id = 'creator42@example.com'
+ORDER BY amount_net DESC LIMIT 10;
+
+-- 3. NACHHER: monatlich partitioniert + Composite-/Covering-Indizes
+CREATE TABLE stats_part (LIKE stats_flat INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);
+CREATE TABLE revenue_part (LIKE revenue_flat INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);
+
+DO $$
+DECLARE
+    month_start DATE := date_trunc('month', NOW() - INTERVAL '25 months')::DATE;
+BEGIN
+    WHILE month_start <= date_trunc('month', NOW())::DATE LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF stats_part FOR VALUES FROM (%L) TO (%L)',
+                       'stats_part_' || to_char(month_start, 'YYYYMM'), month_start, month_start + INTERVAL '1 month');
+        EXECUTE format('CREATE TABLE %I PARTITION OF revenue_part FOR VALUES FROM (%L) TO (%L)',
+                       'revenue_part_' || to_char(month_start, 'YYYYMM'), month_start, month_start + INTERVAL '1 month');
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+END $$;
+
+CREATE TABLE stats_part_default PARTITION OF stats_part DEFAULT;
+CREATE TABLE revenue_part_default PARTITION OF revenue_part DEFAULT;
+
+INSERT INTO stats_part SELECT * FROM stats_flat;
+INSERT INTO revenue_part SELECT * FROM revenue_flat;
+
+ALTER TABLE stats_part ADD PRIMARY KEY (id, created_at);
+ALTER TABLE revenue_part ADD PRIMARY KEY (id, created_at);
+CREATE INDEX ON stats_part(user_id, created_at DESC) INCLUDE (platform, handle, followers, net_growth);
+CREATE INDEX ON stats_part(platform, handle, created_at DESC) INCLUDE (followers);
+CREATE INDEX ON revenue_part(user_id, created_at DESC) INCLUDE (amount_net, platform, source);
+CREATE INDEX ON revenue_part(user_id, amount_net DESC);
+VACUUM ANALYZE stats_part;
+VACUUM ANALYZE revenue_part;
+
+\echo '=== NACHHER: stats_history user_id + ORDER BY created_at (letzte 90 Tage) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT created_at, followers, platform, handle FROM stats_part
+WHERE user_id = 'creator42@example.com' AND created_at >= NOW() - INTERVAL '90 days'
+ORDER BY created_at;
+
+\echo '=== NACHHER: calculate_growth (platform + handle, neuester Snapshot) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT followers FROM stats_part
+WHERE platform = 'tiktok' AND handle = 'handle_43'
+ORDER BY created_at DESC LIMIT 1;
+
+\echo '=== NACHHER: revenue_history user_id + ORDER BY created_at ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT created_at, amount_net, platform, source FROM revenue_part
+WHERE user_id = 'creator42@example.com' AND created_at >= NOW() - INTERVAL '90 days'
+ORDER BY created_at DESC;
+
+\echo '=== NACHHER: revenue_history Top-Transaktionen ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, amount_net, platform FROM revenue_part
+WHERE user_id = 'creator42@example.com'
+ORDER BY amount_net DESC LIMIT 10;
+
+-- Aufräumen
+RESET search_path;
+DROP SCHEMA bench CASCADE;
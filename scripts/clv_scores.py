@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import pandas as pd
+from supabase import create_client
+
+# Repo-Root für "modules" Import (Script läuft als scripts/clv_scores.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.data_loader import fetch_all_rows
+from modules.clv import ACTIVITY_COLUMNS, prepare_customers, fit_params, score_customers, \
+    params_to_records, params_from_records
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+# Fixes CPU-Budget für die Fits; übrige Creator behalten ihre letzten Parameter
+FIT_BUDGET_SECONDS = float(os.environ.get("CLV_FIT_BUDGET_SECONDS", "300"))
+UPSERT_BATCH_SIZE = 500
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def upsert_batches(table, records, on_conflict):
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        supabase.table(table)\
+            .upsert(records[start:start + UPSERT_BATCH_SIZE], on_conflict=on_conflict)\
+            .execute()
+
+def run_clv():
+    started = time.time()
+    now = pd.Timestamp.now(tz="UTC")
+    
+    rows = fetch_all_rows(supabase, "customer_activity", ", ".join(ACTIVITY_COLUMNS), None,
+                          order_col="user_id,platform,customer")
+    customers = prepare_customers(rows, now=now)
+    if customers.empty:
+        print("Keine Kunden-Aktivität vorhanden.")
+        return
+    
+    previous = params_from_records(fetch_all_rows(supabase, "clv_params", "*", None, order_col="user_id"))
+    loaded = time.time()
+    
+    # Gebatchter Fit aller Creator (Warmstart mit gestrigen Parametern)
+    params = fit_params(customers, previous=previous, budget_seconds=FIT_BUDGET_SECONDS)
+    scored = score_customers(customers, params)
+    fitted = time.time()
+    
+    param_records = params_to_records(params)
+    for record in param_records:
+        record["fitted_at"] = now.isoformat()
+    upsert_batches("clv_params", param_records, "user_id")
+    
+    records = scored.round({"lifetime_spend": 2, "expected_spend": 2, "clv": 2, "value_at_risk": 2, "p_alive": 4,
+                            "churn_prob": 4, "expected_purchases": 3})
+    records["scored_at"] = now.isoformat()
+    upsert_batches("customer_clv", records.to_dict("records"), "user_id,platform,customer")
+    
+    print(f"CLV: {len(scored)} Fans | {len(params)} Creator | Laden {loaded - started:.1f}s | "
+          f"Fit {fitted - loaded:.1f}s | Schreiben {time.time() - fitted:.1f}s")
+
+if __name__ == "__main__":
+    run_clv()
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+from supabase import create_client
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+# Retention-Policy: volle Auflösung / Tageswerte (in Tagen), danach Wochenwerte
+STATS_RAW_DAYS = int(os.environ.get("STATS_RAW_DAYS", "30"))
+STATS_DAILY_DAYS = int(os.environ.get("STATS_DAILY_DAYS", "365"))
+
+# Perioden pro RPC-Aufruf (kurze Transaktionen statt eines großen DELETE); jeder Aufruf liest ein 4-Wochen-Fenster
+COMPACTION_BATCH_SIZE = int(os.environ.get("COMPACTION_BATCH_SIZE", "5000"))
+MAX_BATCHES = 200
+
+# Monats-Partitionen von stats_history/revenue_history im Voraus anlegen (Migration 020)
+PARTITION_MONTHS_AHEAD = 3
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def compact_stats_history():
+    started = time.time()
+    total = 0
+    next_from = None
+    
+    # Fenster für Fenster vorwärts; None = beim High-Water-Mark der letzten Nacht fortsetzen
+    # (stats_history_compaction_state), ein normaler Lauf verarbeitet nur die Fenster an den Cutoffs
+    for batch in range(MAX_BATCHES):
+        batch_started = time.time()
+        res = supabase.rpc("compact_stats_history", {
+            "p_from": next_from,
+            "p_raw_days": STATS_RAW_DAYS,
+            "p_daily_days": STATS_DAILY_DAYS,
+            "p_batch_size": COMPACTION_BATCH_SIZE
+        }).execute()
+        
+        result = res.data[0] if res.data else {"deleted_rows": 0, "compacted_periods": 0, "next_from": None, "done": True}
+        total += result["deleted_rows"]
+        print(f"Batch {batch + 1} (ab {next_from or 'High-Water-Mark'}): {result['deleted_rows']} Snapshots aus "
+              f"{result['compacted_periods']} Perioden verdichtet in {time.time() - batch_started:.2f}s")
+        
+        # Letztes Fenster vor dem Roh-Cutoff verarbeitet
+        if result["done"]:
+            break
+        next_from = result["next_from"]
+    else:
+        print(f"⚠️ Abbruch nach {MAX_BATCHES} Batches - Rest folgt beim nächsten Lauf.")
+    
+    print(f"Compaction: {total} Roh-Snapshots entfernt in {time.time() - started:.2f}s "
+          f"(roh < {STATS_RAW_DAYS}d, täglich < {STATS_DAILY_DAYS}d, danach wöchentlich)")
+
+def prune_rollups():
+    """Entfernt Stunden-Buckets aus stats_rollups, die älter als das Roh-Fenster sind."""
+    started = time.time()
+    res = supabase.rpc("prune_stats_rollups", {"p_hour_days": STATS_RAW_DAYS}).execute()
+    print(f"Rollups: {res.data or 0} Stunden-Buckets älter als {STATS_RAW_DAYS}d entfernt in {time.time() - started:.2f}s")
+
+def ensure_partitions():
+    """Legt die kommenden Monats-Partitionen an; False bei Fehler (Compaction läuft trotzdem)."""
+    started = time.time()
+    try:
+        res = supabase.rpc("ensure_all_history_partitions", {"p_months_ahead": PARTITION_MONTHS_AHEAD}).execute()
+    except Exception as e:
+        print(f"⚠️ Partitionen Error: {e}")
+        return False
+    print(f"Partitionen: {res.data or 0} neue Monats-Partitionen angelegt in {time.time() - started:.2f}s")
+    return True
+
+if __name__ == "__main__":
+    partitions_ok = ensure_partitions()
+    compact_stats_history()
+    prune_rollups()
+    # Fehlgeschlagene Partitionierung erst nach der Compaction melden (Workflow-Step schlägt fehl)
+    if not partitions_ok:
+        sys.exit(1)
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import pandas as pd
+from supabase import create_client
+
+# Repo-Root für "modules" Import (Script läuft als scripts/forecast_revenue.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.data_loader import fetch_all_rows
+from modules.forecasting import update_forecasts, project, model_to_records, model_from_records
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+UPSERT_BATCH_SIZE = 500
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def load_daily_revenue():
+    """Lädt die Tages-Aggregate aller Creator (View revenue_daily)."""
+    rows = fetch_all_rows(supabase, "revenue_daily", "user_id, platform, day, amount", None,
+                          order_col="user_id,platform,day")
+    df = pd.DataFrame(rows, columns=["user_id", "platform", "day", "amount"])
+    return pd.DataFrame({
+        "user_id": df["user_id"],
+        "platform": df["platform"],
+        "date": pd.to_datetime(df["day"]),
+        "amount": pd.to_numeric(df["amount"], errors="coerce").fillna(0.0)
+    })
+
+def run_forecasts():
+    started = time.time()
+    
+    frame = load_daily_revenue()
+    previous = model_from_records(fetch_all_rows(supabase, "revenue_forecasts", "*", None))
+    loaded = time.time()
+    
+    # Ein gebatchter Fit für alle Creator; bekannte Serien nur inkrementell
+    today = pd.Timestamp.now(tz="UTC").tz_localize(None).normalize()
+    model = update_forecasts(previous, frame, end=today)
+    if model is None:
+        print("Keine Revenue-Daten vorhanden.")
+        return
+    
+    projection = project(model, interval=0.8)
+    fitted = time.time()
+    
+    records = pd.DataFrame(model_to_records(model)).merge(projection, on=["user_id", "platform"])
+    records = records.round({col: 2 for col in projection.columns if col not in ("user_id", "platform")})
+    payload = records.to_dict("records")
+    
+    for start in range(0, len(payload), UPSERT_BATCH_SIZE):
+        supabase.table("revenue_forecasts")\
+            .upsert(payload[start:start + UPSERT_BATCH_SIZE], on_conflict="user_id,platform")\
+            .execute()
+    
+    print(f"Forecasts: {len(payload)} Serien | Laden {loaded - started:.1f}s | "
+          f"Fit {fitted - loaded:.2f}s | Schreiben {time.time() - fitted:.1f}s")
+
+if __name__ == "__main__":
+    run_forecasts()
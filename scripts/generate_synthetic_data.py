@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+
+# Repo-Root für "modules" Import (Script läuft als scripts/generate_synthetic_data.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.synthetic import SCALES, WRITERS, iter_dataset, scale_plan
+
+# Konfiguration per Umgebungsvariablen (Skalierung: 10k, 100k, 1m, 10m oder Zeilenanzahl)
+SYNTH_SCALE = os.environ.get("SYNTH_SCALE", "100k")
+SYNTH_FORMAT = os.environ.get("SYNTH_FORMAT", "sqlite")
+SYNTH_SEED = int(os.environ.get("SYNTH_SEED", "42"))
+SYNTH_DAYS = int(os.environ.get("SYNTH_DAYS", "365"))
+
+# Ziel pro Format (Parquet = Ordner, SQLite = DB-Datei, SQL = Script für Supabase/psql)
+DEFAULT_OUTPUTS = {
+    "parquet": "synthetic_data",
+    "sqlite": "synthetic_data.db",
+    "sql": "synthetic_data.sql"
+}
+
+def generate_synthetic_data():
+    if SYNTH_FORMAT not in WRITERS:
+        print(f"❌ Unbekanntes Format '{SYNTH_FORMAT}' (erlaubt: {', '.join(WRITERS)})")
+        sys.exit(1)
+    scale = SYNTH_SCALE if SYNTH_SCALE in SCALES else int(SYNTH_SCALE)
+    output = os.environ.get("SYNTH_OUTPUT", DEFAULT_OUTPUTS[SYNTH_FORMAT])
+
+    started = time.time()
+    creators, rows = scale_plan(scale)
+    print(f"Generiere {SYNTH_SCALE}: {creators} Creator, {SYNTH_DAYS} Tage, Zeilen pro Creator: {rows}")
+
+    counts = WRITERS[SYNTH_FORMAT](iter_dataset(scale, seed=SYNTH_SEED, days=SYNTH_DAYS), output)
+
+    for table, count in counts.items():
+        print(f"  {table}: {count:,} Zeilen")
+    print(f"✅ {sum(counts.values()):,} Zeilen nach {output} ({SYNTH_FORMAT}) in {time.time() - started:.2f}s")
+
+if __name__ == "__main__":
+    generate_synthetic_data()
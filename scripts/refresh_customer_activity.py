@@ -0,0 +1,16 @@
+import os
+from supabase import create_client
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def refresh_customer_activity():
+    # Rollierende 7/30-Tage-Fenster altern lassen (Trigger greift nur bei neuen Umsätzen)
+    res = supabase.rpc("refresh_customer_activity", {}).execute()
+    print(f"Customer Activity: {res.data} Kunden aktualisiert.")
+
+if __name__ == "__main__":
+    refresh_customer_activity()
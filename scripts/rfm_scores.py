@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import pandas as pd
+from supabase import create_client
+
+# Repo-Root für "modules" Import (Script läuft als scripts/rfm_scores.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.data_loader import fetch_all_rows
+from modules.rfm import prepare_customers, compute_breakpoints, score_customers, changed_scores, \
+    breakpoints_to_records, to_records
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+UPSERT_BATCH_SIZE = 500
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def upsert_batches(table, records, on_conflict):
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        supabase.table(table)\
+            .upsert(records[start:start + UPSERT_BATCH_SIZE], on_conflict=on_conflict)\
+            .execute()
+
+def run_rfm():
+    started = time.time()
+    now = pd.Timestamp.now(tz="UTC")
+    
+    rows = fetch_all_rows(supabase, "of_customers",
+                          "id, user_id, customer_username, total_spent, purchase_count, last_purchase_date, "
+                          "r_score, f_score, m_score, rfm_segment", None)
+    if not rows:
+        print("Keine Kunden-Daten vorhanden.")
+        return
+    
+    # Grenzen neu berechnen (Recency altert täglich) und alle Fans in einem Durchlauf scoren
+    customers = prepare_customers(rows, now=now)
+    breakpoints = compute_breakpoints(customers)
+    scored = score_customers(customers, breakpoints)
+    changed = changed_scores(scored, rows)
+    scored_at = time.time()
+    
+    upsert_batches("rfm_breakpoints", breakpoints_to_records(breakpoints, customers), "user_id")
+    upsert_batches("of_customers", to_records(changed, now=now), "user_id,customer_username")
+    
+    print(f"RFM: {len(customers)} Fans | {breakpoints.shape[0]} Creator | {len(changed)} geändert | "
+          f"Scoring {scored_at - started:.1f}s | Schreiben {time.time() - scored_at:.1f}s")
+
+if __name__ == "__main__":
+    run_rfm()
@@ -1,7 +1,13 @@
 import os
+import sys
 import requests
 from supabase import create_client
 
+# Repo-Root für "modules" Import (Script läuft als scripts/sync_data.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import metrics, sync_log
+
 # Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
@@ -10,10 +16,15 @@ USER_ID = os.environ.get("USER_ID", "default")  # Optional: für Multi-User Supp
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+@metrics.track_sync("instagram")
+@sync_log.logged_sync("instagram")
 def sync_instagram():
     # Beispiel-Abruf (vereinfacht)
     url = f"https://graph.facebook.com/v18.0/me?fields=followers_count&access_token={INSTAGRAM_TOKEN}"
-    response = requests.get(url).json()
+    res = requests.get(url)
+    metrics.record_upstream("instagram_graph", res)
+    sync_log.record_response(res)
+    response = res.json()
     
     followers = response.get("followers_count", 0)
     
@@ -24,7 +35,14 @@ def sync_instagram():
         "value": followers,
         "user_id": USER_ID  # Dynamische User-ID für Multi-User Support
     }).execute()
+    sync_log.record_rows(1)
     print(f"Synced {followers} followers for user {USER_ID}.")
+    return True
 
 if __name__ == "__main__":
-    sync_instagram()
+    sync_log.configure(supabase)
+    try:
+        sync_instagram(trigger="scheduled", user_id=USER_ID)
+    finally:
+        sync_log.flush()
+        metrics.export()
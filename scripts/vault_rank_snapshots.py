@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import pandas as pd
+from supabase import create_client
+
+# Repo-Root für "modules" Import (Script läuft als scripts/vault_rank_snapshots.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.data_loader import fetch_all_rows
+from modules.content_scoring import ASSET_COLUMNS, prepare_assets, score_assets, snapshot_records
+
+# Credentials aus GitHub Secrets (ähnlich wie Streamlit Secrets)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+UPSERT_BATCH_SIZE = 500
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def run_snapshots():
+    started = time.time()
+    today = pd.Timestamp.now(tz="UTC").date()
+    
+    # Alle Creator in einem Durchlauf scoren
+    assets = prepare_assets(fetch_all_rows(supabase, "vault_assets", ", ".join(ASSET_COLUMNS), None))
+    scored = score_assets(assets)
+    records = snapshot_records(scored, today)
+    
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        supabase.table("vault_rank_snapshots")\
+            .upsert(records[start:start + UPSERT_BATCH_SIZE], on_conflict="user_id,snapshot_date,asset_id")\
+            .execute()
+    
+    print(f"Vault Snapshots: {len(records)} Assets | {scored['user_id'].nunique()} Creator | "
+          f"{time.time() - started:.1f}s")
+
+if __name__ == "__main__":
+    run_snapshots()